@@ -0,0 +1,137 @@
+"""
+응답 파서 마이크로 벤치마크
+- 합성 응답(깔끔한 코드 블록 / 설명문+예시 배열이 섞인 응답 / 잘린 응답)을 크기별로 생성
+- 이전 정규식 추출 방식, 스캐너(전체 응답), 스트리밍 파서(조각별 파싱 + 확정, 프로바이더가 쓰는 경로)의
+  KB당 파싱 시간 비교
+- 수정 제안 현지화: 문구 표 크기별로 순차 부분문자열 검사와 Aho-Corasick 오토마톤 비교
+
+사용법: python ai-core/parsers/benchmark.py [--repeat 5] [--sizes 4,64,1024]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parsers.result_parser import IssueStreamParser, extract_issue_items
+from parsers.suggestion_localizer import PhraseAutomaton
+
+_STREAM_CHUNK = 64   # 스트리밍 응답 조각 크기 (문자)
+
+
+def _issue(i: int) -> dict:
+    return {
+        "id": f"issue-{i}",
+        "type": "TEXT_TRUNCATION",
+        "severity": "HIGH",
+        "description": f"Button label [{i}] is cut off: \"設定を変更する...\" {{overflow}}",
+        # 겹치지 않는 박스 (최종 확정 단계의 박스 병합으로 개수가 줄지 않도록)
+        "location": {"x1": i % 900, "y1": i // 900, "x2": i % 900 + 1, "y2": i // 900 + 1},
+        "language": "ja-JP",
+        "suggestion": "버튼 너비를 확장하세요",
+        "original_text": "設定を変更する...",
+    }
+
+
+def _issue_array(size_kb: int) -> str:
+    items: List[str] = []
+    total = 0
+    while total < size_kb * 1024:
+        items.append(json.dumps(_issue(len(items)), ensure_ascii=False))
+        total += len(items[-1]) + 2
+    return "[\n" + ",\n".join(items) + "\n]"
+
+
+def make_responses(size_kb: int) -> dict:
+    array = _issue_array(size_kb)
+    prose = "Looking at the screenshot [HUD], the menu (see [1]) shows several issues. " * 8
+    example = '[{"id": "example", "type": "TEXT_TRUNCATION", "location": {}}]'
+    return {
+        "fenced": f"```json\n{array}\n```",
+        "chatty": f"{prose}\nFormat: {example}\n\n```json\n{array}\n```\n{prose} [end]",
+        "truncated": f"```json\n{array[: len(array) * 9 // 10]}",
+    }
+
+
+def legacy_extract(text: str) -> list:
+    """이전 구현: 코드 블록 정규식 → 탐욕적 배열 정규식 → json.loads (실패 시 빈 결과)"""
+    match = re.search(r"```(?:json)?\s*\n?([\s\S]*?)\n?```", text) or re.search(r"(\[[\s\S]*\])", text)
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(1).strip())
+    except json.JSONDecodeError:
+        return []
+    return data if isinstance(data, list) else []
+
+
+def scanner_full(text: str) -> list:
+    return extract_issue_items(text)
+
+
+def parser_stream(text: str) -> list:
+    parser = IssueStreamParser()
+    for i in range(0, len(text), _STREAM_CHUNK):
+        parser.feed(text[i:i + _STREAM_CHUNK])
+    return parser.finish()[0]
+
+
+def _best_time(fn: Callable[[str], list], text: str, repeat: int) -> float:
+    best: Optional[float] = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best or 0.0
+
+
+def _phrase_table(count: int) -> List[str]:
+    rng = random.Random(count)
+    words = ["font", "button", "width", "label", "wrap", "menu", "dialog", "padding", "glyph", "scale"]
+    return [" ".join(rng.sample(words, 3)) + f" {i}" for i in range(count)]
+
+
+def bench_suggestions(repeat: int) -> None:
+    suggestion = "The label in the settings dialog is cut off; consider a shorter string or wider box."
+    print(f"\n{'phrases':>8} {'impl':<10} {'us/call':>8}")
+    for count in (10, 1000, 10000):
+        phrases = _phrase_table(count)
+        automaton = PhraseAutomaton(phrases)
+
+        def linear(text: str) -> Optional[int]:
+            lower = text.lower()
+            return next((i for i, p in enumerate(phrases) if p in lower), None)
+
+        for name, fn in (("linear", linear), ("automaton", automaton.first_match)):
+            calls = 200
+            best = _best_time(lambda text: [fn(text) for _ in range(calls)], suggestion, repeat)
+            print(f"{count:>8} {name:<10} {best * 1e6 / calls:>8.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--sizes", default="4,64,1024", help="응답 크기 목록 (KB)")
+    args = ap.parse_args()
+
+    impls = [("legacy", legacy_extract), ("scanner", scanner_full), ("stream", parser_stream)]
+    print(f"{'case':<10} {'KB':>6} {'impl':<8} {'issues':>7} {'ms':>9} {'us/KB':>8}")
+    for size_kb in (int(s) for s in args.sizes.split(",")):
+        for case, text in make_responses(size_kb).items():
+            kb = len(text.encode("utf-8")) / 1024
+            for name, fn in impls:
+                found = len(fn(text))
+                t = _best_time(fn, text, args.repeat)
+                print(f"{case:<10} {kb:>6.0f} {name:<8} {found:>7} {t * 1000:>9.2f} {t * 1e6 / kb:>8.1f}")
+
+    bench_suggestions(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
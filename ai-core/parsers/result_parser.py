@@ -1,33 +1,181 @@
 """
 AI 응답 파서
-- JSON 추출, 좌표 정규화, 이슈 검증
+- JSON 추출, 좌표 정규화, 이슈 검증 (겹치는 박스는 심각도 높은 것 하나로 병합)
+- 스트리밍 응답은 이슈 객체가 닫히는 즉시 하나씩 파싱 (잘린 응답도 완성된 이슈는 유지)
 """
 
 import json
+import os
 import re
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from contracts.types import (
     LocalizationIssue, BoundingBox, IssueType, IssueSeverity,
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from telemetry.metrics import PARSE_FAILURES, timed_stage
+
 
 def extract_json_from_response(response_text: str) -> Optional[str]:
-    """AI 응답에서 JSON 문자열 추출"""
-    # ```json ... ``` 블록
-    match = re.search(r"```(?:json)?\s*\n?([\s\S]*?)\n?```", response_text)
-    if match:
-        return match.group(1).strip()
+    """AI 응답에서 이슈 배열 JSON 문자열 추출 (없으면 None)"""
+    items = extract_issue_items(response_text)
+    return json.dumps(items, ensure_ascii=False) if items else None
 
-    # 직접 [ 로 시작하는 JSON 배열
-    match = re.search(r"(\[[\s\S]*\])", response_text)
-    if match:
-        return match.group(1).strip()
 
-    return None
+def format_timestamp(seconds: float) -> str:
+    """초 → 비디오 프롬프트와 같은 "M:SS.s" 형식"""
+    seconds = round(max(seconds, 0.0), 1)
+    minutes = int(seconds // 60)
+    return f"{minutes}:{seconds - minutes * 60:04.1f}"
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """"M:SS.s" / "H:MM:SS" / "SS.s" 형식 → 초 (해석 불가 시 None)"""
+    if not value:
+        return None
+    try:
+        total = 0.0
+        for part in value.strip().split(":"):
+            total = total * 60 + float(part)
+        return total
+    except ValueError:
+        return None
+
+
+def shift_timestamps(issues: List[LocalizationIssue], offset: float) -> List[LocalizationIssue]:
+    """구간 분석 결과의 타임스탬프를 원본 타임라인으로 이동 (offset: 구간 시작 초)"""
+    for issue in issues:
+        seconds = parse_timestamp(issue.timestamp)
+        if seconds is not None:
+            issue.timestamp = format_timestamp(seconds + offset)
+    return issues
+
+
+def _box_iou(a: BoundingBox, b: BoundingBox) -> float:
+    w = min(a.x2, b.x2) - max(a.x1, b.x1)
+    h = min(a.y2, b.y2) - max(a.y1, b.y1)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    union = (a.x2 - a.x1) * (a.y2 - a.y1) + (b.x2 - b.x1) * (b.y2 - b.y1) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _same_sighting(
+    a: LocalizationIssue, ta: float, b: LocalizationIssue, tb: float, max_gap: float, min_iou: float
+) -> bool:
+    """같은 유형 + 같은 원문(둘 다 없으면 박스 IoU) + 시간 차 max_gap초 이내"""
+    if a.type != b.type or abs(ta - tb) > max_gap:
+        return False
+    text = (a.original_text or "").strip().casefold()
+    other_text = (b.original_text or "").strip().casefold()
+    if text or other_text:
+        return text == other_text
+    return _box_iou(a.location, b.location) >= min_iou
+
+
+def merge_overlap_duplicates(
+    per_segment: List[List[LocalizationIssue]],
+    spans: List[Tuple[float, float]],
+    tolerance: float = 1.0,
+    min_iou: float = 0.5,
+) -> List[LocalizationIssue]:
+    """
+    인접 구간이 겹치는 시간대에서 두 구간이 함께 보고한 이슈를 하나로 (앞 구간 것 유지).
+    per_segment[k]는 구간 k의 이슈(원본 타임라인으로 이동한 뒤), spans[k]는 구간 k의 (시작, 끝) 초.
+    구간 k의 이슈가 겹침 [spans[k] 시작, spans[k-1] 끝](± tolerance초) 안에 있고,
+    앞 구간이 같은 겹침 안에서 보고한 같은 이슈(_same_sighting, 시간 차 tolerance초 이내)가 있을 때만 제거.
+    겹침 밖이나 같은 구간 안의 반복 등장은 그대로 둠.
+    """
+    kept: List[LocalizationIssue] = list(per_segment[0]) if per_segment else []
+    for k in range(1, len(per_segment)):
+        lo, hi = spans[k][0] - tolerance, spans[k - 1][1] + tolerance
+        previous = [
+            (t, issue) for issue in per_segment[k - 1]
+            if (t := parse_timestamp(issue.timestamp)) is not None and lo <= t <= hi
+        ]
+        for issue in per_segment[k]:
+            t = parse_timestamp(issue.timestamp)
+            if t is not None and lo <= t <= hi and any(
+                _same_sighting(issue, t, other, ot, tolerance, min_iou) for ot, other in previous
+            ):
+                continue
+            kept.append(issue)
+    return kept
+
+
+# 겹친 이슈 중 남길 우선순위 (심각도 높은 것 먼저)
+_SEVERITY_RANK = {IssueSeverity.HIGH: 0, IssueSeverity.MEDIUM: 1, IssueSeverity.LOW: 2}
+
+
+def track_max_gap() -> float:
+    """같은 이슈로 이어 붙일 최대 시간 간격(초, 0 이하 = 트래킹 안 함)"""
+    return float(os.getenv("VIDEO_TRACK_MAX_GAP", "10"))
+
+
+def _track_key(issue: LocalizationIssue) -> tuple:
+    return issue.type, issue.language, (issue.original_text or "").strip().casefold()
+
+
+@dataclass
+class _Track:
+    issue: LocalizationIssue    # 대표 이슈
+    first: float
+    last: float
+    box: BoundingBox            # 마지막 등장 박스
+    count: int = 1
+
+
+def track_issues(
+    issues: List[LocalizationIssue], max_gap: Optional[float] = None, min_iou: float = 0.3
+) -> List[LocalizationIssue]:
+    """
+    비디오 이슈를 시간축으로 이어 붙여 트랙 하나당 이슈 하나로 축약.
+    유형/언어/원문이 같고 박스가 min_iou 이상 겹치며 직전 등장에서 max_gap초 이내면 같은 트랙.
+    트랙 대표는 가장 높은 심각도(같으면 처음 본 것), timestamp~end_timestamp는 처음/마지막 등장, occurrences는 등장 횟수.
+    타임스탬프가 없는 이슈는 그대로 둠.
+    """
+    max_gap = track_max_gap() if max_gap is None else max_gap
+    if max_gap <= 0:
+        return issues
+
+    timed = [(t, issue) for issue in issues if (t := parse_timestamp(issue.timestamp)) is not None]
+    timed.sort(key=lambda pair: pair[0])
+
+    tracks: List[_Track] = []
+    by_key: dict = {}
+    for t, issue in timed:
+        candidates = by_key.setdefault(_track_key(issue), [])
+        track = next(
+            (c for c in candidates if t - c.last <= max_gap and _box_iou(c.box, issue.location) >= min_iou),
+            None,
+        )
+        if track is None:
+            track = _Track(issue, t, t, issue.location)
+            candidates.append(track)
+            tracks.append(track)
+            continue
+        if _SEVERITY_RANK[issue.severity] < _SEVERITY_RANK[track.issue.severity]:
+            track.issue = issue
+        track.last, track.box = t, issue.location
+        track.count += 1
+
+    tracked: List[LocalizationIssue] = []
+    for track in tracks:
+        rep = track.issue
+        rep.timestamp = format_timestamp(track.first)
+        if track.count > 1:
+            rep.end_timestamp = format_timestamp(track.last)
+            rep.occurrences = track.count
+        tracked.append(rep)
+    return tracked + [issue for issue in issues if parse_timestamp(issue.timestamp) is None]
 
 
 def parse_issue_dict(item: dict, index: int = 0) -> Optional[LocalizationIssue]:
@@ -78,14 +226,23 @@ def parse_issue_dict(item: dict, index: int = 0) -> Optional[LocalizationIssue]:
         return None
 
 
-def normalize_coordinates(location: BoundingBox) -> BoundingBox:
-    """좌표가 1000을 초과하면 정규화 (픽셀 → 0-1000)"""
+def normalize_coordinates(
+    location: BoundingBox, image_size: Optional[Tuple[int, int]] = None
+) -> BoundingBox:
+    """좌표가 1000을 초과하면 정규화 (픽셀 → 0-1000)
+
+    image_size(모델에 보낸 이미지의 width, height)를 알면 정확히 환산하고,
+    모르면 일반적인 해상도로 추정한다.
+    """
     max_val = max(location.x1, location.y1, location.x2, location.y2)
     if max_val <= 1000:
         return location
 
+    if image_size and image_size[0] > 0 and image_size[1] > 0:
+        scale_x = 1000.0 / image_size[0]
+        scale_y = 1000.0 / image_size[1]
     # 일반적인 해상도 추정
-    if max_val > 1920:
+    elif max_val > 1920:
         scale_x = 1000.0 / 3840
         scale_y = 1000.0 / 2160
     elif max_val > 1280:
@@ -96,81 +253,433 @@ def normalize_coordinates(location: BoundingBox) -> BoundingBox:
         scale_y = 1000.0 / 720
 
     return BoundingBox(
-        x1=round(location.x1 * scale_x, 1),
-        y1=round(location.y1 * scale_y, 1),
-        x2=round(location.x2 * scale_x, 1),
-        y2=round(location.y2 * scale_y, 1),
+        x1=round(min(location.x1 * scale_x, 1000.0), 1),
+        y1=round(min(location.y1 * scale_y, 1000.0), 1),
+        x2=round(min(location.x2 * scale_x, 1000.0), 1),
+        y2=round(min(location.y2 * scale_y, 1000.0), 1),
     )
 
 
-def validate_issues(issues: List[LocalizationIssue]) -> List[LocalizationIssue]:
-    """중복 제거, 좌표 정규화, 유효하지 않은 박스 제거"""
-    seen_ids = set()
-    valid: List[LocalizationIssue] = []
-
-    for issue in issues:
-        if issue.id in seen_ids:
-            continue
-        seen_ids.add(issue.id)
-
-        issue.location = normalize_coordinates(issue.location)
+def nms_iou_threshold() -> float:
+    """같은 유형/언어 박스를 하나로 합칠 IoU 기준 (0 이하 = 합치지 않음)"""
+    return float(os.getenv("ISSUE_NMS_IOU", "0.5"))
 
-        # 유효하지 않은 바운딩박스 제거
-        loc = issue.location
-        if loc.x1 >= loc.x2 or loc.y1 >= loc.y2:
-            continue
 
-        valid.append(issue)
+def _normalize_boxes(boxes: np.ndarray, image_size: Optional[Tuple[int, int]]) -> np.ndarray:
+    """normalize_coordinates의 배열 버전: (n, 4) 박스를 한 번에 0-1000으로 환산"""
+    pixel = boxes.max(axis=1) > 1000
+    if not pixel.any():
+        return boxes
 
-    return valid
+    if image_size and image_size[0] > 0 and image_size[1] > 0:
+        size = np.array([image_size[0], image_size[1]], dtype=float)
+        scale = np.broadcast_to(1000.0 / np.tile(size, 2), boxes.shape)
+    else:
+        # 일반적인 해상도 추정 (박스별 최대 좌표 기준)
+        max_val = boxes.max(axis=1)
+        w = np.select([max_val > 1920, max_val > 1280], [3840.0, 1920.0], 1280.0)
+        h = np.select([max_val > 1920, max_val > 1280], [2160.0, 1080.0], 720.0)
+        scale = 1000.0 / np.stack([w, h, w, h], axis=1)
+
+    out = boxes.copy()
+    out[pixel] = np.round(np.minimum(boxes[pixel] * scale[pixel], 1000.0), 1)
+    return out
+
+
+def _suppress(boxes: np.ndarray, groups: np.ndarray, ranks: np.ndarray, threshold: float) -> List[int]:
+    """
+    그룹별 IoU NMS. 심각도 순(같으면 먼저 나온 것)으로 하나씩 남기고,
+    같은 그룹에서 threshold 이상 겹치는 나머지를 한 번에 제거. 남은 인덱스를 원래 순서로 반환.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.lexsort((np.arange(len(boxes)), ranks))
+    keep: List[int] = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(int(i))
+        w = np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])
+        h = np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])
+        inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[(groups[rest] != groups[i]) | (iou < threshold)]
+    return sorted(keep)
+
+
+def suppress_overlaps(
+    issues: List[LocalizationIssue], iou_threshold: Optional[float] = None
+) -> List[LocalizationIssue]:
+    """
+    같은 유형/언어/타임스탬프에서 박스가 겹치는 이슈를 하나로 합침 (가장 높은 심각도 유지).
+    좌표는 이미 정규화되어 있어야 함.
+    """
+    threshold = nms_iou_threshold() if iou_threshold is None else iou_threshold
+    if threshold <= 0 or len(issues) < 2:
+        return issues
+
+    boxes = np.array(
+        [(i.location.x1, i.location.y1, i.location.x2, i.location.y2) for i in issues], dtype=float
+    )
+    keys: dict = {}
+    groups = np.array(
+        [keys.setdefault((i.type, i.language, i.timestamp), len(keys)) for i in issues]
+    )
+    ranks = np.array([_SEVERITY_RANK[i.severity] for i in issues])
+    return [issues[k] for k in _suppress(boxes, groups, ranks, threshold)]
 
 
-def parse_ai_response(response_text: str) -> List[LocalizationIssue]:
-    """AI 응답 전체를 파싱하여 이슈 목록 반환"""
-    json_str = extract_json_from_response(response_text)
-    if not json_str:
+@timed_stage("validate_issues")
+def validate_issues(
+    issues: List[LocalizationIssue],
+    image_size: Optional[Tuple[int, int]] = None,
+    iou_threshold: Optional[float] = None,
+) -> List[LocalizationIssue]:
+    """중복 제거, 좌표 정규화, 유효하지 않은 박스 제거, 겹치는 박스 병합 (전체 박스를 배열로 한 번에 처리)"""
+    seen_ids = set()
+    unique: List[LocalizationIssue] = []
+    for issue in issues:
+        if issue.id not in seen_ids:
+            seen_ids.add(issue.id)
+            unique.append(issue)
+    if not unique:
         return []
 
-    try:
-        data = json.loads(json_str)
-    except json.JSONDecodeError:
-        return []
+    raw = np.array(
+        [(i.location.x1, i.location.y1, i.location.x2, i.location.y2) for i in unique], dtype=float
+    )
+    boxes = _normalize_boxes(raw, image_size)
+    for issue, row, changed in zip(unique, boxes.tolist(), (boxes != raw).any(axis=1)):
+        if changed:
+            issue.location = BoundingBox(x1=row[0], y1=row[1], x2=row[2], y2=row[3])
+
+    valid = (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+    PARSE_FAILURES.inc(len(unique) - int(valid.sum()), reason="invalid_box")
+    return suppress_overlaps([i for i, ok in zip(unique, valid) if ok], iou_threshold)
+
+
+# 스캐너가 멈춰 볼 위치: 배열 시작 후보 / 원소 사이의 구조 문자 / 문자열 안의 특수 문자
+_NON_SPACE = re.compile(r"\S")
+_ELEMENT_TOKEN = re.compile(r"[{\[\]\"]")
+_STRING_TOKEN = re.compile(r"[\"\\]")
+# 원소 안에서 다음 괄호(또는 조각 안에서 닫히지 않는 문자열의 시작)까지 건너뛸 부분
+_SKIP_TO_STRUCT = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*', re.S)
+_DECODER = json.JSONDecoder()
+
+
+class JsonArrayScanner:
+    """
+    응답 텍스트 조각을 순서대로 받아 JSON 배열의 객체 원소를 닫히는 즉시 반환 (단일 패스, 선형 시간).
+    구조 문자와 문자열 경계만 정규식으로 건너뛰며 따라가고, 배열 앞의 설명문 / ``` 코드 펜스는 무시.
+    "[" 다음 첫 글자가 "{" 또는 "]"인 것만 이슈 배열 후보로 봄 (설명문 속 대괄호 제외).
+    후보 배열이 여러 개면 모두 따라가며 arrays에 배열별로 모으고, fenced에 ``` 코드 블록 안인지 기록.
+    """
+
+    _SEEK, _OPENED, _ARRAY = range(3)
+
+    def __init__(self):
+        self._state = self._SEEK
+        self._depth = 0             # 배열 안에서의 중첩 깊이 (0 = 원소 사이)
+        self._in_object = False     # 현재 원소가 객체인지 (아니면 버림)
+        self._in_string = False
+        self._escape = False        # 조각 경계에서 끊긴 이스케이프
+        self._buf: List[str] = []   # 현재 객체 원소 텍스트 (이전 조각분)
+        self._fenced = False        # 배열 밖 텍스트 기준으로 ``` 코드 블록 안인지
+        self._ticks = ""            # 조각 끝에서 끊긴 백틱
+        self.arrays: List[List[dict]] = []
+        self.fenced: List[bool] = []
+
+    def feed(self, chunk: str) -> List[dict]:
+        items: List[dict] = []
+        pos, n = 0, len(chunk)
+        obj_start = 0 if self._in_object else -1
+
+        if self._escape and n:
+            self._escape = False
+            pos = 1
+
+        while pos < n:
+            state = self._state
+            if state == self._SEEK:
+                found = chunk.find("[", pos)
+                self._track_fences(chunk[pos:] if found < 0 else chunk[pos:found])
+                if found < 0:
+                    break
+                pos = found + 1
+                self._state = self._OPENED
+                continue
+
+            if state == self._OPENED:
+                m = _NON_SPACE.search(chunk, pos)
+                if not m:
+                    break
+                ch, pos = m.group(), m.end()
+                if ch == "]":
+                    self.arrays.append([])
+                    self.fenced.append(self._fenced)
+                    self._state = self._SEEK
+                elif ch == "{":
+                    self._open_array()
+                    pos = self._object_at(chunk, m.start(), items)
+                    obj_start = m.start()
+                elif ch != "[":
+                    self._state = self._SEEK
+                continue
+
+            # 배열 내부
+            if self._in_string:
+                m = _STRING_TOKEN.search(chunk, pos)
+                if not m:
+                    break
+                pos = m.end()
+                if m.group() == "\\":
+                    if pos >= n:
+                        self._escape = True
+                    pos += 1
+                else:
+                    self._in_string = False
+                continue
+
+            if self._depth:
+                # 원소 안: 닫힌 문자열까지 한 번에 건너뛰고 괄호 / 조각 끝에서 끊긴 문자열에서 멈춤
+                pos = _SKIP_TO_STRUCT.match(chunk, pos).end()
+                if pos >= n:
+                    break
+            else:
+                m = _ELEMENT_TOKEN.search(chunk, pos)
+                if not m:
+                    break
+                pos = m.start()
+            ch, start, pos = chunk[pos], pos, pos + 1
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{" and self._depth == 0:
+                pos = self._object_at(chunk, start, items)
+                obj_start = start
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._in_object, obj_start = False, start
+                self._depth += 1
+            elif self._depth == 0:
+                self._state = self._SEEK     # 원소 사이의 "]" = 배열 끝
+            else:
+                self._depth -= 1
+                if self._depth == 0 and self._in_object:
+                    self._in_object = False
+                    item = self._load("".join(self._buf) + chunk[obj_start:pos])
+                    self._buf = []
+                    if item is not None:
+                        items.append(item)
+                        self.arrays[-1].append(item)
+
+        if self._in_object and obj_start >= 0:
+            self._buf.append(chunk[obj_start:])
+        return items
+
+    def _object_at(self, chunk: str, start: int, items: List[dict]) -> int:
+        """
+        원소 객체 시작 위치에서 한 번에 디코딩 시도 (C 구현 디코더, 대부분의 원소가 여기서 끝남).
+        조각 안에서 끝나지 않거나 깨진 객체면 구조 문자 추적으로 넘어가 다음 위치를 반환.
+        """
+        try:
+            item, end = _DECODER.raw_decode(chunk, start)
+        except json.JSONDecodeError:
+            self._depth, self._in_object = 1, True
+            self._buf = []
+            return start + 1
+        if isinstance(item, dict):
+            items.append(item)
+            self.arrays[-1].append(item)
+        return end
+
+    def _open_array(self) -> None:
+        self._state = self._ARRAY
+        self._depth = 0
+        self.arrays.append([])
+        self.fenced.append(self._fenced)
+
+    def _track_fences(self, text: str) -> None:
+        """배열 밖 텍스트의 ``` 개수로 코드 블록 안/밖 전환"""
+        text = self._ticks + text
+        if "`" not in text:
+            return
+        if text.count("```") % 2:
+            self._fenced = not self._fenced
+        self._ticks = "`" * ((len(text) - len(text.rstrip("`"))) % 3)
+
+    @staticmethod
+    def _load(text: str) -> Optional[dict]:
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            PARSE_FAILURES.inc(reason="invalid_json")
+            return None
+        return item if isinstance(item, dict) else None
+
+
+def _select_array(counts: List[int], fenced: List[bool]) -> Optional[int]:
+    """
+    최종 결과로 쓸 후보 배열: 파싱되는 이슈가 가장 많은 것.
+    같으면 ``` 코드 블록 안의 것, 그래도 같으면 나중 것 (설명문 속 예시 배열은 보통 앞에 옴).
+    """
+    return max(range(len(counts)), key=lambda a: (counts[a], fenced[a], a), default=None)
+
+
+def extract_issue_items(response_text: str) -> List[dict]:
+    """
+    전체 응답에서 최종 이슈 배열(_select_array)의 원소 반환.
+    예시 배열이 섞인 장황한 응답이나 잘린 응답(마지막 미완성 객체만 제외)도 처리.
+    """
+    scanner = JsonArrayScanner()
+    scanner.feed(response_text)
+    counts = [
+        sum(1 for i, item in enumerate(items) if parse_issue_dict(item, i) is not None)
+        for items in scanner.arrays
+    ]
+    best = _select_array(counts, scanner.fenced)
+    return scanner.arrays[best] if best is not None and counts[best] else []
+
+
+def _image_index(value) -> Optional[int]:
+    """image_index 값 해석: 2 / "2" / "Image 2" """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        match = re.search(r"\d+", value)
+        if match:
+            return int(match.group())
+    return None
 
-    if not isinstance(data, list):
-        return []
 
-    issues: List[LocalizationIssue] = []
-    for idx, item in enumerate(data):
-        if isinstance(item, dict):
+@dataclass
+class _ParsedArray:
+    """후보 배열 하나의 파싱 결과"""
+    issues: List[Tuple[int, LocalizationIssue]] = field(default_factory=list)
+    consumed: int = 0                                       # 처리한 원소 수
+    failures: Dict[str, int] = field(default_factory=dict)  # 버린 원소 수 (사유별)
+
+
+class IssueStreamParser:
+    """
+    스트리밍 응답 조각 → 완성된 (이미지 인덱스, 이슈) 목록.
+    설명문 속 예시 배열도 후보로 따라가므로 feed()가 돌려주는 이슈는 미리보기용(좌표 정규화 전)이고,
+    응답이 끝난 뒤 finish()가 후보 배열 중 하나(_select_array)의 이슈만 validate_issues로 확정.
+    image_sizes는 요청에 담은 이미지별 전송 해상도 (비디오/단일 이미지는 한 개).
+    image_index가 없거나 범위를 벗어난 이슈는 이미지가 하나일 때만 그 이미지로, 아니면 버림.
+    """
+
+    def __init__(self, image_sizes: Optional[List[Optional[Tuple[int, int]]]] = None):
+        self._sizes = image_sizes or [None]
+        self._scanner = JsonArrayScanner()
+        self._arrays: List[_ParsedArray] = []
+
+    def feed(self, chunk: str) -> List[Tuple[int, LocalizationIssue]]:
+        self._scanner.feed(chunk)
+        parsed: List[Tuple[int, LocalizationIssue]] = []
+        # 이전 조각 끝에 열려 있던 배열부터 (그 앞 배열은 이미 닫힘)
+        for a in range(max(len(self._arrays) - 1, 0), len(self._scanner.arrays)):
+            if a == len(self._arrays):
+                self._arrays.append(_ParsedArray())
+            parsed.extend(self._parse_new(self._arrays[a], self._scanner.arrays[a]))
+        return parsed
+
+    def _parse_new(self, array: _ParsedArray, items: List[dict]) -> List[Tuple[int, LocalizationIssue]]:
+        """배열에 새로 추가된 이슈 딕셔너리를 이미지별로 분배/검증"""
+        parsed: List[Tuple[int, LocalizationIssue]] = []
+        for item in items[array.consumed:]:
+            idx = array.consumed
+            array.consumed += 1
+
+            target = _image_index(item.get("image_index"))
+            if target is None or not 0 <= target < len(self._sizes):
+                if len(self._sizes) != 1:
+                    _count_failure(array, "unassigned")
+                    continue
+                target = 0
+
             issue = parse_issue_dict(item, idx)
-            if issue:
-                issues.append(issue)
-
-    return validate_issues(issues)
-
-
-def translate_suggestion_to_korean(suggestion: str) -> str:
-    """영어 suggestion을 한글로 번역 (키워드 기반)"""
-    # 이미 한글이 포함되어 있으면 반환
-    if re.search(r"[\uac00-\ud7af]", suggestion):
-        return suggestion
-
-    translations = {
-        "reduce font size": "폰트 크기를 줄이세요",
-        "expand button width": "버튼 너비를 확장하세요",
-        "text wrapping": "텍스트 줄바꿈을 적용하세요",
-        "increase container": "컨테이너 크기를 늘리세요",
-        "truncate": "텍스트를 축약하세요",
-        "translate": "텍스트를 번역하세요",
-        "fix encoding": "인코딩을 수정하세요",
-        "adjust alignment": "정렬을 조정하세요",
-        "add padding": "패딩을 추가하세요",
-        "resize": "크기를 조정하세요",
-    }
-
-    lower = suggestion.lower()
-    for key, val in translations.items():
-        if key in lower:
-            return val
-
-    return f"수정 필요: {suggestion}"
+            if issue is None:
+                _count_failure(array, "invalid_issue")
+                continue
+            array.issues.append((target, issue))
+            parsed.append((target, issue))
+        return parsed
+
+    def preview(self, target: int, issue: LocalizationIssue) -> Optional[LocalizationIssue]:
+        """미리보기용 사본 (좌표만 정규화, 잘못된 박스면 None)"""
+        location = normalize_coordinates(issue.location, self._sizes[target])
+        if location.x1 >= location.x2 or location.y1 >= location.y2:
+            return None
+        return issue.model_copy(update={"location": location})
+
+    def finish(self) -> List[List[LocalizationIssue]]:
+        """응답이 끝난 뒤: 선택된 배열의 이슈를 이미지별로 검증 (좌표 정규화/박스 필터/병합을 배열로 한 번에)"""
+        per_image: List[List[LocalizationIssue]] = [[] for _ in self._sizes]
+        best = _select_array([len(a.issues) for a in self._arrays], self._scanner.fenced)
+        if best is not None:
+            chosen = self._arrays[best]
+            for reason, count in chosen.failures.items():
+                PARSE_FAILURES.inc(count, reason=reason)
+            for target, issue in chosen.issues:
+                per_image[target].append(issue)
+        return [validate_issues(issues, size) for issues, size in zip(per_image, self._sizes)]
+
+
+def _count_failure(array: _ParsedArray, reason: str) -> None:
+    array.failures[reason] = array.failures.get(reason, 0) + 1
+
+
+@timed_stage("parse_response")
+def parse_batch_response(
+    response_text: str, image_sizes: List[Optional[Tuple[int, int]]]
+) -> List[List[LocalizationIssue]]:
+    """여러 이미지를 한 번에 분석한 응답을 이미지별 이슈 목록으로 분배"""
+    parser = IssueStreamParser(image_sizes)
+    parser.feed(response_text)
+    return parser.finish()
+
+
+@timed_stage("parse_response")
+def parse_ai_response(
+    response_text: str, image_size: Optional[Tuple[int, int]] = None
+) -> List[LocalizationIssue]:
+    """AI 응답 전체를 파싱하여 이슈 목록 반환 (image_size: 픽셀 좌표 환산 기준)"""
+    parser = IssueStreamParser([image_size])
+    parser.feed(response_text)
+    return parser.finish()[0]
+
+
+def parse_alternatives_map(response_text: str, count: int) -> List[Optional[List[str]]]:
+    """
+    배치 대체 문장 응답({"0": [...], "1": [...]}) → 항목 순서대로의 목록.
+    응답에 없거나 형식이 맞지 않는 항목은 None.
+    """
+    results: List[Optional[List[str]]] = [None] * count
+    pos = response_text.find("{")
+    while pos >= 0:
+        try:
+            data, _ = _DECODER.raw_decode(response_text, pos)
+        except json.JSONDecodeError:
+            pos = response_text.find("{", pos + 1)
+            continue
+        if isinstance(data, dict):
+            break
+        pos = response_text.find("{", pos + 1)
+    else:
+        return results
+
+    for key, value in data.items():
+        try:
+            idx = int(str(key).strip())
+        except ValueError:
+            continue
+        if 0 <= idx < count and isinstance(value, list):
+            texts = [v.strip() for v in value if isinstance(v, str) and v.strip()]
+            results[idx] = texts or None
+    return results
+
+
+# 스트리밍 중 이슈가 완성될 때마다 호출 (배치는 이미지 인덱스와 함께)
+IssueCallback = Callable[[LocalizationIssue], None]
+BatchIssueCallback = Callable[[int, LocalizationIssue], None]
@@ -0,0 +1,150 @@
+"""
+수정 제안(suggestion) 현지화
+- 대상 UI 언어별 문구 표(suggestion_phrases/<언어>.json)를 Aho-Corasick 오토마톤 하나로 컴파일
+- 제안 문장을 한 번 훑어 표 순서상 가장 앞선 문구를 찾고, 그 언어 문장으로 치환
+- 이미 대상 언어로 쓰인 제안은 그대로, 같은 제안은 메모해서 재사용
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PHRASES_DIR = Path(__file__).resolve().parent / "suggestion_phrases"
+
+# 언어별 메모 크기 (같은 제안 문장이 이슈마다 반복됨)
+_MEMO_SIZE = 4096
+
+
+def suggestion_language() -> str:
+    """수정 제안을 보여줄 UI 언어 (suggestion_phrases/<언어>.json)"""
+    return os.getenv("SUGGESTION_LANGUAGE", "ko").strip().lower() or "ko"
+
+
+class PhraseAutomaton:
+    """
+    여러 문구를 동시에 찾는 Aho-Corasick 오토마톤 (소문자 기준).
+    first_match는 텍스트 길이에 비례하는 한 번의 훑기로, 등장한 문구 중 우선순위(목록 순서)가 가장 앞선 것의 인덱스를 반환.
+    """
+
+    def __init__(self, phrases: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._best: List[Optional[int]] = [None]   # 이 상태에서 끝나는(실패 링크 포함) 최우선 문구
+
+        for priority, phrase in enumerate(phrases):
+            state = 0
+            for ch in phrase.lower():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._best.append(None)
+                    self._goto[state][ch] = nxt
+                state = nxt
+            if self._best[state] is None:
+                self._best[state] = priority
+
+        # 실패 링크 (BFS): 최우선 문구는 실패 링크 쪽 값과 비교해 미리 합쳐 둠
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None and (self._best[nxt] is None or inherited < self._best[nxt]):
+                    self._best[nxt] = inherited
+
+    def first_match(self, text: str) -> Optional[int]:
+        goto, fail, best = self._goto, self._fail, self._best
+        found: Optional[int] = None
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = best[state]
+            if hit is not None and (found is None or hit < found):
+                found = hit
+                if found == 0:
+                    break
+        return found
+
+
+class SuggestionLocalizer:
+    """한 UI 언어의 문구 표 + 컴파일된 오토마톤 + 메모"""
+
+    def __init__(self, language: str, table: dict):
+        self.language = language
+        phrases: List[Tuple[str, str]] = [(src, dst) for src, dst in table.get("phrases", [])]
+        self._targets = [dst for _, dst in phrases]
+        self._automaton = PhraseAutomaton([src for src, _ in phrases])
+        native = table.get("native")
+        self._native = re.compile(native) if native else None
+        self._fallback = table.get("fallback", "{suggestion}")
+        self.signature = hashlib.sha256(
+            json.dumps(table, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+        self.localize = lru_cache(maxsize=_MEMO_SIZE)(self._localize)
+
+    def _localize(self, suggestion: str) -> str:
+        # 이미 대상 언어로 쓰여 있으면 반환
+        if self._native and self._native.search(suggestion):
+            return suggestion
+        match = self._automaton.first_match(suggestion)
+        if match is not None:
+            return self._targets[match]
+        return self._fallback.format(suggestion=suggestion)
+
+
+_localizers: Dict[str, SuggestionLocalizer] = {}
+_lock = threading.Lock()
+
+
+# 문구 표 파일명으로 쓸 수 있는 언어 코드 (예: ko, ja, pt-br)
+_LANGUAGE_CODE = re.compile(r"[a-z]{2,3}(-[a-z0-9]+)*")
+
+
+def _load(language: str) -> SuggestionLocalizer:
+    path = PHRASES_DIR / f"{language}.json"
+    try:
+        if not _LANGUAGE_CODE.fullmatch(language):
+            raise FileNotFoundError(language)
+        table = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"[LocaLens] 수정 제안 문구 표 없음: {path.name} (제안을 그대로 표시)", flush=True)
+        table = {}
+    return SuggestionLocalizer(language, table)
+
+
+def get_localizer(language: Optional[str] = None) -> SuggestionLocalizer:
+    """언어별 현지화기 (최초 사용 시 문구 표를 읽어 컴파일)"""
+    language = language or suggestion_language()
+    localizer = _localizers.get(language)
+    if localizer is None:
+        with _lock:
+            localizer = _localizers.get(language)
+            if localizer is None:
+                localizer = _localizers[language] = _load(language)
+    return localizer
+
+
+def localize_suggestion(suggestion: str, language: Optional[str] = None) -> str:
+    """모델이 준 수정 제안을 대상 UI 언어로 (문구 표 기반)"""
+    return get_localizer(language).localize(suggestion)
+
+
+def suggestion_signature() -> str:
+    """결과 캐시 키용: 대상 언어 + 문구 표 내용"""
+    localizer = get_localizer()
+    return f"{localizer.language}:{localizer.signature}"
@@ -0,0 +1,86 @@
+"""
+이미지 전처리
+- 실제 해상도 확인, 긴 변 기준 축소 + 재인코딩 (업로드 크기 / 입력 토큰 절감)
+- 모델에 보낸 해상도를 함께 반환해 픽셀 좌표를 정확히 0-1000으로 환산
+"""
+
+import io
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+_FORMAT_MIME = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+def _max_edge() -> int:
+    """긴 변 최대 픽셀 (0 = 축소 안 함)"""
+    return int(os.getenv("IMAGE_MAX_EDGE", "2048"))
+
+
+def _quality() -> int:
+    return int(os.getenv("IMAGE_QUALITY", "90"))
+
+
+def _reencode_format() -> str:
+    """재인코딩 포맷 (JPEG / WEBP, 빈 값 = 원본 포맷 유지)"""
+    return os.getenv("IMAGE_REENCODE_FORMAT", "").strip().upper()
+
+
+def preprocess_signature() -> str:
+    """전처리 설정 식별자 (결과 캐시 키에 포함)"""
+    return f"edge={_max_edge()},q={_quality()},fmt={_reencode_format() or 'orig'}"
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    original_size: Tuple[int, int]   # 업로드 원본 (width, height)
+    sent_size: Tuple[int, int]       # 모델에 보낸 (width, height) — 픽셀 좌표 환산 기준
+
+
+def prepare_image(image_bytes: bytes) -> PreparedImage:
+    """이미지 크기 확인 후 필요 시 축소/재인코딩. 변경할 필요가 없으면 원본 바이트 그대로."""
+    img = Image.open(io.BytesIO(image_bytes))
+    src_format = (img.format or "PNG").upper()
+    original_size = img.size
+
+    max_edge = _max_edge()
+    target_format = _reencode_format() or src_format
+    needs_resize = max_edge > 0 and max(original_size) > max_edge
+    if not needs_resize and target_format == src_format:
+        return PreparedImage(
+            data=image_bytes,
+            mime_type=_FORMAT_MIME.get(src_format, "image/png"),
+            original_size=original_size,
+            sent_size=original_size,
+        )
+
+    img = ImageOps.exif_transpose(img)
+    if needs_resize:
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    if target_format not in ("JPEG", "WEBP", "PNG"):
+        target_format = "PNG"
+    if target_format == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    out = io.BytesIO()
+    if target_format == "PNG":
+        img.save(out, format="PNG", optimize=True)
+    else:
+        img.save(out, format=target_format, quality=_quality())
+
+    return PreparedImage(
+        data=out.getvalue(),
+        mime_type=_FORMAT_MIME[target_format],
+        original_size=original_size,
+        sent_size=img.size,
+    )
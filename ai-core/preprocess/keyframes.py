@@ -0,0 +1,119 @@
+"""
+비디오 키프레임 추출 (PyAV)
+- 일정 간격으로 프레임을 샘플링하고, 직전 키프레임과의 밝기 차이(장면 전환 점수)로 선별
+- 선택된 프레임은 JPEG로 인코딩해 이미지 분석 경로로 전달
+- stop_after를 주면 장면 전환이 그보다 많아지는 순간 디코딩을 멈춤 (auto 모드의 업로드 전환 판단용)
+"""
+
+import io
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import av
+from PIL import Image, ImageChops, ImageStat
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers.base import MediaSource, open_media_stream
+
+_THUMB_SIZE = (64, 36)
+
+
+def _sample_fps() -> float:
+    return float(os.getenv("VIDEO_SAMPLE_FPS", "2"))
+
+
+def _scene_threshold() -> float:
+    """장면 전환으로 볼 평균 밝기 차이 (0-255)"""
+    return float(os.getenv("VIDEO_SCENE_THRESHOLD", "12"))
+
+
+def _max_keyframes() -> int:
+    return int(os.getenv("VIDEO_MAX_KEYFRAMES", "24"))
+
+
+@dataclass
+class Keyframe:
+    timestamp: float    # 초
+    score: float        # 직전 키프레임 대비 차이 (첫 프레임은 inf)
+    image: bytes        # JPEG
+
+
+@dataclass
+class KeyframeSet:
+    frames: List[Keyframe]
+    duration: Optional[float]
+    exceeded: bool = False  # stop_after를 넘어 중간에 멈춤 (frames는 앞부분만)
+
+
+def _encode(img: Image.Image) -> bytes:
+    out = io.BytesIO()
+    img.convert("RGB").save(out, format="JPEG", quality=92)
+    return out.getvalue()
+
+
+def _duration(container, stream) -> Optional[float]:
+    if stream.duration and stream.time_base:
+        return float(stream.duration * stream.time_base)
+    if container.duration:
+        return container.duration / av.time_base
+    return None
+
+
+def probe_duration(video: MediaSource) -> Optional[float]:
+    """디코딩 없이 컨테이너 메타데이터로 길이(초) 확인"""
+    with open_media_stream(video) as stream:
+        with av.open(stream, mode="r") as container:
+            return _duration(container, container.streams.video[0])
+
+
+def extract_keyframes(
+    video: MediaSource, max_frames: Optional[int] = None, stop_after: Optional[int] = None
+) -> KeyframeSet:
+    """
+    장면 전환 점수가 임계값 이상인 프레임을 최대 max_frames개까지 선택 (시간순).
+    stop_after: 임계값을 넘는 프레임이 이보다 많아지면 나머지를 디코딩하지 않고 exceeded로 반환.
+    """
+    max_frames = max_frames or _max_keyframes()
+    interval = 1.0 / max(_sample_fps(), 0.01)
+    threshold = _scene_threshold()
+
+    frames: List[Keyframe] = []
+    last_thumb: Optional[Image.Image] = None
+    next_sample = 0.0
+    selected = 0
+
+    with open_media_stream(video) as stream:
+        with av.open(stream, mode="r") as container:
+            vstream = container.streams.video[0]
+            vstream.thread_type = "AUTO"
+            duration = _duration(container, vstream)
+
+            for frame in container.decode(vstream):
+                t = float(frame.time or 0.0)
+                if t < next_sample:
+                    continue
+                next_sample = t + interval
+
+                img = frame.to_image()
+                thumb = img.convert("L").resize(_THUMB_SIZE)
+                if last_thumb is None:
+                    score = float("inf")
+                else:
+                    score = ImageStat.Stat(ImageChops.difference(thumb, last_thumb)).mean[0]
+                    if score < threshold:
+                        continue
+                last_thumb = thumb
+                selected += 1
+                if stop_after is not None and selected > stop_after:
+                    return KeyframeSet(frames=frames, duration=duration, exceeded=True)
+
+                frames.append(Keyframe(timestamp=t, score=score, image=_encode(img)))
+                if len(frames) > max_frames:
+                    # 변화가 가장 작은 프레임부터 제외 (첫 프레임은 유지)
+                    weakest = min(range(1, len(frames)), key=lambda i: frames[i].score)
+                    del frames[weakest]
+
+    return KeyframeSet(frames=frames, duration=duration)
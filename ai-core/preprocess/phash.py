@@ -0,0 +1,60 @@
+"""
+지각 해시(dHash) 기반 유사 프레임 그룹화
+- 커서 / 애니메이션 요소 정도만 다른 스크린샷을 한 그룹으로 묶어 대표 1장만 분석
+"""
+
+import io
+from typing import List, Optional
+
+from PIL import Image
+
+HASH_SIZE = 16  # 16x16 = 256비트 (작은 텍스트 변화도 구분)
+
+
+def dhash(image_bytes: bytes, hash_size: int = HASH_SIZE) -> int:
+    """difference hash: 축소한 흑백 이미지에서 인접 픽셀 밝기 비교"""
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("L", (hash_size * 8, hash_size * 8))   # JPEG은 디코딩 단계에서 축소
+    img = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    px = img.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (px[offset + col] > px[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def group_near_duplicates(images: List[bytes], max_distance: int) -> List[List[int]]:
+    """
+    해밍 거리 max_distance 이하인 이미지끼리 그룹화.
+    각 그룹은 업로드 인덱스 목록이며 첫 번째가 대표(분석 대상).
+    해시 계산에 실패한 이미지는 단독 그룹.
+    """
+    groups: List[List[int]] = []
+    rep_hashes: List[Optional[int]] = []
+
+    for idx, data in enumerate(images):
+        try:
+            h: Optional[int] = dhash(data)
+        except Exception:
+            h = None
+
+        if h is not None:
+            for g, rep in enumerate(rep_hashes):
+                if rep is not None and hamming_distance(h, rep) <= max_distance:
+                    groups[g].append(idx)
+                    break
+            else:
+                groups.append([idx])
+                rep_hashes.append(h)
+        else:
+            groups.append([idx])
+            rep_hashes.append(None)
+
+    return groups
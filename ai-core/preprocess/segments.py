@@ -0,0 +1,138 @@
+"""
+긴 비디오 구간 분할 (PyAV, 재인코딩 없는 스트림 복사)
+- 키프레임 기준으로 일정 길이 구간으로 나누고 앞 구간과 약간 겹치게 잘라냄
+- 각 구간은 0초부터 시작하는 독립 비디오 → 결과 타임스탬프에 구간 시작 시각을 더해 원본 타임라인으로 복원
+"""
+
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+import av
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers.base import MediaSource, open_media_stream
+
+# 구간 스풀 파일이 메모리에 머무는 최대 크기 (초과 시 디스크)
+_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# 재인코딩 없이 webm에 담을 수 있는 코덱 (그 외는 mp4)
+_WEBM_CODECS = {"vp8", "vp9", "av1"}
+
+
+def segment_seconds() -> float:
+    """구간 길이(초). 이보다 긴 비디오만 분할."""
+    return float(os.getenv("VIDEO_SEGMENT_SECONDS", "60"))
+
+
+def segment_overlap() -> float:
+    """인접 구간 겹침(초). 경계에 걸친 이슈를 놓치지 않기 위함."""
+    return float(os.getenv("VIDEO_SEGMENT_OVERLAP", "2"))
+
+
+@dataclass
+class VideoSegment:
+    index: int
+    start: float        # 원본 타임라인 기준 시작 (키프레임 dts에 정렬)
+    end: float          # 원본 타임라인 기준 끝
+    mime_type: str
+    stream: BinaryIO    # 0초부터 시작하는 구간 비디오
+
+
+def _keyframe_dts(container, vstream) -> List[int]:
+    """디코딩 없이 패킷만 읽어 키프레임의 dts 수집 (구간은 디코딩 순서로 자름)"""
+    return sorted(
+        packet.dts for packet in container.demux(vstream)
+        if packet.is_keyframe and packet.dts is not None
+    )
+
+
+def _plan(keyframes: List[int], tb, duration: float, length: float, overlap: float) -> List[Tuple[int, Optional[int]]]:
+    """
+    (시작 dts, 끝 dts) 구간 목록. 경계는 length초 간격,
+    시작은 (경계 - overlap) 이전의 가장 가까운 키프레임. 마지막 구간의 끝은 None (끝까지).
+    """
+    boundaries = [0.0]
+    while boundaries[-1] + length < duration:
+        boundaries.append(boundaries[-1] + length)
+
+    windows: List[Tuple[int, Optional[int]]] = []
+    for i, lo in enumerate(boundaries):
+        target = lo - overlap if lo > 0 else 0.0
+        start = max((d for d in keyframes if d * tb <= target), default=keyframes[0])
+        end = int(boundaries[i + 1] / tb) if i + 1 < len(boundaries) else None
+        # 키프레임 간격이 길어 시작이 같아진 구간은 하나로 합침
+        if windows and windows[-1][0] == start:
+            windows[-1] = (start, end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def split_video(
+    video: MediaSource, length: Optional[float] = None, overlap: Optional[float] = None
+) -> List[VideoSegment]:
+    """
+    length초 구간으로 분할 (비디오 스트림만 복사, 오디오 제외).
+    분할할 필요가 없으면(짧거나 키프레임이 부족) 빈 목록.
+    """
+    length = length or segment_seconds()
+    overlap = segment_overlap() if overlap is None else overlap
+
+    with open_media_stream(video) as src:
+        with av.open(src, mode="r") as container:
+            vstream = container.streams.video[0]
+            tb = vstream.time_base
+            if vstream.duration:
+                duration = float(vstream.duration * tb)
+            elif container.duration:
+                duration = container.duration / av.time_base
+            else:
+                return []
+            if duration <= length:
+                return []
+            keyframes = _keyframe_dts(container, vstream)
+            fmt = "webm" if vstream.codec_context.name in _WEBM_CODECS else "mp4"
+
+        windows = _plan(keyframes, tb, duration, length, overlap) if keyframes else []
+        if len(windows) < 2:
+            return []
+
+        segments: List[VideoSegment] = []
+        outputs = []
+        try:
+            src.seek(0)
+            with av.open(src, mode="r") as container:
+                vstream = container.streams.video[0]
+                for i, (lo, hi) in enumerate(windows):
+                    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+                    out = av.open(spool, mode="w", format=fmt)
+                    outputs.append((out, out.add_stream_from_template(vstream), lo, hi))
+                    end = float(hi * tb) if hi is not None else duration
+                    segments.append(VideoSegment(i, float(lo * tb), end, f"video/{fmt}", spool))
+
+                # 패킷을 해당 구간(겹침 포함)에 그대로 기록, 구간 시작 dts를 0으로 이동
+                for packet in container.demux(vstream):
+                    if packet.dts is None:
+                        continue
+                    for out, ostream, lo, hi in outputs:
+                        if packet.dts < lo or (hi is not None and packet.dts >= hi):
+                            continue
+                        copy = av.Packet(bytes(packet))
+                        copy.pts = packet.pts - lo if packet.pts is not None else None
+                        copy.dts = packet.dts - lo
+                        copy.duration = packet.duration
+                        copy.is_keyframe = packet.is_keyframe
+                        copy.time_base = tb
+                        copy.stream = ostream
+                        out.mux(copy)
+        finally:
+            for out, _, _, _ in outputs:
+                out.close()
+
+    for seg in segments:
+        seg.stream.seek(0)
+    return segments
@@ -0,0 +1,25 @@
+"""
+대체 문장 생성용 AI 프롬프트 (여러 원문을 한 번에)
+"""
+
+import json
+from typing import List, Optional, Tuple
+
+ALTERNATIVES_BATCH_PROMPT = """다음 항목 각각의 텍스트에 대해 짧은 대체 문장을 2-3개씩 생성해줘.
+각 항목의 언어(language)로, 원본보다 짧게 작성해줘. context가 있으면 그 UI 요소에 맞게.
+
+항목 (한 줄에 하나, JSON):
+{items}
+
+키는 항목의 id 문자열, 값은 대체 문장 배열인 JSON 객체 하나로만 응답해줘.
+예: {{"0": ["대체1", "대체2"], "1": ["대체1", "대체2", "대체3"]}}"""
+
+
+def format_alternatives_batch_prompt(queries: List[Tuple[str, str, Optional[str]]]) -> str:
+    lines = []
+    for i, (text, language, context) in enumerate(queries):
+        item = {"id": str(i), "text": text, "language": language}
+        if context:
+            item["context"] = context
+        lines.append(json.dumps(item, ensure_ascii=False))
+    return ALTERNATIVES_BATCH_PROMPT.format(items="\n".join(lines))
@@ -66,3 +66,19 @@ Look carefully for:
 For each issue found, provide the bounding box coordinates (0-1000 normalized), severity, description, and a suggestion in Korean.
 
 Return your findings as a JSON array."""
+
+# 여러 장을 한 요청으로 분석할 때 각 이미지 앞에 붙이는 라벨
+IMAGE_BATCH_LABEL = "Image {index}:"
+
+IMAGE_BATCH_USER_PROMPT = """Analyze the following {count} game screenshots for localization and UI issues.
+
+Each screenshot is preceded by a label "Image N:" (N = 0 to {last}). Analyze every screenshot independently
+and look for the same issue types as above (truncation, overflow, untranslated strings, placeholders,
+font rendering, layout breaks, overlaps, alignment, cultural appropriateness).
+
+For each issue, add an "image_index" field with the N of the screenshot it was found in.
+Bounding box coordinates (0-1000 normalized) are relative to that screenshot only.
+
+Return the findings for all screenshots as a single JSON array, e.g.
+[{{"id": "issue-1", "image_index": 0, "type": "TEXT_TRUNCATION", ...}}, {{"id": "issue-2", "image_index": 2, ...}}]
+Return an empty array [] if no screenshot has issues."""
@@ -2,15 +2,155 @@
 VisionProvider 추상 베이스 클래스 + 팩토리 함수
 """
 
+import io
+import os
 import sys
+import time
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple, Union
 
 # contracts import
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from contracts.types import LocalizationIssue
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parsers.result_parser import (
+    BatchIssueCallback, IssueCallback, IssueStreamParser,
+)
+from parsers.suggestion_localizer import localize_suggestion
+from providers.rate_limit import RateLimiter, get_rate_limiter, run_provider_call
+from telemetry.metrics import observe_stage
+
+# 배치 분석 시 프로바이더별 기본 동시 호출 수
+DEFAULT_MAX_CONCURRENCY = 4
+
+# 프로바이더 입력: 바이트 / 파일 경로 / 바이너리 스트림(업로드 스풀 파일 등)
+MediaSource = Union[bytes, str, os.PathLike, BinaryIO]
+
+# 대체 문장 요청: (원문, 언어, UI 문맥)
+AlternativeQuery = Tuple[str, str, Optional[str]]
+
+# 현재 호출의 취소 신호 (헤지 요청에서 진 쪽). 설정되면 다음 응답 조각에서 CallCancelled.
+call_cancel: ContextVar[Optional[threading.Event]] = ContextVar("call_cancel", default=None)
+
+
+class CallCancelled(Exception):
+    """더 이상 필요 없어진 호출 (스트림 소비를 멈추고 연결을 닫음)"""
+
+
+@contextmanager
+def open_media_stream(source: MediaSource) -> Iterator[BinaryIO]:
+    """입력을 처음으로 되감긴 바이너리 스트림으로 제공 (전체를 메모리로 읽지 않음)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        # SpooledTemporaryFile(3.10 이하)은 IOBase가 아니므로 내부 파일 객체 사용
+        stream = source if isinstance(source, io.IOBase) else getattr(source, "_file", source)
+        stream.seek(0)
+        try:
+            yield stream
+        finally:
+            stream.seek(0)
+
+
+def read_media_bytes(source: MediaSource) -> bytes:
+    """입력 전체를 바이트로 반환 (이미지처럼 작은 입력용)"""
+    if isinstance(source, bytes):
+        return source
+    with open_media_stream(source) as stream:
+        return stream.read()
+
+
+def read_media_head(source: MediaSource, size: int = 16) -> bytes:
+    """MIME 감지용으로 앞부분 바이트만 읽기"""
+    if isinstance(source, bytes):
+        return source[:size]
+    with open_media_stream(source) as stream:
+        return stream.read(size)
+
+
+class StreamedIssues:
+    """
+    스트리밍 응답 조각을 파싱해 이미지별로 모으고, 이슈가 완성될 때마다 콜백 호출.
+    콜백은 미리보기용 사본으로 바로 호출되고(설명문 속 예시 배열의 이슈일 수도 있음),
+    최종 결과(per_image/issues)는 응답이 끝난 뒤 확정한 배열의 이슈를 validate_issues로 검증한 목록.
+    파싱에 쓴 시간은 조각마다 합산해 결과를 처음 꺼낼 때 parse_response 단계로 기록.
+    """
+
+    def __init__(
+        self,
+        image_sizes: Optional[List[Optional[Tuple[int, int]]]] = None,
+        on_issue: Optional[BatchIssueCallback] = None,
+    ):
+        self._parser = IssueStreamParser(image_sizes)
+        self._on_issue = on_issue
+        self._cancel = call_cancel.get()
+        self._parse_seconds = 0.0
+        self._results: Optional[List[List[LocalizationIssue]]] = None
+
+    def feed(self, text: Optional[str]) -> None:
+        if self._cancel is not None and self._cancel.is_set():
+            raise CallCancelled()
+        started = time.perf_counter()
+        parsed = self._parser.feed(text or "")
+        self._parse_seconds += time.perf_counter() - started
+        for target, issue in parsed:
+            issue.suggestion = localize_suggestion(issue.suggestion)
+            if self._on_issue:
+                preview = self._parser.preview(target, issue)
+                if preview is not None:
+                    self._on_issue(target, preview)
+
+    def _finish(self) -> List[List[LocalizationIssue]]:
+        if self._results is None:
+            observe_stage("parse_response", self._parse_seconds)
+            self._results = self._parser.finish()
+        return self._results
+
+    @property
+    def per_image(self) -> List[List[LocalizationIssue]]:
+        return self._finish()
+
+    @property
+    def issues(self) -> List[LocalizationIssue]:
+        """단일 이미지/비디오 요청의 이슈"""
+        return self._finish()[0]
+
+
+def fallback_alternatives(original_text: str) -> List[str]:
+    """모델 응답을 쓸 수 없을 때의 기본 대체 문장 (원문 앞부분 잘라내기)"""
+    return [original_text[:10] + "...", original_text[:8], original_text[:6]]
+
+
+def single_callback(on_issue: Optional[IssueCallback]) -> Optional[BatchIssueCallback]:
+    return (lambda _index, issue: on_issue(issue)) if on_issue else None
+
+
+def preview_once(on_issue: Optional[BatchIssueCallback]) -> Optional[BatchIssueCallback]:
+    """
+    같은 (이미지 인덱스, 이슈 id) 미리보기는 한 번만 전달.
+    한도 초과 재시도는 응답을 처음부터 다시 스트리밍하므로 호출 밖에서 만들어 시도들이 공유.
+    """
+    if on_issue is None:
+        return None
+    sent: Set[Tuple[int, str]] = set()
+    lock = threading.Lock()
+
+    def _emit(index: int, issue: LocalizationIssue) -> None:
+        with lock:
+            if (index, issue.id) in sent:
+                return
+            sent.add((index, issue.id))
+        on_issue(index, issue)
+    return _emit
+
 
 class VisionProvider(ABC):
     """AI 비전 분석 프로바이더 추상 클래스"""
@@ -25,20 +165,67 @@ class VisionProvider(ABC):
     def supports_video(self) -> bool:
         ...
 
+    @property
+    def max_concurrency(self) -> int:
+        """배치 내 동시 호출 수 제한 ({NAME}_MAX_CONCURRENCY 환경변수)"""
+        value = os.getenv(f"{self.name.upper()}_MAX_CONCURRENCY", "").strip()
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+        return DEFAULT_MAX_CONCURRENCY
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """이 프로바이더/모델의 호출 스케줄러 ({NAME}_RPM, {NAME}_TPM 환경변수)"""
+        return get_rate_limiter(self.name, getattr(self, "_model", "?"))
+
     @abstractmethod
-    def analyze_image(self, image_bytes: bytes) -> List[LocalizationIssue]:
+    def analyze_image(
+        self, image: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        """이미지 분석. on_issue는 응답 스트림에서 이슈가 완성될 때마다 (작업 스레드에서) 호출."""
         ...
 
+    def analyze_images(
+        self, images: List[MediaSource], on_issue: Optional[BatchIssueCallback] = None
+    ) -> List[List[LocalizationIssue]]:
+        """여러 이미지를 분석해 이미지별 이슈 목록 반환. 기본은 한 장씩 호출 (한 요청으로 묶으려면 오버라이드)."""
+        results = []
+        for index, image in enumerate(images):
+            callback = (lambda issue, i=index: on_issue(i, issue)) if on_issue else None
+            results.append(self.analyze_image(image, on_issue=callback))
+        return results
+
     @abstractmethod
-    def analyze_video(self, video_bytes: bytes) -> List[LocalizationIssue]:
+    def analyze_video(
+        self, video: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        """비디오 분석. 경로/스트림 입력은 메모리에 전부 올리지 않고 그대로 업로드."""
         ...
 
+    async def analyze_video_async(
+        self, video: MediaSource, on_issue: Optional[IssueCallback] = None, sha256: Optional[str] = None
+    ) -> List[LocalizationIssue]:
+        """
+        비동기 비디오 분석. 기본은 analyze_video를 스레드에서 실행.
+        sha256: 업로드 검증 때 계산한 입력 내용 해시 (원격 파일 재사용 키, 다시 읽어 계산하지 않도록)
+        """
+        return await run_provider_call(self.analyze_video, video, on_issue)
+
+    async def aclose(self) -> None:
+        """앱 종료 시 원격 리소스(업로드 파일 등) 정리. 기본은 없음."""
+
     @abstractmethod
     def generate_alternative_texts(
         self, original_text: str, language: str, context: str | None = None
     ) -> List[str]:
         ...
 
+    def generate_alternative_texts_batch(
+        self, queries: List[AlternativeQuery]
+    ) -> List[Optional[List[str]]]:
+        """여러 원문의 대체 문장을 한 번에 생성 (응답에 빠진 항목은 None). 기본은 하나씩 호출."""
+        return [self.generate_alternative_texts(*query) for query in queries]
+
 
 def get_provider(provider_name: str) -> VisionProvider:
     """프로바이더 팩토리 함수"""
@@ -8,7 +8,7 @@ import sys
 import json
 import base64
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import anthropic
 
@@ -16,22 +16,18 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from contracts.types import LocalizationIssue
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from prompts.image_analysis import IMAGE_SYSTEM_PROMPT, IMAGE_USER_PROMPT
-from parsers.result_parser import parse_ai_response, validate_issues, translate_suggestion_to_korean
-from providers.base import VisionProvider
-
-
-def _detect_media_type(image_bytes: bytes) -> str:
-    """이미지 바이트에서 media_type 감지"""
-    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
-        return "image/png"
-    elif image_bytes[:3] == b"\xff\xd8\xff":
-        return "image/jpeg"
-    elif image_bytes[:4] == b"GIF8":
-        return "image/gif"
-    elif image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
-        return "image/webp"
-    return "image/png"
+from prompts.alternatives import format_alternatives_batch_prompt
+from prompts.image_analysis import (
+    IMAGE_SYSTEM_PROMPT, IMAGE_USER_PROMPT, IMAGE_BATCH_LABEL, IMAGE_BATCH_USER_PROMPT,
+)
+from parsers.result_parser import BatchIssueCallback, IssueCallback, parse_alternatives_map
+from preprocess.image_preprocessor import prepare_image
+from providers.base import (
+    AlternativeQuery, MediaSource, StreamedIssues, VisionProvider,
+    fallback_alternatives, preview_once, read_media_bytes, single_callback,
+)
+from providers.rate_limit import Permit, call_with_retry, estimate_tokens
+from providers.usage import record_usage
 
 
 class ClaudeClient(VisionProvider):
@@ -52,12 +48,14 @@ class ClaudeClient(VisionProvider):
     def supports_video(self) -> bool:
         return False
 
-    def analyze_image(self, image_bytes: bytes) -> List[LocalizationIssue]:
-        b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
-        media_type = _detect_media_type(image_bytes)
+    def analyze_image(
+        self, image: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        prepared = prepare_image(read_media_bytes(image))
+        b64 = base64.standard_b64encode(prepared.data).decode("utf-8")
+        media_type = prepared.mime_type
 
-        response = self._client.messages.create(
-            model=self._model,
+        request = dict(
             max_tokens=4096,
             system=IMAGE_SYSTEM_PROMPT,
             messages=[
@@ -81,13 +79,90 @@ class ClaudeClient(VisionProvider):
             ],
         )
 
-        text = response.content[0].text
-        issues = parse_ai_response(text)
-        for issue in issues:
-            issue.suggestion = translate_suggestion_to_korean(issue.suggestion)
-        return validate_issues(issues)
+        preview = preview_once(single_callback(on_issue))
+
+        def _call(permit: Permit) -> List[LocalizationIssue]:
+            streamed = StreamedIssues([prepared.sent_size], preview)
+            self._stream(permit, streamed, request)
+            return streamed.issues
+
+        return call_with_retry(
+            self.rate_limiter, _call, estimate_tokens(IMAGE_SYSTEM_PROMPT + IMAGE_USER_PROMPT, 1, 4096)
+        )
+
+    def analyze_images(
+        self, images: List[MediaSource], on_issue: Optional[BatchIssueCallback] = None
+    ) -> List[List[LocalizationIssue]]:
+        """여러 장을 라벨("Image N:")을 붙여 한 메시지로 분석 (시스템 프롬프트는 한 번만)"""
+        if len(images) == 1:
+            return super().analyze_images(images, on_issue)
+
+        prepared = [prepare_image(read_media_bytes(image)) for image in images]
+        content = []
+        for index, p in enumerate(prepared):
+            content.append({"type": "text", "text": IMAGE_BATCH_LABEL.format(index=index)})
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": p.mime_type,
+                    "data": base64.standard_b64encode(p.data).decode("utf-8"),
+                },
+            })
+        content.append({
+            "type": "text",
+            "text": IMAGE_BATCH_USER_PROMPT.format(count=len(prepared), last=len(prepared) - 1),
+        })
+
+        request = dict(
+            max_tokens=4096 * min(len(prepared), 4),
+            system=IMAGE_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": content}],
+        )
 
-    def analyze_video(self, video_bytes: bytes) -> List[LocalizationIssue]:
+        preview = preview_once(on_issue)
+
+        def _call(permit: Permit) -> List[List[LocalizationIssue]]:
+            streamed = StreamedIssues([p.sent_size for p in prepared], preview)
+            self._stream(permit, streamed, request)
+            return streamed.per_image
+
+        return call_with_retry(
+            self.rate_limiter,
+            _call,
+            estimate_tokens(IMAGE_SYSTEM_PROMPT, len(prepared), request["max_tokens"]),
+        )
+
+    def _stream(self, permit: Permit, streamed: StreamedIssues, request: dict) -> None:
+        """스트리밍 분석 호출 한 번 (최종 메시지의 usage로 토큰 버킷 보정)"""
+        with self._client.messages.stream(model=self._model, **request) as stream:
+            for text in stream.text_stream:
+                streamed.feed(text)
+            usage = stream.get_final_message().usage
+        self._record(permit, usage)
+
+    def _create(self, permit: Permit, **request):
+        response = self._client.messages.create(model=self._model, **request)
+        self._record(permit, response.usage)
+        return response
+
+    def _record(self, permit: Permit, usage) -> None:
+        """토큰 사용량 기록 + 토큰 버킷 보정 (input_tokens는 캐시되지 않은 입력만)"""
+        cache_read = usage.cache_read_input_tokens or 0
+        cache_write = usage.cache_creation_input_tokens or 0
+        record_usage(
+            self.name,
+            self._model,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        )
+        permit.record(usage.input_tokens + cache_read + cache_write + usage.output_tokens)
+
+    def analyze_video(
+        self, video: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
         raise NotImplementedError(
             "Claude는 비디오 분석을 지원하지 않습니다. Gemini를 사용해 주세요."
         )
@@ -103,10 +178,12 @@ class ClaudeClient(VisionProvider):
             f"같은 언어로, 더 짧게 작성해줘.\n"
             f'JSON 배열로만 응답해줘. 예: ["대체1", "대체2", "대체3"]'
         )
-        response = self._client.messages.create(
-            model=self._model,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}],
+        response = call_with_retry(
+            self.rate_limiter,
+            lambda permit: self._create(
+                permit, max_tokens=1024, messages=[{"role": "user", "content": prompt}]
+            ),
+            estimate_tokens(prompt, max_output=1024),
         )
         try:
             text = response.content[0].text.strip()
@@ -116,4 +193,20 @@ class ClaudeClient(VisionProvider):
                 return json.loads(text[start:end])
         except Exception:
             pass
-        return [original_text[:10] + "...", original_text[:8], original_text[:6]]
+        return fallback_alternatives(original_text)
+
+    def generate_alternative_texts_batch(
+        self, queries: List[AlternativeQuery]
+    ) -> List[Optional[List[str]]]:
+        """여러 원문을 한 메시지로 (id → 대체 문장 배열 JSON 객체로 응답)"""
+        prompt = format_alternatives_batch_prompt(queries)
+        max_tokens = 1024 + 128 * len(queries)
+        response = call_with_retry(
+            self.rate_limiter,
+            lambda permit: self._create(
+                permit, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}]
+            ),
+            estimate_tokens(prompt, max_output=max_tokens),
+        )
+        text = "".join(block.text for block in response.content if block.type == "text")
+        return parse_alternatives_map(text, len(queries))
@@ -4,16 +4,14 @@ Gemini Vision 클라이언트
 새 google.genai SDK 사용
 """
 
-import io
 import os
 import sys
 import json
 import time
-import tempfile
+import asyncio
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from PIL import Image
 from google import genai
 from google.genai import types
 
@@ -21,10 +19,26 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from contracts.types import LocalizationIssue
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from prompts.image_analysis import IMAGE_SYSTEM_PROMPT, IMAGE_USER_PROMPT
+from prompts.alternatives import format_alternatives_batch_prompt
+from prompts.image_analysis import (
+    IMAGE_SYSTEM_PROMPT, IMAGE_USER_PROMPT, IMAGE_BATCH_LABEL, IMAGE_BATCH_USER_PROMPT,
+)
 from prompts.video_analysis import VIDEO_SYSTEM_PROMPT, VIDEO_USER_PROMPT
-from parsers.result_parser import parse_ai_response, validate_issues, translate_suggestion_to_korean
-from providers.base import VisionProvider
+from parsers.result_parser import BatchIssueCallback, IssueCallback, parse_alternatives_map
+from preprocess.image_preprocessor import prepare_image
+from providers.base import (
+    AlternativeQuery, MediaSource, StreamedIssues, VisionProvider, fallback_alternatives,
+    open_media_stream, preview_once, read_media_bytes, read_media_head, single_callback,
+)
+from providers.gemini_uploads import get_upload_manager, poll_delays
+from providers.rate_limit import (
+    VIDEO_TOKEN_ESTIMATE, Permit, call_with_retry, call_with_retry_async, estimate_tokens,
+)
+from providers.usage import record_usage
+from telemetry.metrics import observe_stage
+
+# 이미지 분석 응답 토큰 추정치 (실제 사용량은 응답의 usage_metadata로 보정)
+_ANALYSIS_OUTPUT_ESTIMATE = 4096
 
 
 class GeminiClient(VisionProvider):
@@ -45,75 +59,179 @@ class GeminiClient(VisionProvider):
     def supports_video(self) -> bool:
         return True
 
-    def analyze_image(self, image_bytes: bytes) -> List[LocalizationIssue]:
-        prompt = f"{IMAGE_SYSTEM_PROMPT}\n\n{IMAGE_USER_PROMPT}"
+    def analyze_image(
+        self, image: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        prepared = prepare_image(read_media_bytes(image))
 
-        response = self._client.models.generate_content(
-            model=self._model,
-            contents=[
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part.from_text(text=prompt),
-                        types.Part.from_bytes(data=image_bytes, mime_type=self._detect_image_mime(image_bytes)),
-                    ],
-                )
-            ],
-            config=types.GenerateContentConfig(temperature=0.2),
+        contents = [
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_text(text=IMAGE_USER_PROMPT),
+                    types.Part.from_bytes(data=prepared.data, mime_type=prepared.mime_type),
+                ],
+            )
+        ]
+
+        preview = preview_once(single_callback(on_issue))
+
+        def _call(permit: Permit) -> List[LocalizationIssue]:
+            streamed = StreamedIssues([prepared.sent_size], preview)
+            self._stream(permit, contents, streamed, IMAGE_SYSTEM_PROMPT)
+            return streamed.issues
+
+        return call_with_retry(
+            self.rate_limiter,
+            _call,
+            estimate_tokens(IMAGE_SYSTEM_PROMPT + IMAGE_USER_PROMPT, 1, _ANALYSIS_OUTPUT_ESTIMATE),
         )
 
-        issues = parse_ai_response(response.text)
-        for issue in issues:
-            issue.suggestion = translate_suggestion_to_korean(issue.suggestion)
-        return validate_issues(issues)
+    def analyze_images(
+        self, images: List[MediaSource], on_issue: Optional[BatchIssueCallback] = None
+    ) -> List[List[LocalizationIssue]]:
+        """여러 장을 라벨("Image N:")을 붙여 한 요청으로 분석"""
+        if len(images) == 1:
+            return super().analyze_images(images, on_issue)
 
-    def analyze_video(self, video_bytes: bytes) -> List[LocalizationIssue]:
-        # 임시 파일로 저장 후 업로드
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-            tmp.write(video_bytes)
-            tmp_path = tmp.name
+        prepared = [prepare_image(read_media_bytes(image)) for image in images]
+        batch_prompt = IMAGE_BATCH_USER_PROMPT.format(count=len(prepared), last=len(prepared) - 1)
+        parts = [types.Part.from_text(text=batch_prompt)]
+        for index, p in enumerate(prepared):
+            parts.append(types.Part.from_text(text=IMAGE_BATCH_LABEL.format(index=index)))
+            parts.append(types.Part.from_bytes(data=p.data, mime_type=p.mime_type))
 
-        try:
-            # 파일 업로드
-            uploaded = self._client.files.upload(file=tmp_path)
+        contents = [types.Content(role="user", parts=parts)]
+
+        preview = preview_once(on_issue)
 
-            # 처리 완료 대기
+        def _call(permit: Permit) -> List[List[LocalizationIssue]]:
+            streamed = StreamedIssues([p.sent_size for p in prepared], preview)
+            self._stream(permit, contents, streamed, IMAGE_SYSTEM_PROMPT)
+            return streamed.per_image
+
+        return call_with_retry(
+            self.rate_limiter,
+            _call,
+            estimate_tokens(
+                IMAGE_SYSTEM_PROMPT + batch_prompt, len(prepared), _ANALYSIS_OUTPUT_ESTIMATE * len(prepared)
+            ),
+        )
+
+    def analyze_video(
+        self, video: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        """동기 버전 (스크립트용): 매번 업로드 후 분석, 성공/실패와 관계없이 원격 파일 삭제"""
+        mime_type = self._detect_video_mime(read_media_head(video))
+
+        # 스풀 파일/경로를 그대로 스트리밍 업로드 (임시 파일 복사 없음)
+        started = time.perf_counter()
+        with open_media_stream(video) as stream:
+            uploaded = self._client.files.upload(
+                file=stream, config=types.UploadFileConfig(mime_type=mime_type)
+            )
+        try:
+            delays = poll_delays()
             while uploaded.state == "PROCESSING":
-                time.sleep(2)
+                time.sleep(next(delays))
                 uploaded = self._client.files.get(name=uploaded.name)
-
+            observe_stage("gemini_upload", time.perf_counter() - started)
             if uploaded.state == "FAILED":
                 raise RuntimeError("비디오 처리 실패")
 
-            prompt = f"{VIDEO_SYSTEM_PROMPT}\n\n{VIDEO_USER_PROMPT}"
-
-            response = self._client.models.generate_content(
-                model=self._model,
-                contents=[
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type),
-                            types.Part.from_text(text=prompt),
-                        ],
-                    )
-                ],
-                config=types.GenerateContentConfig(temperature=0.2),
-            )
+            contents = self._video_contents(uploaded.uri, uploaded.mime_type)
+
+            preview = preview_once(single_callback(on_issue))
 
-            issues = parse_ai_response(response.text)
-            for issue in issues:
-                issue.suggestion = translate_suggestion_to_korean(issue.suggestion)
+            def _call(permit: Permit) -> StreamedIssues:
+                streamed = StreamedIssues(on_issue=preview)
+                self._stream(permit, contents, streamed, VIDEO_SYSTEM_PROMPT)
+                return streamed
 
-            # 업로드 파일 삭제
+            streamed = call_with_retry(self.rate_limiter, _call, VIDEO_TOKEN_ESTIMATE)
+        finally:
             try:
                 self._client.files.delete(name=uploaded.name)
             except Exception:
                 pass
 
-            return validate_issues(issues)
-        finally:
-            os.unlink(tmp_path)
+        return streamed.issues
+
+    async def analyze_video_async(
+        self, video: MediaSource, on_issue: Optional[IssueCallback] = None, sha256: Optional[str] = None
+    ) -> List[LocalizationIssue]:
+        """업로드 관리자 경유: 같은 내용은 원격 파일 재사용, 처리 대기는 이벤트 루프에서 백오프 폴링"""
+        mime_type = self._detect_video_mime(await asyncio.to_thread(read_media_head, video))
+
+        async with get_upload_manager().use(self._client, video, mime_type, sha256) as uploaded:
+            contents = self._video_contents(uploaded.uri, uploaded.mime_type)
+
+            preview = preview_once(single_callback(on_issue))
+
+            async def _call(permit: Permit) -> List[LocalizationIssue]:
+                streamed = StreamedIssues(on_issue=preview)
+                usage = None
+                async for chunk in await self._client.aio.models.generate_content_stream(
+                    model=self._model, contents=contents, config=self._analysis_config(VIDEO_SYSTEM_PROMPT),
+                ):
+                    streamed.feed(chunk.text)
+                    usage = chunk.usage_metadata or usage
+                self._record(permit, usage)
+                return streamed.issues
+
+            return await call_with_retry_async(self.rate_limiter, _call, VIDEO_TOKEN_ESTIMATE)
+
+    async def aclose(self) -> None:
+        await get_upload_manager().aclose()
+
+    @staticmethod
+    def _analysis_config(system_prompt: str) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(temperature=0.2, system_instruction=system_prompt)
+
+    def _stream(
+        self, permit: Permit, contents: List[types.Content], streamed: StreamedIssues, system_prompt: str
+    ) -> None:
+        """스트리밍 분석 호출 한 번 (마지막 조각의 usage_metadata로 토큰 버킷 보정)"""
+        usage = None
+        for chunk in self._client.models.generate_content_stream(
+            model=self._model, contents=contents, config=self._analysis_config(system_prompt),
+        ):
+            streamed.feed(chunk.text)
+            usage = chunk.usage_metadata or usage
+        self._record(permit, usage)
+
+    def _record(self, permit: Permit, usage: Optional[types.GenerateContentResponseUsageMetadata]) -> None:
+        """토큰 사용량 기록 + 토큰 버킷 보정 (마지막 조각/응답의 usage_metadata)"""
+        if usage is None:
+            return
+        cached = usage.cached_content_token_count or 0
+        record_usage(
+            self.name,
+            self._model,
+            input_tokens=(usage.prompt_token_count or 0) - cached,
+            output_tokens=(usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0),
+            cache_read_tokens=cached,
+        )
+        permit.record(usage.total_token_count)
+
+    def _generate(self, permit: Permit, contents, config: types.GenerateContentConfig):
+        response = self._client.models.generate_content(
+            model=self._model, contents=contents, config=config,
+        )
+        self._record(permit, response.usage_metadata)
+        return response
+
+    @staticmethod
+    def _video_contents(file_uri: str, mime_type: str) -> List[types.Content]:
+        return [
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_uri(file_uri=file_uri, mime_type=mime_type),
+                    types.Part.from_text(text=VIDEO_USER_PROMPT),
+                ],
+            )
+        ]
 
     def generate_alternative_texts(
         self, original_text: str, language: str, context: str | None = None
@@ -126,10 +244,12 @@ class GeminiClient(VisionProvider):
             f"같은 언어로, 더 짧게 작성해줘.\n"
             f'JSON 배열로만 응답해줘. 예: ["대체1", "대체2", "대체3"]'
         )
-        response = self._client.models.generate_content(
-            model=self._model,
-            contents=prompt,
-            config=types.GenerateContentConfig(temperature=0.5),
+        response = call_with_retry(
+            self.rate_limiter,
+            lambda permit: self._generate(
+                permit, prompt, types.GenerateContentConfig(temperature=0.5)
+            ),
+            estimate_tokens(prompt, max_output=1024),
         )
         try:
             text = response.text.strip()
@@ -139,16 +259,25 @@ class GeminiClient(VisionProvider):
                 return json.loads(text[start:end])
         except Exception:
             pass
-        return [original_text[:10] + "...", original_text[:8], original_text[:6]]
+        return fallback_alternatives(original_text)
+
+    def generate_alternative_texts_batch(
+        self, queries: List[AlternativeQuery]
+    ) -> List[Optional[List[str]]]:
+        """여러 원문을 한 요청으로 (id → 대체 문장 배열 JSON 객체로 응답)"""
+        prompt = format_alternatives_batch_prompt(queries)
+        config = types.GenerateContentConfig(temperature=0.5, response_mime_type="application/json")
+        response = call_with_retry(
+            self.rate_limiter,
+            lambda permit: self._generate(permit, prompt, config),
+            estimate_tokens(prompt, max_output=128 * len(queries)),
+        )
+        return parse_alternatives_map(response.text or "", len(queries))
 
     @staticmethod
-    def _detect_image_mime(image_bytes: bytes) -> str:
-        if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
-            return "image/png"
-        elif image_bytes[:3] == b"\xff\xd8\xff":
-            return "image/jpeg"
-        elif image_bytes[:4] == b"GIF8":
-            return "image/gif"
-        elif image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
-            return "image/webp"
-        return "image/png"
+    def _detect_video_mime(head: bytes) -> str:
+        if head[:4] == b"\x1a\x45\xdf\xa3":
+            return "video/webm"
+        elif head[8:10] == b"qt":
+            return "video/quicktime"
+        return "video/mp4"
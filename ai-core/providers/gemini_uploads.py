@@ -0,0 +1,241 @@
+"""
+Gemini Files API 업로드 관리
+- 내용 해시 기준으로 업로드한 원격 파일을 만료 전까지 재사용 (같은 비디오 재분석 시 업로드 생략)
+- 처리 완료 대기는 asyncio + 지수 백오프/지터로 (스레드를 막지 않음)
+- 처리 실패/취소/만료/종료 시 원격 파일 삭제 보장
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import asyncio
+import hashlib
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from google.genai import errors, types
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers.base import MediaSource, open_media_stream
+from telemetry.metrics import stage_timer
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# 처리 상태 폴링 간격 (초): 초기값부터 두 배씩, 최대값까지
+_POLL_INITIAL = 1.0
+_POLL_MAX = 10.0
+
+# 원격 만료 시각보다 이만큼 일찍 재사용 중단 (분석 도중 만료 방지)
+_EXPIRY_MARGIN = 10 * 60
+
+
+def _reuse_seconds() -> int:
+    """업로드 재사용 기간 (0 = 재사용 안 함, 분석 후 바로 삭제)"""
+    return int(os.getenv("GEMINI_UPLOAD_REUSE_SECONDS", "3600"))
+
+
+def _processing_timeout() -> float:
+    return float(os.getenv("GEMINI_UPLOAD_TIMEOUT", "300"))
+
+
+def content_hash(video: MediaSource) -> str:
+    """업로드 재사용 키 (sha256, 청크 단위)"""
+    digest = hashlib.sha256()
+    with open_media_stream(video) as stream:
+        for chunk in iter(lambda: stream.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _own_source(video: MediaSource) -> MediaSource:
+    """
+    공유 업로드 작업 전용 입력. 요청의 스트림은 그 요청이 끝나면 닫히므로
+    파일 경로가 있으면 경로로 다시 열고, 없으면 임시 파일로 복사 (바이트/경로는 그대로).
+    """
+    if isinstance(video, (bytes, bytearray, memoryview, str, os.PathLike)):
+        return video
+    name = getattr(video, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    copy = tempfile.TemporaryFile()
+    with open_media_stream(video) as stream:
+        shutil.copyfileobj(stream, copy, _HASH_CHUNK_SIZE)
+    copy.seek(0)
+    return copy
+
+
+def _release(source: MediaSource) -> None:
+    if hasattr(source, "close"):
+        source.close()
+
+
+def poll_delays(initial: float = _POLL_INITIAL, maximum: float = _POLL_MAX):
+    """지수 백오프 + 지터 대기 시간 (무한 제너레이터)"""
+    delay = initial
+    while True:
+        yield delay * random.uniform(0.5, 1.0)
+        delay = min(delay * 2, maximum)
+
+
+@dataclass
+class UploadedFile:
+    name: str
+    uri: str
+    mime_type: str
+    client: object            # 삭제에 사용할 genai.Client
+    expires_at: float         # 재사용 만료 (time.time 기준)
+    users: int = 0            # 현재 이 파일로 분석 중인 요청 수
+    valid: bool = True        # False면 사용이 끝나는 대로 삭제
+
+
+class GeminiUploadManager:
+    """내용 해시 → 원격 파일. 한 이벤트 루프(백엔드 메인 루프)에서 사용."""
+
+    def __init__(self):
+        self._files: Dict[str, UploadedFile] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @asynccontextmanager
+    async def use(
+        self, client, video: MediaSource, mime_type: str, sha256: Optional[str] = None
+    ) -> AsyncIterator[UploadedFile]:
+        """
+        처리 완료된 원격 파일을 빌려줌. 블록을 벗어나면 재사용 기간에 따라 보관 또는 삭제.
+        sha256: 업로드 검증 때 계산한 내용 해시 (없을 때만 입력을 다시 읽어 계산)
+        """
+        await self._sweep()
+        key = sha256 or await asyncio.to_thread(content_hash, video)
+        uploaded = await self._acquire(client, key, video, mime_type)
+        uploaded.users += 1
+        try:
+            yield uploaded
+        except errors.ClientError as e:
+            # 원격 파일이 사라졌거나 접근 불가 → 재사용 목록에서 제외
+            if e.code in (403, 404):
+                self._invalidate(key, uploaded)
+            raise
+        finally:
+            uploaded.users -= 1
+            if _reuse_seconds() <= 0:
+                self._invalidate(key, uploaded)
+            if not uploaded.valid and uploaded.users == 0:
+                await _delete_quietly(uploaded.client, uploaded.name)
+
+    async def _acquire(self, client, key: str, video: MediaSource, mime_type: str) -> UploadedFile:
+        cached = self._files.get(key)
+        if cached is not None and cached.valid and cached.expires_at > time.time():
+            return cached
+
+        # 같은 내용을 동시에 요청하면 업로드 한 번을 공유
+        task = self._shared_upload(key)
+        if task is None:
+            # 업로드 작업은 처음 요청보다 오래 살 수 있으므로 그 요청의 스트림 대신 전용 입력으로
+            source = await asyncio.to_thread(_own_source, video)
+            task = self._shared_upload(key)     # 복사하는 동안 다른 요청이 시작했으면 그쪽을 공유
+            if task is None:
+                task = asyncio.ensure_future(self._upload(client, key, source, mime_type))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+            else:
+                _release(source)
+        return await asyncio.shield(task)
+
+    def _shared_upload(self, key: str) -> Optional[asyncio.Task]:
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    async def _upload(self, client, key: str, source: MediaSource, mime_type: str) -> UploadedFile:
+        """source는 이 작업 소유 (끝나면 닫음)"""
+        with stage_timer("gemini_upload"):
+            try:
+                with open_media_stream(source) as stream:
+                    file = await client.aio.files.upload(
+                        file=stream, config=types.UploadFileConfig(mime_type=mime_type)
+                    )
+            finally:
+                _release(source)
+            try:
+                file = await _wait_active(client, file)
+            except BaseException:
+                await _delete_quietly(client, file.name)
+                raise
+
+        expires_at = time.time() + _reuse_seconds()
+        if file.expiration_time:
+            expires_at = min(expires_at, file.expiration_time.timestamp() - _EXPIRY_MARGIN)
+        uploaded = UploadedFile(
+            name=file.name, uri=file.uri, mime_type=file.mime_type or mime_type,
+            client=client, expires_at=expires_at,
+        )
+        previous = self._files.get(key)
+        self._files[key] = uploaded
+        if previous is not None:
+            self._invalidate(key, previous)
+            if previous.users == 0:
+                await _delete_quietly(previous.client, previous.name)
+        return uploaded
+
+    def _invalidate(self, key: str, uploaded: UploadedFile) -> None:
+        uploaded.valid = False
+        if self._files.get(key) is uploaded:
+            del self._files[key]
+
+    async def _sweep(self) -> None:
+        """재사용 기간이 지난 미사용 파일 삭제"""
+        now = time.time()
+        for key, uploaded in list(self._files.items()):
+            if uploaded.expires_at <= now and uploaded.users == 0:
+                self._invalidate(key, uploaded)
+                await _delete_quietly(uploaded.client, uploaded.name)
+
+    async def aclose(self) -> None:
+        """진행 중 업로드 취소 + 보관 중인 원격 파일 모두 삭제 (앱 종료 시)"""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        files = list(self._files.items())
+        for key, uploaded in files:
+            self._invalidate(key, uploaded)
+        await asyncio.gather(*(_delete_quietly(u.client, u.name) for _, u in files))
+
+    def stats(self) -> Dict[str, int]:
+        return {"files": len(self._files), "inflight": len(self._inflight)}
+
+
+async def _wait_active(client, file: types.File) -> types.File:
+    """PROCESSING이 끝날 때까지 백오프 폴링"""
+    deadline = time.monotonic() + _processing_timeout()
+    delays = poll_delays()
+    while file.state == "PROCESSING":
+        if time.monotonic() > deadline:
+            raise TimeoutError("비디오 처리 시간 초과")
+        await asyncio.sleep(next(delays))
+        file = await client.aio.files.get(name=file.name)
+    if file.state == "FAILED":
+        raise RuntimeError("비디오 처리 실패")
+    return file
+
+
+async def _delete_quietly(client, name: str) -> None:
+    try:
+        await client.aio.files.delete(name=name)
+    except Exception:
+        pass
+
+
+_manager: Optional[GeminiUploadManager] = None
+
+
+def get_upload_manager() -> GeminiUploadManager:
+    """프로세스 전역 업로드 관리자 (프로바이더 핫 리로드 후에도 유지)"""
+    global _manager
+    if _manager is None:
+        _manager = GeminiUploadManager()
+    return _manager
@@ -0,0 +1,276 @@
+"""
+헤지 요청 (이미지 분석 꼬리 지연 줄이기)
+- 프로바이더별 최근 analyze_image 호출 시간을 기록 (LatencyHistogram, 한도 대기/재시도 백오프 제외)
+- 호출이 최근 지연의 HEDGE_PERCENTILE 분위수 안에 끝나지 않으면 같은 이미지를 한 번 더 요청
+  (HEDGE_PROVIDER: 비우면 같은 프로바이더, 예: claude), 먼저 끝난 결과를 쓰고 나머지는 취소
+- 추가 호출은 전체 호출의 HEDGE_MAX_RATIO 이하로 제한, 예비 프로바이더가 한도 대기 중이면 보내지 않음
+"""
+
+import os
+import sys
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from contracts.types import LocalizationIssue
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parsers.result_parser import IssueCallback
+from providers.base import MediaSource, VisionProvider, call_cancel, read_media_bytes
+from providers.rate_limit import call_observer
+
+# 분위수 계산에 쓰는 최근 호출 수
+_WINDOW = 200
+
+# 헤지 호출용 작업 스레드 (진 쪽은 다음 응답 조각에서 멈추므로 오래 점유하지 않음)
+_EXECUTOR_THREADS = 32
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+
+
+def hedge_provider_name() -> str:
+    """헤지 요청을 보낼 프로바이더 (비우면 원래 프로바이더)"""
+    return os.getenv("HEDGE_PROVIDER", "").strip()
+
+
+def _hedge_percentile() -> float:
+    return min(max(float(os.getenv("HEDGE_PERCENTILE", "95")), 50.0), 99.9)
+
+
+def _hedge_max_ratio() -> float:
+    return max(float(os.getenv("HEDGE_MAX_RATIO", "0.1")), 0.0)
+
+
+def _hedge_min_samples() -> int:
+    return max(int(os.getenv("HEDGE_MIN_SAMPLES", "20")), 1)
+
+
+class LatencyHistogram:
+    """프로바이더 하나의 최근 호출 지연 시간 (초)"""
+
+    def __init__(self, window: int = _WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """최근 지연의 p 분위수 (표본이 min_samples 미만이면 None)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+_counters = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+_counters_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_latency_histogram(provider_name: str) -> LatencyHistogram:
+    histogram = _histograms.get(provider_name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(provider_name, LatencyHistogram())
+    return histogram
+
+
+def _count(key: str) -> None:
+    with _counters_lock:
+        _counters[key] += 1
+
+
+def _timed_call(provider: VisionProvider, image: MediaSource, on_issue: Optional[IssueCallback]):
+    """
+    analyze_image 호출 + 프로바이더 호출 시간 기록 (재시도했으면 마지막 시도).
+    한도 대기/백오프는 빼고 기록 (넣으면 한도에 걸린 동안 헤지 기준이 대기 시간을 배움).
+    취소(헤지에서 진 쪽)/실패한 호출도 그때까지의 경과를 하한값으로 기록
+    (느린 호출을 빼면 분포의 꼬리가 사라져 헤지 기준이 점점 내려감).
+    """
+    seconds: List[float] = []
+    token = call_observer.set(seconds.append)
+    try:
+        return provider.analyze_image(image, on_issue)
+    finally:
+        call_observer.reset(token)
+        if seconds:
+            get_latency_histogram(provider.name).record(seconds[-1])
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _histograms_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(_EXECUTOR_THREADS, thread_name_prefix="hedge")
+    return _executor
+
+
+class _Attempt:
+    """경쟁 중인 호출 하나 (취소 신호 + 결과 Future)"""
+
+    def __init__(self, provider: VisionProvider, data: bytes, on_issue: Optional[IssueCallback]):
+        self.provider = provider
+        self.cancel = threading.Event()
+        # 요청 우선순위 등 컨텍스트를 작업 스레드로 전달
+        context = contextvars.copy_context()
+        self.future: Future = _get_executor().submit(context.run, self._run, data, on_issue)
+
+    def _run(self, data: bytes, on_issue: Optional[IssueCallback]) -> List[LocalizationIssue]:
+        call_cancel.set(self.cancel)
+        return _timed_call(self.provider, data, on_issue)
+
+    def succeeded(self) -> bool:
+        return self.future.done() and self.future.exception() is None
+
+
+class _PreviewOwner:
+    """이슈 미리보기는 먼저 이슈를 낸 호출 하나의 것만 전달 (중복 미리보기 방지)"""
+
+    def __init__(self, on_issue: Optional[IssueCallback]):
+        self._on_issue = on_issue
+        self._owner: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def callback(self, index: int) -> Optional[IssueCallback]:
+        if self._on_issue is None:
+            return None
+
+        def _emit(issue: LocalizationIssue) -> None:
+            with self._lock:
+                if self._owner is None:
+                    self._owner = index
+            if self._owner == index:
+                self._on_issue(issue)
+        return _emit
+
+
+class HedgedProvider(VisionProvider):
+    """
+    analyze_image에 헤지 요청을 더한 프로바이더 래퍼. 나머지 호출은 원래 프로바이더로 위임.
+    backup은 헤지 대상 프로바이더를 돌려주는 함수 (레지스트리의 공용 인스턴스를 호출 시점에 조회).
+    """
+
+    def __init__(self, primary: VisionProvider, backup: Optional[Callable[[], VisionProvider]] = None):
+        self.primary = primary
+        self._backup = backup
+
+    def __getattr__(self, attr):
+        # _model 등 프로바이더 속성 (캐시 키/메모 키가 원래 프로바이더와 같도록)
+        return getattr(self.primary, attr)
+
+    @property
+    def name(self) -> str:
+        return self.primary.name
+
+    @property
+    def supports_video(self) -> bool:
+        return self.primary.supports_video
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.primary.max_concurrency
+
+    def _backup_provider(self) -> Optional[VisionProvider]:
+        try:
+            backup = self._backup() if self._backup else self.primary
+        except Exception as e:
+            print(f"[LocaLens] 헤지 프로바이더 사용 불가: {e}", flush=True)
+            return None
+        return getattr(backup, "primary", backup)
+
+    def _may_hedge(self, backup: VisionProvider) -> bool:
+        # 예비 프로바이더가 이미 한도에 걸려 있으면 보내도 빨라지지 않음
+        if backup.rate_limiter.stats()["waiting"]:
+            return False
+        # 비용 상한 (확인과 증가를 한 번에, 동시에 여러 요청이 상한을 넘지 않도록)
+        with _counters_lock:
+            if _counters["hedged"] + 1 > _hedge_max_ratio() * _counters["calls"]:
+                return False
+            _counters["hedged"] += 1
+        return True
+
+    def analyze_image(
+        self, image: MediaSource, on_issue: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        _count("calls")
+        delay = get_latency_histogram(self.primary.name).percentile(
+            _hedge_percentile(), _hedge_min_samples()
+        )
+        if delay is None:
+            return _timed_call(self.primary, image, on_issue)
+
+        # 두 호출이 같은 입력을 읽도록 바이트로
+        data = read_media_bytes(image)
+        preview = _PreviewOwner(on_issue)
+        attempts = [_Attempt(self.primary, data, preview.callback(0))]
+        done, _ = wait([attempts[0].future], timeout=delay)
+        if not done:
+            backup = self._backup_provider()
+            if backup is not None and self._may_hedge(backup):
+                attempts.append(_Attempt(backup, data, preview.callback(1)))
+
+        try:
+            pending = {a.future for a in attempts}
+            while pending:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for index, attempt in enumerate(attempts):
+                    if attempt.succeeded():
+                        if index:
+                            _count("hedge_wins")
+                        return attempt.future.result()
+            # 모두 실패: 원래 호출의 오류
+            return attempts[0].future.result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel.set()
+
+    def analyze_images(self, images, on_issue=None):
+        # 한 장짜리만 헤지 (여러 장 묶음 요청은 지연 분포가 달라 원래대로)
+        if len(images) == 1:
+            callback = (lambda issue: on_issue(0, issue)) if on_issue else None
+            return [self.analyze_image(images[0], callback)]
+        return self.primary.analyze_images(images, on_issue)
+
+    def analyze_video(self, video, on_issue=None):
+        return self.primary.analyze_video(video, on_issue)
+
+    async def analyze_video_async(self, video, on_issue=None, sha256=None):
+        return await self.primary.analyze_video_async(video, on_issue, sha256)
+
+    async def aclose(self) -> None:
+        await self.primary.aclose()
+
+    def generate_alternative_texts(self, original_text, language, context=None):
+        return self.primary.generate_alternative_texts(original_text, language, context)
+
+    def generate_alternative_texts_batch(self, queries):
+        return self.primary.generate_alternative_texts_batch(queries)
+
+
+def hedging_stats() -> Dict[str, object]:
+    percentile = _hedge_percentile()
+    with _counters_lock:
+        counters = dict(_counters)
+    return {
+        **counters,
+        "enabled": hedging_enabled(),
+        "thresholds": {
+            name: histogram.percentile(percentile, _hedge_min_samples())
+            for name, histogram in list(_histograms.items())
+        },
+    }
@@ -0,0 +1,387 @@
+"""
+프로바이더 호출 스케줄러
+- 프로바이더/모델별 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷 ({PROVIDER}_RPM, {PROVIDER}_TPM, 0 = 제한 없음)
+- 한도에 걸리면 오류 대신 우선순위 큐에서 대기 (숫자가 작을수록 먼저: 화면 요청 > 백그라운드 작업 > 미리 생성)
+- 한도 초과/과부하 응답(429/503/529)은 retry-after를 따르거나 지수 백오프로 재시도,
+  그동안 같은 버킷의 다른 호출도 함께 대기 (한도 초과 상태에서 요청을 계속 보내지 않음)
+- 동기 프로바이더 호출은 전용 스레드풀에서 (run_provider_call): 한도 대기/백오프로 막힌 스레드가
+  AnyIO 공용 스레드풀을 채워 캐시/파일 읽기 같은 다른 작업까지 멈추지 않도록
+"""
+
+import os
+import re
+import sys
+import time
+import heapq
+import random
+import asyncio
+import functools
+import itertools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from telemetry.metrics import PROVIDER_CALL_SECONDS, stage_timer
+from telemetry.timings import record_stage
+
+T = TypeVar("T")
+
+# 호출 우선순위 (작을수록 먼저)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+PRIORITY_PREFETCH = 20
+
+# 현재 요청의 우선순위 (백엔드가 작업 종류별로 설정, 스레드풀/태스크로 전파됨)
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+# 프로바이더 호출 시간(초, 한도 대기/백오프 제외)을 시도마다 받는 콜백 (헤지 지연 기록용)
+call_observer: ContextVar[Optional[Callable[[float], None]]] = ContextVar("call_observer", default=None)
+
+# 재시도 대상 HTTP 상태 (요청 한도 초과 / 일시적 과부하)
+_RETRY_STATUS = {429, 503, 529}
+
+_BACKOFF_INITIAL = 2.0
+_BACKOFF_MAX = 60.0
+
+# 대기 중인 호출이 버킷 상태를 다시 확인하는 최대 간격 (초)
+_MAX_WAIT_SLICE = 1.0
+
+# 토큰 사용량 추정 (실제 사용량을 알면 호출 후 보정)
+IMAGE_TOKEN_ESTIMATE = 1500
+VIDEO_TOKEN_ESTIMATE = 60 * 300     # 1분 분량 (Gemini 비디오 약 300 토큰/초)
+
+
+def _provider_threads() -> int:
+    """동기 프로바이더 호출 전용 스레드 수 (한도 대기 중인 호출 포함)"""
+    return max(1, int(os.getenv("PROVIDER_CALL_THREADS", "64")))
+
+
+def max_attempts() -> int:
+    """한도 초과 시 포함한 총 시도 횟수"""
+    return max(1, int(os.getenv("RATE_LIMIT_MAX_ATTEMPTS", "6")))
+
+
+def estimate_tokens(text: str = "", images: int = 0, max_output: int = 0) -> int:
+    """요청 토큰 대략치: 텍스트 4자당 1토큰 + 이미지당 고정값 + 출력 상한의 일부"""
+    return len(text) // 4 + images * IMAGE_TOKEN_ESTIMATE + max_output // 4
+
+
+class _Bucket:
+    """분당 한도 토큰 버킷 (가득 찬 상태에서 시작, 초당 한도/60씩 채워짐)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        # 한도보다 큰 요청은 버킷이 가득 차면 허용 (잔량은 음수가 되어 이후 호출이 기다림)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    wake: Callable[[], None] = field(compare=False)
+    admitted: bool = field(default=False, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class Permit:
+    """허가된 호출 하나. 실제 토큰 사용량을 알면 record로 버킷을 보정."""
+
+    def __init__(self, limiter: "RateLimiter", tokens: int):
+        self._limiter = limiter
+        self.tokens = tokens
+
+    def record(self, used_tokens: Optional[int]) -> None:
+        if used_tokens is not None and used_tokens != self.tokens:
+            self._limiter._adjust(self.tokens - used_tokens)
+            self.tokens = used_tokens
+
+
+class RateLimiter:
+    """한 프로바이더/모델의 RPM/TPM 버킷 + 우선순위 대기열 (스레드/이벤트 루프 양쪽에서 사용)"""
+
+    def __init__(self, provider: str, model: str, rpm: float = 0, tpm: float = 0):
+        self.provider = provider
+        self.model = model
+        self.name = f"{provider}:{model}"
+        self._requests = _Bucket(rpm) if rpm > 0 else None
+        self._tokens = _Bucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self._counters = {"admitted": 0, "queued": 0, "retries": 0, "rate_limited": 0}
+
+    def _dispatch(self) -> float:
+        """대기열 앞부터 들여보낼 수 있는 만큼 들여보내고, 다음 호출까지 남은 시간을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in (self._requests, self._tokens):
+                if bucket:
+                    bucket.refill(now)
+            while self._queue:
+                head = self._queue[0]
+                if head.cancelled:
+                    heapq.heappop(self._queue)
+                    continue
+                delay = max(
+                    self._blocked_until - now,
+                    self._requests.wait_for(1) if self._requests else 0.0,
+                    self._tokens.wait_for(head.tokens) if self._tokens else 0.0,
+                )
+                if delay > 0:
+                    return delay
+                heapq.heappop(self._queue)
+                if self._requests:
+                    self._requests.level -= 1
+                if self._tokens:
+                    self._tokens.level -= head.tokens
+                head.admitted = True
+                self._counters["admitted"] += 1
+                head.wake()
+            return 0.0
+
+    def _enqueue(self, tokens: int, priority: Optional[int], wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(
+            request_priority.get() if priority is None else priority, next(self._seq), tokens, wake,
+        )
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _note_queued(self, waiter: _Waiter) -> None:
+        if not waiter.admitted:
+            self._count("queued")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def acquire(self, tokens: int = 0, priority: Optional[int] = None) -> Permit:
+        """차례가 올 때까지 현재 스레드에서 대기"""
+        event = threading.Event()
+        waiter = self._enqueue(tokens, priority, event.set)
+        delay = self._dispatch()
+        self._note_queued(waiter)
+        try:
+            while not waiter.admitted:
+                event.wait(min(max(delay, 0.01), _MAX_WAIT_SLICE))
+                if not waiter.admitted:
+                    delay = self._dispatch()
+        except BaseException:
+            waiter.cancelled = True
+            raise
+        return Permit(self, tokens)
+
+    async def acquire_async(self, tokens: int = 0, priority: Optional[int] = None) -> Permit:
+        """차례가 올 때까지 이벤트 루프를 막지 않고 대기"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def _wake() -> None:
+            loop.call_soon_threadsafe(lambda: ready.done() or ready.set_result(None))
+
+        waiter = self._enqueue(tokens, priority, _wake)
+        delay = self._dispatch()
+        self._note_queued(waiter)
+        try:
+            while not waiter.admitted:
+                try:
+                    await asyncio.wait_for(asyncio.shield(ready), min(max(delay, 0.01), _MAX_WAIT_SLICE))
+                except asyncio.TimeoutError:
+                    pass
+                if not waiter.admitted:
+                    delay = self._dispatch()
+        except BaseException:
+            waiter.cancelled = True
+            raise
+        return Permit(self, tokens)
+
+    def _adjust(self, tokens: int) -> None:
+        """추정과 실제 토큰 사용량 차이 반영 (양수면 돌려받음)"""
+        if self._tokens:
+            with self._lock:
+                self._tokens.level = min(self._tokens.capacity, self._tokens.level + tokens)
+
+    def penalize(self, seconds: float) -> None:
+        """한도 초과 응답을 받으면 그 시간 동안 이 버킷의 모든 호출을 멈춤"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._counters["rate_limited"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                **self._counters,
+                "waiting": sum(1 for w in self._queue if not w.cancelled),
+                "blocked_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+            }
+
+
+# ─── 한도 초과 응답 해석 ─────────────────────────────────
+
+_RETRY_DELAY_FIELD = re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s")
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    # anthropic: status_code / google-genai: code
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """retry-after 헤더(초 또는 HTTP 날짜) / Gemini RetryInfo.retryDelay"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    match = _RETRY_DELAY_FIELD.search(str(getattr(error, "details", "") or ""))
+    return float(match.group(1)) if match else None
+
+
+def retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """재시도할 오류면 대기 시간(초), 아니면 None"""
+    if _status_code(error) not in _RETRY_STATUS:
+        return None
+    hinted = _retry_after(error)
+    if hinted is not None:
+        return hinted
+    return min(_BACKOFF_INITIAL * 2 ** attempt, _BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+def call_with_retry(
+    limiter: RateLimiter, fn: Callable[[Permit], T], tokens: int = 0, priority: Optional[int] = None
+) -> T:
+    """버킷 허가를 받아 fn(permit) 호출, 한도 초과면 버킷 전체를 멈추고 다시 줄 서서 재시도"""
+    for attempt in itertools.count():
+        with stage_timer("rate_limit_wait"):
+            permit = limiter.acquire(tokens, priority)
+        started = time.perf_counter()
+        try:
+            result = fn(permit)
+        except Exception as e:
+            _observe_call(limiter, started, "error")
+            delay = retry_delay(e, attempt)
+            if delay is None or attempt + 1 >= max_attempts():
+                raise
+            limiter.penalize(delay)
+            limiter._count("retries")
+        else:
+            _observe_call(limiter, started, "ok")
+            return result
+
+
+async def call_with_retry_async(
+    limiter: RateLimiter,
+    fn: Callable[[Permit], Awaitable[T]],
+    tokens: int = 0,
+    priority: Optional[int] = None,
+) -> T:
+    """call_with_retry의 비동기 버전"""
+    for attempt in itertools.count():
+        with stage_timer("rate_limit_wait"):
+            permit = await limiter.acquire_async(tokens, priority)
+        started = time.perf_counter()
+        try:
+            result = await fn(permit)
+        except Exception as e:
+            _observe_call(limiter, started, "error")
+            delay = retry_delay(e, attempt)
+            if delay is None or attempt + 1 >= max_attempts():
+                raise
+            limiter.penalize(delay)
+            limiter._count("retries")
+        else:
+            _observe_call(limiter, started, "ok")
+            return result
+
+
+def _observe_call(limiter: RateLimiter, started: float, outcome: str) -> None:
+    seconds = time.perf_counter() - started
+    PROVIDER_CALL_SECONDS.observe(
+        seconds, provider=limiter.provider, model=limiter.model, outcome=outcome,
+    )
+    record_stage("provider_call", seconds)
+    observer = call_observer.get()
+    if observer is not None:
+        observer(seconds)
+
+
+# ─── 동기 프로바이더 호출 전용 스레드풀 ─────────────────────
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(_provider_threads(), thread_name_prefix="provider")
+    return _executor
+
+
+async def run_provider_call(fn: Callable[..., T], *args) -> T:
+    """
+    동기 프로바이더 메서드(analyze_image 등)를 전용 스레드에서 실행.
+    호출이 한도 대기/재시도 백오프로 스레드를 오래 잡고 있어도 공용 스레드풀은 비어 있음.
+    컨텍스트 변수(요청 우선순위, 단계별 시간 수집 등)는 그대로 전달.
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, fn, *args))
+
+
+# ─── 프로바이더/모델별 리미터 ─────────────────────────────
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """프로세스 공용 리미터 (프로바이더 핫 리로드 후에도 버킷 상태 유지)"""
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                prefix = provider.upper()
+                limiter = _limiters[key] = RateLimiter(
+                    provider,
+                    model,
+                    rpm=float(os.getenv(f"{prefix}_RPM", "0")),
+                    tpm=float(os.getenv(f"{prefix}_TPM", "0")),
+                )
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {limiter.name: limiter.stats() for limiter in list(_limiters.values())}
@@ -0,0 +1,33 @@
+"""
+프로바이더/모델별 토큰 사용량 누계 (localens_tokens_total 메트릭)
+- input: 캐시되지 않은 입력, cache_read: 프롬프트 캐시 적중, cache_write: 프롬프트 캐시 생성
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from telemetry.metrics import TOKENS
+
+_KINDS = ("input", "output", "cache_read", "cache_write")
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> None:
+    counts = (input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+    for kind, count in zip(_KINDS, counts):
+        TOKENS.inc(count or 0, provider=provider, model=model, kind=kind)
+
+
+def usage_stats() -> Dict[str, Dict[str, int]]:
+    stats: Dict[str, Dict[str, int]] = {}
+    for (provider, model, kind), count in TOKENS.samples().items():
+        stats.setdefault(f"{provider}:{model}", dict.fromkeys(_KINDS, 0))[kind] = int(count)
+    return stats
@@ -0,0 +1,205 @@
+"""
+프로세스 메모리 메트릭 (Prometheus 텍스트 형식으로 내보내기)
+- Counter / Histogram, 레이블 값 조합별 시계열
+- 같은 이름으로 다시 만들면 기존 메트릭 반환 (모듈 핫 리로드 후에도 값 유지)
+- 단계별 소요 시간은 STAGE_SECONDS{stage=...} 하나에 (observe_stage / stage_timer / timed_stage),
+  요청 단위 수집(telemetry.timings) 중이면 그쪽에도 합산
+"""
+
+import time
+import asyncio
+import functools
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from telemetry.timings import record_stage
+
+# 초 단위 기본 버킷 (파일 검증 ~ 비디오 분석까지)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with _lock:
+            series = list(self._series.items())
+        for key, value in sorted(series):
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    @abstractmethod
+    def _render_series(self, key: Tuple[str, ...], value) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount <= 0:
+            return
+        key = self._key(labels)
+        with _lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with _lock:
+            return dict(self._series)
+
+    def _render_series(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            # [버킷별 개수..., 합계, 개수]
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_series(self, key, value) -> List[str]:
+        names = self.labelnames + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            lines.append(
+                f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}"
+            )
+        lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {value[-1]}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value[-2])}")
+        lines.append(f"{self.name}_count{labels} {value[-1]}")
+        return lines
+
+
+def _register(cls, name: str, help_text: str, labelnames, **kwargs):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help_text, tuple(labelnames), **kwargs)
+    return metric
+
+
+def counter(name: str, help_text: str, labelnames=()) -> Counter:
+    return _register(Counter, name, help_text, labelnames)
+
+
+def histogram(name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+
+def render_metrics() -> str:
+    """등록된 모든 메트릭 (Prometheus text exposition format 0.0.4)"""
+    with _lock:
+        metrics = sorted(_metrics.values(), key=lambda m: m.name)
+    return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+# ─── 공용 메트릭 ─────────────────────────────────────────
+
+STAGE_SECONDS = histogram(
+    "localens_stage_duration_seconds", "Time spent in each analysis stage", ("stage",)
+)
+PROVIDER_CALL_SECONDS = histogram(
+    "localens_provider_call_duration_seconds",
+    "Model API call duration (one attempt, excluding rate-limit queueing)",
+    ("provider", "model", "outcome"),
+)
+FILES = counter("localens_files_total", "Analyzed files", ("input_type", "outcome"))
+ISSUES = counter("localens_issues_total", "Reported issues by type", ("type",))
+PARSE_FAILURES = counter(
+    "localens_parse_failures_total", "Response items dropped while parsing", ("reason",)
+)
+TOKENS = counter(
+    "localens_tokens_total",
+    "Tokens reported by provider SDKs (input excludes prompt-cache reads/writes)",
+    ("provider", "model", "kind"),
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    record_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """with stage_timer("...") 블록의 소요 시간을 STAGE_SECONDS(+ 요청 수집기)에 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def timed_stage(stage: str):
+    """함수(동기/비동기) 한 번 호출의 소요 시간을 STAGE_SECONDS에 기록하는 데코레이터"""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,63 @@
+"""
+샘플링 프로파일러 (표준 라이브러리만 사용)
+- 백그라운드 스레드가 일정 간격으로 모든 스레드의 호출 스택을 샘플링
+- 결과는 collapsed stack 형식 ("스레드;함수;함수 샘플수", speedscope / flamegraph.pl 입력)
+- 프로세스 전체를 샘플링하므로 동시에 처리 중인 다른 요청의 스택도 섞일 수 있음
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Optional
+
+DEFAULT_INTERVAL = 0.005
+
+# 스택이 이보다 깊으면 바깥쪽(루트 쪽)을 잘라냄
+_MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """start() ~ stop() 사이의 스택 샘플 수집"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="localens-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < _MAX_DEPTH:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        """샘플링 종료 후 collapsed stack 텍스트 반환"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
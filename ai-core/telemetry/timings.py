@@ -0,0 +1,94 @@
+"""
+요청 단위 단계별 소요 시간 수집
+- collect_timings() 블록 안의 단계 기록(metrics.observe_stage)을 요청 수집기에도 합산
+- 파일별 작업은 set_file_scope(인덱스들)로 표시 → 같은 단계를 파일별로도 합산
+  (여러 파일을 묶은 호출은 묶인 파일 각각에 전체 시간)
+- 컨텍스트 변수라 스레드풀/태스크로 전파됨
+"""
+
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import DefaultDict, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class TimingCollector:
+    """요청 하나의 단계별 소요 시간 합계 (초)"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: DefaultDict[str, float] = defaultdict(float)
+        self._file_stages: DefaultDict[int, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._file_totals: Dict[int, float] = {}
+
+    def add(self, stage: str, seconds: float, files: Sequence[int] = ()) -> None:
+        with self._lock:
+            self._stages[stage] += seconds
+            for index in files:
+                self._file_stages[index][stage] += seconds
+
+    def finish_file(self, index: int) -> None:
+        """파일 결과가 나온 시점 (요청 시작부터의 경과 시간)"""
+        with self._lock:
+            self._file_totals[index] = time.perf_counter() - self._started
+
+    def summary(self, filenames: List[str]) -> dict:
+        """응답용: 전체 경과 + 단계별 합계 (병렬 호출은 합산되므로 경과 시간보다 클 수 있음) + 파일별"""
+        with self._lock:
+            return {
+                "total": _round(time.perf_counter() - self._started),
+                "stages": _rounded(self._stages),
+                "files": [
+                    {
+                        "filename": name,
+                        "total": _round(self._file_totals.get(index, 0.0)),
+                        "stages": _rounded(self._file_stages.get(index, {})),
+                    }
+                    for index, name in enumerate(filenames)
+                ],
+            }
+
+
+def _round(seconds: float) -> float:
+    return round(seconds, 4)
+
+
+def _rounded(stages: Dict[str, float]) -> Dict[str, float]:
+    return {stage: _round(seconds) for stage, seconds in sorted(stages.items())}
+
+
+_collector: ContextVar[Optional[TimingCollector]] = ContextVar("timing_collector", default=None)
+_file_scope: ContextVar[Tuple[int, ...]] = ContextVar("timing_file_scope", default=())
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[TimingCollector]]:
+    """블록 안(하위 태스크/스레드 포함)의 단계 기록을 모음 (enabled=False면 None)"""
+    if not enabled:
+        yield None
+        return
+    collector = TimingCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+def current_collector() -> Optional[TimingCollector]:
+    return _collector.get()
+
+
+def set_file_scope(indices: Sequence[int]) -> None:
+    """현재 태스크가 처리하는 업로드 인덱스 (파일별 작업 태스크 시작 시 호출)"""
+    if _collector.get() is not None:
+        _file_scope.set(tuple(indices))
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    collector = _collector.get()
+    if collector is not None:
+        collector.add(stage, seconds, _file_scope.get())
@@ -0,0 +1,62 @@
+"""
+Gemini 업로드 공유 회귀 테스트 (먼저 요청한 쪽이 끝나도 공유 업로드는 계속)
+"""
+
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers.gemini_uploads import GeminiUploadManager
+
+
+class _Files:
+    """gate가 열릴 때까지 업로드를 붙잡아 두는 aio.files"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.uploaded = []
+
+    async def upload(self, file, config):
+        await self.gate.wait()
+        self.uploaded.append(file.read())
+        return SimpleNamespace(
+            name="files/1", uri="gs://files/1", mime_type="video/mp4", state="ACTIVE", expiration_time=None,
+        )
+
+    async def delete(self, name):
+        pass
+
+
+def _spooled(data: bytes):
+    stream = tempfile.SpooledTemporaryFile()
+    stream.write(data)
+    return stream
+
+
+def test_shared_upload_survives_first_caller_closing_its_stream():
+    async def _run():
+        files = _Files()
+        client = SimpleNamespace(aio=SimpleNamespace(files=files))
+        manager = GeminiUploadManager()
+
+        async def _use(stream):
+            async with manager.use(client, stream, "video/mp4", "same-sha256") as uploaded:
+                return uploaded.name
+
+        first_stream = _spooled(b"video")
+        first = asyncio.create_task(_use(first_stream))
+        await asyncio.sleep(0.05)
+        # 먼저 요청한 쪽이 취소되고 업로드 스트림을 닫음
+        first.cancel()
+        first_stream.close()
+
+        second = asyncio.create_task(_use(_spooled(b"video")))
+        await asyncio.sleep(0.05)
+        files.gate.set()
+        assert await second == "files/1"
+        assert files.uploaded == [b"video"]
+
+    asyncio.run(_run())
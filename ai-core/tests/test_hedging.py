@@ -0,0 +1,127 @@
+"""
+헤지 요청 회귀 테스트 (승/패 집계 / 진 쪽 지연 기록 / 한도 대기 제외)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers import hedging
+from providers.base import CallCancelled, VisionProvider, call_cancel
+from providers.hedging import HedgedProvider, get_latency_histogram
+from providers.rate_limit import Permit, call_with_retry
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after)}})()
+
+
+class _FakeProvider(VisionProvider):
+    """seconds만큼 걸리는 analyze_image (취소 신호를 받으면 멈춤), 처음 limited번은 429"""
+
+    _model = "test"
+
+    def __init__(self, name: str, seconds: float, limited: int = 0, retry_after: float = 0.0):
+        self._name = name
+        self._seconds = seconds
+        self._limited = limited
+        self._retry_after = retry_after
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def supports_video(self) -> bool:
+        return False
+
+    def analyze_image(self, image, on_issue=None):
+        def _call(permit: Permit):
+            if self._limited:
+                self._limited -= 1
+                raise _RateLimited(self._retry_after)
+            cancel = call_cancel.get()
+            deadline = time.monotonic() + self._seconds
+            while time.monotonic() < deadline:
+                if cancel is not None and cancel.is_set():
+                    raise CallCancelled()
+                time.sleep(0.005)
+            return [self._name]
+
+        return call_with_retry(self.rate_limiter, _call)
+
+    def analyze_video(self, video, on_issue=None):
+        return []
+
+    def generate_alternative_texts(self, original_text, language, context=None):
+        return []
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(hedging, "_counters", {"calls": 0, "hedged": 0, "hedge_wins": 0})
+    monkeypatch.setattr(hedging, "_histograms", {})
+    monkeypatch.setenv("HEDGE_MIN_SAMPLES", "5")
+    monkeypatch.setenv("HEDGE_MAX_RATIO", "1")
+
+
+def _warm_up(name: str, seconds: float = 0.02) -> None:
+    for _ in range(5):
+        get_latency_histogram(name).record(seconds)
+
+
+def _wait_for_samples(name: str, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(get_latency_histogram(name)) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_hedge_win_is_counted_and_loser_latency_kept():
+    _warm_up("slow-primary")
+    primary = _FakeProvider("slow-primary", 1.0)
+    backup = _FakeProvider("fast-backup", 0.01)
+    result = HedgedProvider(primary, lambda: backup).analyze_image(b"img")
+
+    assert result == ["fast-backup"]
+    assert hedging._counters == {"calls": 1, "hedged": 1, "hedge_wins": 1}
+    # 진 쪽(취소된 원래 호출)도 취소될 때까지의 경과를 기록
+    _wait_for_samples("slow-primary", 6)
+    assert len(get_latency_histogram("slow-primary")) == 6
+    assert get_latency_histogram("slow-primary").percentile(100) >= 0.02
+
+
+def test_hedge_loss_is_not_counted_as_win():
+    _warm_up("primary-wins")
+    primary = _FakeProvider("primary-wins", 0.1)
+    backup = _FakeProvider("slower-backup", 1.0)
+    result = HedgedProvider(primary, lambda: backup).analyze_image(b"img")
+
+    assert result == ["primary-wins"]
+    assert hedging._counters == {"calls": 1, "hedged": 1, "hedge_wins": 0}
+
+
+def test_hedge_ratio_cap(monkeypatch):
+    monkeypatch.setenv("HEDGE_MAX_RATIO", "0")
+    _warm_up("capped")
+    primary = _FakeProvider("capped", 0.1)
+    result = HedgedProvider(primary, lambda: _FakeProvider("unused", 0.01)).analyze_image(b"img")
+
+    assert result == ["capped"]
+    assert hedging._counters == {"calls": 1, "hedged": 0, "hedge_wins": 0}
+
+
+def test_latency_excludes_rate_limit_backoff():
+    primary = _FakeProvider("throttled", 0.01, limited=1, retry_after=0.3)
+    started = time.monotonic()
+    HedgedProvider(primary).analyze_image(b"img")
+
+    assert time.monotonic() - started >= 0.3
+    # 한도 초과 후 대기한 시간은 빼고 마지막 호출 시간만
+    assert get_latency_histogram("throttled").percentile(100) < 0.2
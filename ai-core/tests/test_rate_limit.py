@@ -0,0 +1,137 @@
+"""
+호출 스케줄러 회귀 테스트 (우선순위 순서 / 한도 초과 재시도 / 재시도 시 미리보기 중복)
+"""
+
+import io
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from providers.rate_limit import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, RateLimiter, call_with_retry,
+)
+
+
+class _RateLimited(Exception):
+    code = 429
+
+    def __init__(self, retry_after: float = 0.01):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after)}})()
+
+
+def test_waiters_are_admitted_by_priority():
+    limiter = RateLimiter("test", "priority", rpm=300)      # 0.2초에 하나씩
+    admitted = []
+
+    async def _wait(priority: int) -> None:
+        await limiter.acquire_async(priority=priority)
+        admitted.append(priority)
+
+    async def _run() -> None:
+        for _ in range(300):       # 버킷을 비워 이후 호출은 모두 대기열로
+            limiter.acquire()
+        await asyncio.gather(*(
+            _wait(p) for p in (PRIORITY_PREFETCH, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+        ))
+
+    asyncio.run(_run())
+    assert admitted == [PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_PREFETCH]
+
+
+def test_rate_limited_call_is_retried():
+    limiter = RateLimiter("test", "retry")
+    attempts = []
+
+    def _call(permit):
+        attempts.append(permit)
+        if len(attempts) == 1:
+            raise _RateLimited()
+        return "ok"
+
+    assert call_with_retry(limiter, _call) == "ok"
+    stats = limiter.stats()
+    assert (len(attempts), stats["retries"], stats["rate_limited"]) == (2, 1, 1)
+
+
+def test_other_errors_are_not_retried():
+    limiter = RateLimiter("test", "no-retry")
+
+    def _call(permit):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retry(limiter, _call)
+    assert limiter.stats()["retries"] == 0
+
+
+def test_attempts_are_capped(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_MAX_ATTEMPTS", "2")
+    limiter = RateLimiter("test", "capped")
+
+    def _call(permit):
+        raise _RateLimited()
+
+    with pytest.raises(_RateLimited):
+        call_with_retry(limiter, _call)
+    assert limiter.stats()["retries"] == 1
+
+
+# ─── 재시도 시 미리보기 ───────────────────────────────────
+
+def _issue(issue_id: str, x: int) -> dict:
+    return {
+        "id": issue_id,
+        "type": "TEXT_TRUNCATION",
+        "severity": "HIGH",
+        "description": "Button label is cut off",
+        "location": {"x1": x, "y1": 10, "x2": x + 40, "y2": 30},
+        "language": "ja-JP",
+        "suggestion": "버튼 너비를 확장하세요",
+    }
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class _FlakyModels:
+    """첫 번째 스트림은 이슈 하나를 보낸 뒤 429, 두 번째는 전체 응답"""
+
+    def __init__(self, text: str, cut: int):
+        self._text = text
+        self._cut = cut
+        self.calls = 0
+
+    def generate_content_stream(self, model, contents, config):
+        self.calls += 1
+        yield _Chunk(self._text[:self._cut])
+        if self.calls == 1:
+            raise _RateLimited()
+        yield _Chunk(self._text[self._cut:])
+
+
+def test_retry_does_not_repeat_previews(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    from providers.gemini_client import GeminiClient
+
+    text = json.dumps([_issue("a", 10), _issue("b", 120)])
+    models = _FlakyModels(text, text.index('{"id": "b"'))
+    client = GeminiClient()
+    client._client = type("Client", (), {"models": models})()
+
+    image = io.BytesIO()
+    Image.new("RGB", (200, 100), "white").save(image, format="PNG")
+    previews = []
+    issues = client.analyze_image(image.getvalue(), lambda issue: previews.append(issue.id))
+
+    assert models.calls == 2
+    assert [i.id for i in issues] == ["a", "b"]
+    assert previews == ["a", "b"]
@@ -0,0 +1,145 @@
+"""
+응답 파서 회귀 테스트 (예시 배열 / 동점 배열 / 잘린 응답 / 조각 단위 스트리밍)
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parsers.result_parser import (
+    IssueStreamParser, JsonArrayScanner, extract_issue_items, merge_overlap_duplicates,
+    parse_ai_response, parse_batch_response, parse_issue_dict,
+)
+
+
+def _issue(issue_id: str, **extra) -> dict:
+    return {
+        "id": issue_id,
+        "type": "TEXT_TRUNCATION",
+        "severity": "HIGH",
+        "description": "Button label is cut off",
+        "location": {"x1": 100, "y1": 100, "x2": 200, "y2": 150},
+        "language": "ja-JP",
+        "suggestion": "버튼 너비를 확장하세요",
+        **extra,
+    }
+
+
+def _array(*items: dict) -> str:
+    return json.dumps(list(items), ensure_ascii=False)
+
+
+def _stream(text: str, chunk: int, image_sizes=None) -> IssueStreamParser:
+    parser = IssueStreamParser(image_sizes)
+    for i in range(0, len(text), chunk):
+        parser.feed(text[i:i + chunk])
+    return parser
+
+
+# 설명문 속 예시 배열 하나 + 코드 블록 안의 실제 배열 하나 (각각 이슈 하나)
+EXAMPLE_THEN_FENCED = (
+    f"Respond like this: {_array(_issue('ex'))}\n\n"
+    f"```json\n{_array(_issue('a'))}\n```\n"
+)
+
+
+def test_fenced_array_wins_tie_over_prose_example():
+    assert [i.id for i in parse_ai_response(EXAMPLE_THEN_FENCED)] == ["a"]
+    assert [item["id"] for item in extract_issue_items(EXAMPLE_THEN_FENCED)] == ["a"]
+
+
+def test_later_array_wins_tie_without_fences():
+    text = f"Example: {_array(_issue('ex'))}\nAnswer: {_array(_issue('a'))}"
+    assert [i.id for i in parse_ai_response(text)] == ["a"]
+
+
+def test_only_valid_issues_count_toward_selection():
+    # 필수 필드가 빠진 예시 두 개보다 실제 이슈 하나가 우선
+    example = _array({"id": "ex1", "type": "TEXT_TRUNCATION", "location": {}}, {"id": "ex2", "type": "X"})
+    text = f"```json\n{_array(_issue('a'))}\n```\nFormat: {example}"
+    assert [i.id for i in parse_ai_response(text)] == ["a"]
+
+
+def test_larger_array_still_wins_outside_fence():
+    second = _issue("b", location={"x1": 500, "y1": 500, "x2": 600, "y2": 550})
+    text = f"```json\n{_array(_issue('ex'))}\n```\n{_array(_issue('a'), second)}"
+    assert [i.id for i in parse_ai_response(text)] == ["a", "b"]
+
+
+def test_streaming_commits_only_selected_array():
+    for chunk in (1, 3, 7, 64, len(EXAMPLE_THEN_FENCED)):
+        parser = IssueStreamParser()
+        previews = []
+        for i in range(0, len(EXAMPLE_THEN_FENCED), chunk):
+            previews.extend(issue.id for _, issue in parser.feed(EXAMPLE_THEN_FENCED[i:i + chunk]))
+        # 미리보기는 잠정적 (예시 포함), 최종 결과는 선택된 배열만
+        assert previews == ["ex", "a"]
+        assert [i.id for i in parser.finish()[0]] == ["a"]
+
+
+def test_streaming_batch_commits_only_selected_array():
+    text = (
+        f"Example: {_array(_issue('ex', image_index=0))}\n"
+        f"```json\n{_array(_issue('a', image_index=0), _issue('b', image_index=1))}\n```"
+    )
+    per_image = _stream(text, 5, [None, None]).finish()
+    assert [[i.id for i in issues] for issues in per_image] == [["a"], ["b"]]
+    assert [[i.id for i in issues] for issues in parse_batch_response(text, [None, None])] == [["a"], ["b"]]
+
+
+def test_truncated_response_keeps_complete_issues():
+    second = _issue("b", location={"x1": 500, "y1": 500, "x2": 600, "y2": 550})
+    text = f"```json\n{_array(_issue('a'), second, _issue('c'))}"
+    truncated = text[: text.index('"c"') + 10]
+    assert [i.id for i in parse_ai_response(truncated)] == ["a", "b"]
+    assert [i.id for i in _stream(truncated, 4).finish()[0]] == ["a", "b"]
+
+
+def test_chunked_scan_matches_full_scan():
+    text = (
+        'Notes [1] and [HUD]: ``` [{"type": "X"}] ```\n'
+        '```json\n[{"id": "a", "d": "brace } and \\"quote\\" [x] \\\\"}, {"broken": }, {"id": "b"}]\n```'
+    )
+    full = JsonArrayScanner()
+    full.feed(text)
+    assert full.fenced == [True, True]
+    for chunk in (1, 2, 5, 11):
+        scanner = JsonArrayScanner()
+        for i in range(0, len(text), chunk):
+            scanner.feed(text[i:i + chunk])
+        assert scanner.arrays == full.arrays
+        assert scanner.fenced == full.fenced
+
+
+def test_finish_validates_selected_array_in_one_pass():
+    items = [
+        _issue("a", location={"x1": 200, "y1": 100, "x2": 1500, "y2": 500}),  # 픽셀 좌표
+        _issue("a"),                                                            # 중복 id
+        _issue("bad", location={"x1": 300, "y1": 100, "x2": 200, "y2": 150}),  # 뒤집힌 박스
+    ]
+    issues = _stream(f"```json\n{_array(*items)}\n```", 16, [(2000, 1000)]).finish()[0]
+    assert [i.id for i in issues] == ["a"]
+    assert issues[0].location.model_dump() == {"x1": 100.0, "y1": 100.0, "x2": 750.0, "y2": 500.0}
+
+
+def test_preview_is_normalized_copy():
+    parser = IssueStreamParser([(2000, 1000)])
+    pixel = _issue("a", location={"x1": 200, "y1": 100, "x2": 1500, "y2": 500})
+    flipped = _issue("b", location={"x1": 300, "y1": 100, "x2": 200, "y2": 150})
+    (_, first), (_, second) = parser.feed(_array(pixel, flipped))
+    assert parser.preview(0, first).location.x2 == 750.0
+    assert first.location.x2 == 1500.0     # 원본은 finish()에서 한 번에 정규화
+    assert parser.preview(0, second) is None
+
+
+def test_overlap_merge_only_inside_segment_overlap():
+    def sighting(issue_id: str, timestamp: str):
+        return parse_issue_dict(_issue(issue_id, timestamp=timestamp, original_text="設定"))
+
+    # 구간 0: 0-60초, 구간 1: 58-120초 → 겹침 58-60초
+    first = [sighting("a", "0:10.0"), sighting("b", "0:59.0")]
+    second = [sighting("c", "0:59.2"), sighting("d", "1:01.5"), sighting("e", "1:30.0")]
+    merged = merge_overlap_duplicates([first, second], [(0.0, 60.0), (58.0, 120.0)])
+    # 겹침 안의 같은 이슈(c)만 제거, 겹침 밖의 반복 등장(d, e)은 유지
+    assert [i.id for i in merged] == ["a", "b", "d", "e"]
@@ -1,14 +1,32 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 # .env 로드 (명시적 경로)
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-app = FastAPI(title="LocaLens API", version="1.0.0")
+from app.services.job_queue import start_job_workers, stop_job_workers
+from app.services.provider_registry import close_providers, init_providers
+from telemetry.metrics import render_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 프로바이더(SDK 클라이언트)는 프로세스당 한 번만 생성
+    if os.getenv("USE_MOCK", "true").lower() != "true":
+        init_providers()
+        start_job_workers()
+    yield
+    await stop_job_workers()
+    await close_providers()
+
+
+app = FastAPI(title="LocaLens API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -31,3 +49,9 @@ app.include_router(analyze.router)
 @app.get("/")
 async def root():
     return {"status": "ok", "service": "LocaLens API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """단계별 소요 시간 히스토그램 + 파일/이슈/파싱 실패/토큰 카운터 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
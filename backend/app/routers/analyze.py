@@ -1,28 +1,53 @@
 """
 분석 API 라우터
 POST /api/analyze
+POST /api/analyze/stream (NDJSON)
+POST /api/jobs
+GET  /api/jobs/{job_id}
 POST /api/generate-alternatives
+POST /api/generate-alternatives/batch
+GET  /api/cache/stats
+POST /api/providers/reload (개발용)
+GET  /api/profiles/{profile_id}
 """
 
 import os
 import sys
+import json
+import asyncio
 import time
 import uuid
 import random
+from contextlib import aclosing
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 # contracts import
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
 from contracts.types import (
-    InputType, AIProvider, IssueType, IssueSeverity,
+    InputType, AIProvider, VideoMode, IssueType, IssueSeverity,
     BoundingBox, LocalizationIssue, FileAnalysisResult, AnalyzeResponse,
 )
 
+from app.services.alternatives import (
+    alternatives_stats, get_alternatives_provider, resolve_alternatives,
+)
+from app.services.analysis import (
+    AnalysisOptions, FileAnalysisError, analyze_batch, count_analyzed_frames, iter_analysis,
+)
 from app.services.file_handler import validate_files, get_file_bytes
+from app.services.job_queue import enqueue_job, get_job_store, record_completed_job
+from app.services.profiles import profile_path, response_timings_enabled, save_profile, start_profiler
+from app.services.provider_registry import (
+    get_vision_provider, hedging_stats, rate_limit_stats, reload_providers, usage_stats,
+)
+from app.services.result_cache import get_result_cache, is_cache_enabled
+from telemetry.timings import collect_timings
 
 router = APIRouter(prefix="/api", tags=["Analysis"])
 
@@ -120,6 +145,21 @@ MOCK_VIDEO_TEMPLATES = [
 ]
 
 
+MOCK_ALTERNATIVES = {
+    "ja-JP": ["オプション", "設定", "OP設定"],
+    "de-DE": ["Einstell.", "Setup", "Opt."],
+    "ko-KR": ["설정", "옵션", "세팅"],
+    "zh-CN": ["设置", "选项", "配置"],
+    "fr-FR": ["Paramètres", "Config.", "Régl."],
+    "vi-VN": ["Cài đặt", "Tùy chọn", "Setup"],
+}
+
+
+def _mock_alternatives(language: str) -> List[str]:
+    lang_key = language if language in MOCK_ALTERNATIVES else "ko-KR"
+    return MOCK_ALTERNATIVES.get(lang_key, ["대체 1", "대체 2", "대체 3"])
+
+
 def _generate_mock_issues(
     filename: str, input_type: str, count: int = 3
 ) -> List[LocalizationIssue]:
@@ -144,6 +184,70 @@ def _generate_mock_issues(
     return issues
 
 
+def _generate_mock_results(
+    files: List[UploadFile], input_type: str, options: Optional[AnalysisOptions] = None
+) -> List[FileAnalysisResult]:
+    results: List[FileAnalysisResult] = []
+    for f in files:
+        count = random.randint(2, 3) if input_type == "image" else random.randint(3, 4)
+        issues = _generate_mock_issues(f.filename or "unknown", input_type, count)
+        if options and options.prefetch_alternatives:
+            for issue in issues:
+                if issue.original_text:
+                    issue.alternative_texts = _mock_alternatives(issue.language)
+        results.append(FileAnalysisResult(
+            filename=f.filename or "unknown",
+            issues=issues,
+            analyzed_frames=24 if input_type == "video" else None,
+        ))
+    return results
+
+
+# ─── 공통 전처리 ──────────────────────────────────────────
+
+def _build_options(
+    provider: str, input_type: str, no_cache: bool, video_mode: str, prefetch_alternatives: bool = False,
+) -> AnalysisOptions:
+    """요청 옵션 검증. video_mode 미지정 시 VIDEO_MODE 환경변수 (기본 auto)."""
+    mode = video_mode or os.getenv("VIDEO_MODE", VideoMode.AUTO.value)
+    if mode not in {m.value for m in VideoMode}:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 video_mode: {mode}")
+
+    # Claude는 비디오 업로드 분석 불가 (키프레임 모드는 가능)
+    if provider == "claude" and input_type == "video" and mode in (
+        VideoMode.UPLOAD.value, VideoMode.SEGMENTED.value,
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Claude는 비디오 업로드 분석을 지원하지 않습니다. Gemini 또는 video_mode=keyframes를 사용해 주세요.",
+        )
+    return AnalysisOptions(
+        use_cache=not no_cache, video_mode=mode, prefetch_alternatives=prefetch_alternatives,
+    )
+
+
+async def _prepare_analysis(files: List[UploadFile], provider: str, input_type: str):
+    """파일 검증 + 프로바이더 조회. (검증된 업로드, 프로바이더 | Mock이면 None)"""
+    # 파일 검증
+    it = InputType.IMAGE if input_type == "image" else InputType.VIDEO
+    errors, payloads = await validate_files(files, it)
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+
+    if os.getenv("USE_MOCK", "true").lower() == "true":
+        return payloads, None
+
+    # 실제 AI 호출
+    try:
+        vision_provider = get_vision_provider(provider)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI 프로바이더({provider}) 초기화 실패: {e}")
+
+    if input_type == "image":
+        await get_file_bytes(payloads)
+    return payloads, vision_provider
+
+
 # ─── POST /api/analyze ────────────────────────────────────
 
 @router.post("/analyze", response_model=AnalyzeResponse)
@@ -151,67 +255,46 @@ async def analyze(
     files: List[UploadFile] = File(...),
     provider: str = Form("gemini"),
     input_type: str = Form("image"),
+    no_cache: bool = Form(False),
+    video_mode: str = Form(""),
+    prefetch_alternatives: bool = Form(False),
+    x_localens_timings: bool = Header(False),
+    x_localens_profile: bool = Header(False),
 ):
+    """
+    분석 결과를 한 번에 반환.
+    X-LocaLens-Timings: true면 단계별 소요 시간(timings)을 포함,
+    X-LocaLens-Profile: true면 (PROFILING=header일 때) 샘플링 프로파일을 저장하고 timings.profile_url로 안내.
+    """
     start = time.time()
+    options = _build_options(provider, input_type, no_cache, video_mode, prefetch_alternatives)
+    profiler = start_profiler(x_localens_profile)
+    want_timings = x_localens_timings or response_timings_enabled() or profiler is not None
 
-    # Claude + video 조합 차단
-    if provider == "claude" and input_type == "video":
-        raise HTTPException(status_code=400, detail="Claude는 비디오 분석을 지원하지 않습니다. Gemini를 사용해 주세요.")
-
-    # 파일 검증
-    it = InputType.IMAGE if input_type == "image" else InputType.VIDEO
-    errors = await validate_files(files, it)
-    if errors:
-        raise HTTPException(status_code=400, detail="; ".join(errors))
-
-    use_mock = os.getenv("USE_MOCK", "true").lower() == "true"
-
-    if use_mock:
-        # Mock 모드
-        results: List[FileAnalysisResult] = []
-        for f in files:
-            count = random.randint(2, 3) if input_type == "image" else random.randint(3, 4)
-            issues = _generate_mock_issues(f.filename or "unknown", input_type, count)
-            results.append(FileAnalysisResult(filename=f.filename or "unknown", issues=issues))
-    else:
-        # 실제 AI 호출
-        import importlib
-        ai_core_path = str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core")
-        if ai_core_path not in sys.path:
-            sys.path.insert(0, ai_core_path)
-
+    with collect_timings(want_timings) as timings:
         try:
-            import providers.base as _base_mod
-            importlib.reload(_base_mod)
-            import providers.gemini_client as _gc_mod
-            importlib.reload(_gc_mod)
-            vision_provider = _base_mod.get_provider(provider)
-            print(f"[LocaLens] model={getattr(vision_provider, '_model', '?')}", flush=True)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI 프로바이더({provider}) 초기화 실패: {e}")
-
-        file_bytes_list = await get_file_bytes(files)
-
-        results = []
-        for f, fb in zip(files, file_bytes_list):
-            fname = f.filename or "unknown"
-            try:
-                if input_type == "video":
-                    issues = vision_provider.analyze_video(fb)
-                else:
-                    issues = vision_provider.analyze_image(fb)
-                for issue in issues:
-                    issue.frame_url = fname
-                results.append(FileAnalysisResult(filename=fname, issues=issues))
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"AI 분석 실패 ({fname}): {e}"
-                )
+            payloads, vision_provider = await _prepare_analysis(files, provider, input_type)
+
+            if vision_provider is None:
+                # Mock 모드
+                results = _generate_mock_results(files, input_type, options)
+            else:
+                try:
+                    results = await analyze_batch(vision_provider, payloads, input_type, options)
+                except FileAnalysisError as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            profile_id = await run_in_threadpool(save_profile, profiler) if profiler else None
 
     total_issues = sum(len(r.issues) for r in results)
     elapsed = time.time() - start
 
+    summary = None
+    if timings is not None:
+        summary = timings.summary([r.filename for r in results])
+        if profile_id:
+            summary["profile_url"] = f"/api/profiles/{profile_id}"
+
     return AnalyzeResponse(
         success=True,
         provider=provider,
@@ -219,7 +302,196 @@ async def analyze(
         total_issues=total_issues,
         processing_time=round(elapsed, 2),
         results=results,
-        analyzed_frames=24 if input_type == "video" else None,
+        analyzed_frames=count_analyzed_frames(results),
+        timings=summary,
+    )
+
+
+# ─── POST /api/analyze/stream ─────────────────────────────
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+async def _analysis_events(vision_provider, payloads, input_type: str, options: AnalysisOptions):
+    """
+    ("issue", 인덱스, 이슈 dict) 미리보기와 ("outcome", 인덱스, 결과/오류)를 발생 순서대로 반환.
+    미리보기는 프로바이더 작업 스레드에서 오므로 이벤트 루프의 큐로 넘겨받음.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def _on_issue(index: int, issue: LocalizationIssue) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, ("issue", index, issue.model_dump(mode="json")))
+
+    async def _produce() -> None:
+        try:
+            async with aclosing(iter_analysis(
+                vision_provider, payloads, input_type, options, on_issue=_on_issue
+            )) as outcomes:
+                async for index, outcome in outcomes:
+                    queue.put_nowait(("outcome", index, outcome))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        await producer  # 분석 중 예외가 있었다면 여기서 전파
+    finally:
+        producer.cancel()
+
+
+@router.post("/analyze/stream")
+async def analyze_stream(
+    files: List[UploadFile] = File(...),
+    provider: str = Form("gemini"),
+    input_type: str = Form("image"),
+    no_cache: bool = Form(False),
+    video_mode: str = Form(""),
+    prefetch_alternatives: bool = Form(False),
+):
+    """
+    파일별 결과를 완료 즉시 NDJSON 한 줄씩 전송
+    - {"event": "issue", "index", "filename", "issue"}: 모델 응답 스트림에서 완성된 이슈 미리보기
+    - {"event": "result", "index", "result"} / {"event": "error", "index", "filename", "detail"}
+    - 마지막 줄 {"event": "summary", ...} (total_issues, processing_time 등)
+    """
+    start = time.time()
+    options = _build_options(provider, input_type, no_cache, video_mode, prefetch_alternatives)
+    payloads, vision_provider = await _prepare_analysis(files, provider, input_type)
+
+    async def _events():
+        total_issues = 0
+        failed = 0
+        completed: List[FileAnalysisResult] = []
+
+        if vision_provider is None:
+            for index, result in enumerate(_generate_mock_results(files, input_type, options)):
+                total_issues += len(result.issues)
+                completed.append(result)
+                yield _ndjson({"event": "result", "index": index, "result": result.model_dump(mode="json")})
+        else:
+            async for kind, index, item in _analysis_events(vision_provider, payloads, input_type, options):
+                if kind == "issue":
+                    yield _ndjson({
+                        "event": "issue", "index": index,
+                        "filename": payloads[index].filename, "issue": item,
+                    })
+                    continue
+                if isinstance(item, FileAnalysisError):
+                    failed += 1
+                    yield _ndjson({
+                        "event": "error", "index": index,
+                        "filename": item.filename, "detail": str(item),
+                    })
+                    continue
+                total_issues += len(item.issues)
+                completed.append(item)
+                yield _ndjson({"event": "result", "index": index, "result": item.model_dump(mode="json")})
+
+        yield _ndjson({
+            "event": "summary",
+            "success": failed == 0,
+            "provider": provider,
+            "input_type": input_type,
+            "total_files": len(files),
+            "failed_files": failed,
+            "total_issues": total_issues,
+            "processing_time": round(time.time() - start, 2),
+            "analyzed_frames": count_analyzed_frames(completed),
+        })
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
+# ─── POST /api/jobs · GET /api/jobs/{job_id} ─────────────
+
+class JobCreateResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+class JobFileError(BaseModel):
+    index: int
+    filename: str
+    detail: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str                      # queued | running | completed | partial | failed
+    provider: str
+    input_type: str
+    total_files: int
+    completed_files: int
+    total_issues: int
+    results: List[FileAnalysisResult]  # 완료된 파일만 (부분 결과)
+    errors: List[JobFileError]
+    error: Optional[str] = None
+    processing_time: Optional[float] = None
+    analyzed_frames: Optional[int] = None
+
+
+@router.post("/jobs", response_model=JobCreateResponse, status_code=202)
+async def create_job(
+    files: List[UploadFile] = File(...),
+    provider: str = Form("gemini"),
+    input_type: str = Form("image"),
+    no_cache: bool = Form(False),
+    video_mode: str = Form(""),
+    prefetch_alternatives: bool = Form(False),
+):
+    """분석 작업을 대기열에 등록하고 바로 job_id 반환"""
+    options = _build_options(provider, input_type, no_cache, video_mode, prefetch_alternatives)
+
+    it = InputType.IMAGE if input_type == "image" else InputType.VIDEO
+    errors, payloads = await validate_files(files, it)
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+
+    if os.getenv("USE_MOCK", "true").lower() == "true":
+        results = _generate_mock_results(files, input_type, options)
+        job_id = await run_in_threadpool(record_completed_job, provider, input_type, results)
+        return JobCreateResponse(job_id=job_id, status="completed")
+
+    job_id = await enqueue_job(payloads, provider, input_type, options)
+    return JobCreateResponse(job_id=job_id, status="queued")
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """작업 상태와 현재까지의 결과"""
+    job = await run_in_threadpool(get_job_store().get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    results: List[FileAnalysisResult] = []
+    errors: List[JobFileError] = []
+    for f in job["files"]:
+        if f["result"]:
+            results.append(FileAnalysisResult.model_validate_json(f["result"]))
+        elif f["error"]:
+            errors.append(JobFileError(index=f["idx"], filename=f["filename"], detail=f["error"]))
+
+    elapsed = None
+    if job["started_at"] and job["finished_at"]:
+        elapsed = round(job["finished_at"] - job["started_at"], 2)
+
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        provider=job["provider"],
+        input_type=job["input_type"],
+        total_files=len(job["files"]),
+        completed_files=len(results),
+        total_issues=sum(len(r.issues) for r in results),
+        results=results,
+        errors=errors,
+        error=job["error"],
+        processing_time=elapsed,
+        analyzed_frames=count_analyzed_frames(results),
     )
 
 
@@ -237,43 +509,22 @@ class AlternativesResponse(BaseModel):
     alternatives: List[str]
 
 
-MOCK_ALTERNATIVES = {
-    "ja-JP": ["オプション", "設定", "OP設定"],
-    "de-DE": ["Einstell.", "Setup", "Opt."],
-    "ko-KR": ["설정", "옵션", "세팅"],
-    "zh-CN": ["设置", "选项", "配置"],
-    "fr-FR": ["Paramètres", "Config.", "Régl."],
-    "vi-VN": ["Cài đặt", "Tùy chọn", "Setup"],
-}
-
-
 @router.post("/generate-alternatives", response_model=AlternativesResponse)
 async def generate_alternatives(req: AlternativesRequest):
     use_mock = os.getenv("USE_MOCK", "true").lower() == "true"
 
     if use_mock:
-        lang_key = req.language if req.language in MOCK_ALTERNATIVES else "ko-KR"
-        alts = MOCK_ALTERNATIVES.get(lang_key, ["대체 1", "대체 2", "대체 3"])
         return AlternativesResponse(
             success=True,
             original_text=req.original_text,
-            alternatives=alts,
+            alternatives=_mock_alternatives(req.language),
         )
 
-    # 실제 AI 호출
-    import importlib
-    ai_core_path = str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core")
-    if ai_core_path not in sys.path:
-        sys.path.insert(0, ai_core_path)
-
+    # 실제 AI 호출 (메모 적중 시 호출 생략)
     try:
-        import providers.base as _base_mod
-        importlib.reload(_base_mod)
-        import providers.gemini_client as _gc_mod
-        importlib.reload(_gc_mod)
-        vision_provider = _base_mod.get_provider("gemini")
-        alts = vision_provider.generate_alternative_texts(
-            req.original_text, req.language, req.context
+        vision_provider = get_alternatives_provider()
+        [alts] = await resolve_alternatives(
+            vision_provider, [(req.original_text, req.language, req.context)]
         )
         return AlternativesResponse(
             success=True,
@@ -285,3 +536,92 @@ async def generate_alternatives(req: AlternativesRequest):
             status_code=500,
             detail=f"대체 문장 생성 실패: {e}"
         )
+
+
+# ─── POST /api/generate-alternatives/batch ───────────────
+
+# 한 요청에 받을 최대 항목 수
+MAX_ALTERNATIVES_BATCH_ITEMS = 500
+
+
+class AlternativesBatchRequest(BaseModel):
+    items: List[AlternativesRequest]
+
+
+class AlternativesBatchResponse(BaseModel):
+    success: bool
+    results: List[AlternativesResponse]
+
+
+@router.post("/generate-alternatives/batch", response_model=AlternativesBatchResponse)
+async def generate_alternatives_batch(req: AlternativesBatchRequest):
+    """여러 원문의 대체 문장을 한 번에 (메모에 없는 것만 묶어서 모델 호출)"""
+    if len(req.items) > MAX_ALTERNATIVES_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {MAX_ALTERNATIVES_BATCH_ITEMS}개까지 요청할 수 있습니다.",
+        )
+
+    use_mock = os.getenv("USE_MOCK", "true").lower() == "true"
+    if use_mock:
+        all_alts = [_mock_alternatives(item.language) for item in req.items]
+    else:
+        try:
+            vision_provider = get_alternatives_provider()
+            all_alts = await resolve_alternatives(
+                vision_provider,
+                [(item.original_text, item.language, item.context) for item in req.items],
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"대체 문장 생성 실패: {e}"
+            )
+
+    return AlternativesBatchResponse(
+        success=True,
+        results=[
+            AlternativesResponse(success=True, original_text=item.original_text, alternatives=alts)
+            for item, alts in zip(req.items, all_alts)
+        ],
+    )
+
+
+# ─── GET /api/cache/stats ────────────────────────────────
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """분석 결과 캐시 적중/미스 카운터 (+ 대체 문장 메모, 프로바이더 호출 대기열, 헤지 요청, 토큰 사용량)"""
+    extra = {
+        "alternatives": alternatives_stats(),
+        "rate_limits": rate_limit_stats(),
+        "hedging": hedging_stats(),
+        "tokens": usage_stats(),
+    }
+    if not is_cache_enabled():
+        return {"enabled": False, **extra}
+    stats = await run_in_threadpool(get_result_cache().stats)
+    return {"enabled": True, **stats, **extra}
+
+
+# ─── POST /api/providers/reload ──────────────────────────
+
+@router.post("/providers/reload")
+async def reload_ai_providers():
+    """ai-core 모듈 재로드 + 프로바이더 재생성 (PROVIDER_RELOAD_ENABLED=true 일 때만)"""
+    if os.getenv("PROVIDER_RELOAD_ENABLED", "false").lower() != "true":
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    providers = await run_in_threadpool(reload_providers)
+    return {"success": True, "providers": providers}
+
+
+# ─── GET /api/profiles/{profile_id} ──────────────────────
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """프로파일링한 분석 요청의 샘플링 결과 (collapsed stack, speedscope 등으로 열기)"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
@@ -0,0 +1,247 @@
+"""
+대체 문장 생성 서비스
+- (원문, 언어, 문맥)을 정규화한 키로 결과를 메모 (프로세스 메모리 LRU)
+- 메모에 없는 항목만 모아 ALTERNATIVES_BATCH_SIZE개씩 모델 한 번 호출로 생성
+- 같은 항목을 동시에 요청하면 진행 중인 생성을 공유
+- 분석 중 완성된 이슈의 대체 문장을 백그라운드에서 미리 생성해 메모를 채움 (AlternativesPrefetcher)
+"""
+
+import os
+import sys
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# contracts / ai-core import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+from contracts.types import LocalizationIssue
+from providers.base import AlternativeQuery, fallback_alternatives
+from providers.rate_limit import PRIORITY_PREFETCH, request_priority, run_provider_call
+
+from app.services.provider_registry import get_vision_provider
+
+MEMO_MAX_ENTRIES = int(os.getenv("ALTERNATIVES_CACHE_SIZE", "2048"))
+
+# (프로바이더, 모델, 원문, 언어, 문맥)
+MemoKey = Tuple[str, str, str, str, str]
+
+_memo: "OrderedDict[MemoKey, List[str]]" = OrderedDict()
+_inflight: Dict[MemoKey, asyncio.Future] = {}
+_tasks: Set[asyncio.Task] = set()
+_counters = {"hits": 0, "misses": 0, "model_calls": 0}
+
+
+# 미리 생성할 이슈를 모으는 시간(초): 스트리밍으로 하나씩 완성되는 이슈를 한 번의 호출로 묶음
+_PREFETCH_COLLECT_SECONDS = 0.5
+
+
+def get_alternatives_provider():
+    """대체 문장 생성에 쓰는 프로바이더 (클릭 생성/일괄 생성/미리 생성이 같은 메모를 공유)"""
+    return get_vision_provider(os.getenv("ALTERNATIVES_PROVIDER", "gemini"))
+
+
+def prefetch_wait_seconds() -> float:
+    """파일 분석이 끝난 뒤 미리 생성 중인 대체 문장을 결과에 붙이려고 기다리는 최대 시간"""
+    return float(os.getenv("ALTERNATIVES_PREFETCH_WAIT", "5"))
+
+
+def alternatives_batch_size() -> int:
+    """모델 한 번 호출에 묶을 최대 항목 수"""
+    return max(1, int(os.getenv("ALTERNATIVES_BATCH_SIZE", "50")))
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def memo_key(vision_provider, query: AlternativeQuery) -> MemoKey:
+    text, language, context = query
+    return (
+        vision_provider.name,
+        getattr(vision_provider, "_model", "?"),
+        _normalize(text),
+        _normalize(language).lower(),
+        _normalize(context).casefold(),
+    )
+
+
+def _remember(key: MemoKey, alternatives: List[str]) -> None:
+    _memo[key] = alternatives
+    _memo.move_to_end(key)
+    while len(_memo) > MEMO_MAX_ENTRIES:
+        _memo.popitem(last=False)
+
+
+async def _generate(vision_provider, batch: Dict[MemoKey, AlternativeQuery]) -> None:
+    """메모에 없는 항목 한 묶음을 생성해 진행 중 Future를 완료 (응답에 빠진 항목은 메모하지 않음)"""
+    _counters["model_calls"] += 1
+    error: Optional[Exception] = None
+    try:
+        answers = await run_provider_call(
+            vision_provider.generate_alternative_texts_batch, list(batch.values())
+        )
+        for key, answer in zip(batch, answers):
+            if answer:
+                _remember(key, answer)
+            _inflight.pop(key).set_result(answer or fallback_alternatives(batch[key][0]))
+    except Exception as e:
+        error = e
+    finally:
+        for key in batch:
+            future = _inflight.pop(key, None)
+            if future is None:
+                continue
+            if error is None:
+                future.set_result(fallback_alternatives(batch[key][0]))
+            else:
+                future.set_exception(error)
+                future.exception()  # 기다리는 쪽이 없어도 경고가 남지 않게
+
+
+async def resolve_alternatives(
+    vision_provider, queries: List[AlternativeQuery]
+) -> List[List[str]]:
+    """
+    요청 순서대로의 대체 문장 목록. 메모 적중은 즉시, 나머지는 묶어서 생성.
+    일부 묶음만 실패하면 그 항목은 기본 대체 문장, 전부 실패하면 예외.
+    """
+    keys = [memo_key(vision_provider, q) for q in queries]
+    resolved: Dict[MemoKey, List[str]] = {}
+    waiting: Dict[MemoKey, asyncio.Future] = {}
+    pending: Dict[MemoKey, AlternativeQuery] = {}
+
+    for key, query in zip(keys, queries):
+        if key in resolved or key in waiting:
+            continue
+        if key in _memo:
+            _counters["hits"] += 1
+            _memo.move_to_end(key)
+            resolved[key] = _memo[key]
+            continue
+        if key in _inflight:
+            _counters["hits"] += 1
+        else:
+            _counters["misses"] += 1
+            pending[key] = query
+            _inflight[key] = asyncio.get_running_loop().create_future()
+        waiting[key] = _inflight[key]
+
+    # 생성은 별도 태스크로: 요청이 끊겨도 같은 항목을 기다리는 다른 요청은 결과를 받음
+    missing = list(pending)
+    size = alternatives_batch_size()
+    for i in range(0, len(missing), size):
+        task = asyncio.ensure_future(
+            _generate(vision_provider, {k: pending[k] for k in missing[i:i + size]})
+        )
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+    errors: List[Exception] = []
+    for key, future in waiting.items():
+        try:
+            resolved[key] = await asyncio.shield(future)
+        except Exception as e:
+            errors.append(e)
+    if errors and not resolved:
+        raise errors[0]
+
+    return [
+        list(resolved[key]) if key in resolved else fallback_alternatives(query[0])
+        for key, query in zip(keys, queries)
+    ]
+
+
+def _issue_query(issue: LocalizationIssue) -> AlternativeQuery:
+    # 카드의 개별 생성 요청과 같은 키가 되도록 문맥 없이
+    return issue.original_text, issue.language, None
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.ensure_future(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def _prefetch(vision_provider, queries: List[AlternativeQuery]) -> List[List[str]]:
+    # 미리 생성은 프로바이더 한도에 걸리면 다른 호출보다 뒤에
+    request_priority.set(PRIORITY_PREFETCH)
+    return await resolve_alternatives(vision_provider, queries)
+
+
+class AlternativesPrefetcher:
+    """
+    분석 요청 하나의 대체 문장 미리 생성.
+    완성된 이슈를 잠시 모았다가 한 번에 생성 요청 (결과는 공용 메모에 남아 클릭 시 즉시 응답),
+    파일 결과가 나오면 준비된 대체 문장을 이슈에 붙임.
+    """
+
+    def __init__(self, vision_provider):
+        self._provider = vision_provider
+        self._loop = asyncio.get_running_loop()
+        self._queued: Dict[MemoKey, AlternativeQuery] = {}
+        self._seen: Set[MemoKey] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, issues: List[LocalizationIssue]) -> None:
+        """원문이 있는 이슈를 생성 대기열에 추가 (이벤트 루프에서 호출)"""
+        for issue in issues:
+            if not issue.original_text or issue.alternative_texts:
+                continue
+            query = _issue_query(issue)
+            key = memo_key(self._provider, query)
+            if key not in self._seen and key not in _memo:
+                self._seen.add(key)
+                self._queued[key] = query
+
+        if len(self._queued) >= alternatives_batch_size():
+            self._flush()
+        elif self._queued and self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(_PREFETCH_COLLECT_SECONDS, self._flush)
+
+    def submit_threadsafe(self, issue: LocalizationIssue) -> None:
+        """프로바이더 작업 스레드의 이슈 미리보기 콜백용"""
+        self._loop.call_soon_threadsafe(self.submit, [issue])
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._queued:
+            return
+        queries = list(self._queued.values())
+        self._queued.clear()
+        # 실패해도 클릭 시 다시 생성하면 되므로 결과/예외는 버림
+        _spawn(_prefetch(self._provider, queries)).add_done_callback(
+            lambda t: t.cancelled() or t.exception()
+        )
+
+    async def attach(self, issues: List[LocalizationIssue], wait: Optional[float] = None) -> None:
+        """이슈에 대체 문장 붙이기. wait초 안에 준비되지 않은 것은 그대로 두고 백그라운드 생성은 계속."""
+        self.submit(issues)
+        self._flush()
+        targets = [i for i in issues if i.original_text and not i.alternative_texts]
+        if not targets:
+            return
+
+        task = _spawn(resolve_alternatives(self._provider, [_issue_query(i) for i in targets]))
+        await asyncio.wait({task}, timeout=prefetch_wait_seconds() if wait is None else wait)
+        if task.done() and not task.cancelled() and task.exception() is None:
+            for issue, alternatives in zip(targets, task.result()):
+                issue.alternative_texts = alternatives
+            return
+
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        for issue in targets:
+            alternatives = _memo.get(memo_key(self._provider, _issue_query(issue)))
+            if alternatives:
+                issue.alternative_texts = list(alternatives)
+
+    def close(self) -> None:
+        self._flush()
+
+
+def alternatives_stats() -> Dict[str, int]:
+    return {**_counters, "entries": len(_memo), "inflight": len(_inflight)}
@@ -0,0 +1,454 @@
+"""
+분석 파이프라인 서비스
+- 업로드별 프로바이더 호출(결과 캐시 경유)을 스레드풀에서 동시 실행
+- 이미지 배치는 지각 해시로 유사 프레임을 묶어 대표 프레임만 분석, 대표 이미지는 IMAGE_BATCH_SIZE장씩 한 요청으로
+- 비디오는 전체 업로드, 구간 분할 후 병렬 업로드, 또는 로컬 키프레임 추출 후 이미지 경로로 병렬 분석
+- 업로드 순서대로 모으거나(analyze_batch) 완료 순서대로 흘려보냄(iter_analysis)
+"""
+
+import os
+import sys
+import math
+import asyncio
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional, Tuple, Union
+
+from starlette.concurrency import run_in_threadpool
+
+# contracts import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from contracts.types import LocalizationIssue, FileAnalysisResult, VideoMode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+from parsers.result_parser import (
+    BatchIssueCallback, IssueCallback, format_timestamp, merge_overlap_duplicates, shift_timestamps,
+    track_issues,
+)
+from providers.rate_limit import run_provider_call
+from preprocess.keyframes import KeyframeSet, extract_keyframes, probe_duration
+from preprocess.phash import group_near_duplicates
+from preprocess.segments import VideoSegment, segment_seconds, split_video
+from telemetry.metrics import FILES, ISSUES, stage_timer
+from telemetry.timings import current_collector, set_file_scope
+
+from app.services.alternatives import AlternativesPrefetcher, get_alternatives_provider
+from app.services.file_handler import UploadPayload, payload_from_bytes, payload_from_stream
+from app.services.result_cache import get_result_cache, is_cache_enabled, make_cache_key
+
+
+class FileAnalysisError(Exception):
+    """개별 파일 분석 실패 (배치 내 인덱스/파일명 포함)"""
+
+    def __init__(self, index: int, filename: str, cause: Exception):
+        super().__init__(f"AI 분석 실패 ({filename}): {cause}")
+        self.index = index
+        self.filename = filename
+        self.cause = cause
+
+
+Outcome = Union[FileAnalysisResult, FileAnalysisError]
+
+
+@dataclass
+class AnalysisOptions:
+    """요청 단위 분석 옵션"""
+    use_cache: bool = True
+    video_mode: str = VideoMode.UPLOAD.value
+    prefetch_alternatives: bool = False   # 분석과 동시에 원문 있는 이슈의 대체 문장 미리 생성
+
+
+async def analyze_payload(
+    vision_provider,
+    payload: UploadPayload,
+    input_type: str,
+    use_cache: bool = True,
+    on_issue: Optional[IssueCallback] = None,
+) -> List[LocalizationIssue]:
+    """결과 캐시 조회 → 미스면 프로바이더 호출 후 저장 (on_issue: 응답 스트림에서 이슈 완성 시 호출)"""
+    cache = get_result_cache() if use_cache and is_cache_enabled() else None
+    key = make_cache_key(payload.sha256, vision_provider, input_type) if cache else ""
+
+    if cache:
+        cached = await run_in_threadpool(cache.get, key)
+        if cached is not None:
+            return cached
+
+    # 이미지는 검증 때 읽은 바이트를 스레드풀에서,
+    # 비디오는 업로드 스풀 파일을 비동기 경로로 전달 (업로드 처리 대기가 스레드를 점유하지 않음)
+    source = payload.data if payload.data is not None else payload.stream
+    if input_type == "video":
+        issues = await vision_provider.analyze_video_async(source, on_issue, payload.sha256)
+    else:
+        issues = await run_provider_call(vision_provider.analyze_image, source, on_issue)
+
+    if cache:
+        await run_in_threadpool(cache.set, key, issues)
+    return issues
+
+
+async def analyze_image_payloads(
+    vision_provider,
+    payloads: List[UploadPayload],
+    use_cache: bool = True,
+    on_issue: Optional[BatchIssueCallback] = None,
+) -> List[List[LocalizationIssue]]:
+    """이미지 여러 장: 캐시 미스만 한 요청으로 묶어 분석하고 이미지별로 캐시에 저장"""
+    cache = get_result_cache() if use_cache and is_cache_enabled() else None
+    results: List[Optional[List[LocalizationIssue]]] = [None] * len(payloads)
+    keys: List[str] = []
+
+    if cache:
+        keys = [make_cache_key(p.sha256, vision_provider, "image") for p in payloads]
+        results = await run_in_threadpool(lambda: [cache.get(k) for k in keys])
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        # 프로바이더는 요청에 담은 순서로 인덱스를 주므로 payloads 기준으로 변환
+        callback = (lambda k, issue: on_issue(missing[k], issue)) if on_issue else None
+        fresh = await run_provider_call(
+            vision_provider.analyze_images, [payloads[i].data for i in missing], callback
+        )
+        for i, issues in zip(missing, fresh):
+            results[i] = issues
+        if cache:
+            await run_in_threadpool(lambda: [cache.set(keys[i], results[i]) for i in missing])
+    return results
+
+
+def image_batch_size() -> int:
+    """한 요청에 묶어 보낼 이미지 수 (1 = 한 장씩)"""
+    return max(int(os.getenv("IMAGE_BATCH_SIZE", "1")), 1)
+
+
+def _chunks(items: list, size: int) -> list:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def is_dedup_enabled() -> bool:
+    return os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+
+
+def _dedup_max_distance() -> int:
+    """유사 프레임으로 볼 최대 해밍 거리 (256비트 dHash 기준)"""
+    return int(os.getenv("DEDUP_MAX_DISTANCE", "6"))
+
+
+async def _group_payloads(payloads: List[UploadPayload], input_type: str) -> List[List[int]]:
+    """이미지 배치의 유사 프레임 그룹 (첫 번째 인덱스가 대표). 그 외에는 파일당 한 그룹."""
+    if input_type != "image" or not is_dedup_enabled() or len(payloads) < 2:
+        return [[i] for i in range(len(payloads))]
+    return await run_in_threadpool(
+        group_near_duplicates, [p.data for p in payloads], _dedup_max_distance()
+    )
+
+
+def _auto_max_keyframes() -> int:
+    """auto 모드에서 키프레임 경로를 쓰는 최대 키프레임 수 (초과 시 업로드 경로)"""
+    return int(os.getenv("VIDEO_AUTO_MAX_KEYFRAMES", "8"))
+
+
+def _safe_probe_duration(payload: UploadPayload) -> Optional[float]:
+    try:
+        return probe_duration(payload.stream)
+    except Exception:
+        return None
+
+
+def _upload_frame_count(duration: Optional[float]) -> Optional[int]:
+    # Gemini는 업로드된 비디오를 기본 1fps로 샘플링
+    return math.ceil(duration) if duration else None
+
+
+# 구간 분석 실패 시 해당 구간만 재시도하는 총 시도 횟수
+_SEGMENT_ATTEMPTS = 2
+
+
+async def _start_tasks(
+    vision_provider,
+    payloads: List[UploadPayload],
+    input_type: str,
+    options: AnalysisOptions,
+    on_issue: Optional[BatchIssueCallback] = None,
+) -> List["asyncio.Task[List[Tuple[int, Outcome]]]"]:
+    groups = await _group_payloads(payloads, input_type)
+    semaphore = asyncio.Semaphore(vision_provider.max_concurrency)
+    batch_size = image_batch_size()
+
+    def _preview(
+        index: int, transform: Optional[Callable[[LocalizationIssue], None]] = None
+    ) -> Optional[IssueCallback]:
+        """스트리밍 중 완성된 이슈를 업로드 인덱스와 함께 전달 (최종 결과와 같은 id/타임스탬프로 변환한 사본)"""
+        if on_issue is None:
+            return None
+
+        def _emit(issue: LocalizationIssue) -> None:
+            preview = issue.model_copy(deep=True)
+            if transform:
+                transform(preview)
+            on_issue(index, preview)
+        return _emit
+
+    @asynccontextmanager
+    async def _slot():
+        # 프로바이더 동시 호출 수 제한 대기 (queue_wait 단계)
+        with stage_timer("queue_wait"):
+            await semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def _call(
+        payload: UploadPayload, kind: str, preview: Optional[IssueCallback] = None
+    ) -> List[LocalizationIssue]:
+        async with _slot():
+            return await analyze_payload(vision_provider, payload, kind, options.use_cache, preview)
+
+    async def _call_images(
+        batch: List[UploadPayload], preview: Optional[BatchIssueCallback] = None
+    ) -> List[List[LocalizationIssue]]:
+        async with _slot():
+            return await analyze_image_payloads(vision_provider, batch, options.use_cache, preview)
+
+    def _tag_frame(issue: LocalizationIssue, ts: str) -> None:
+        issue.id = f"{issue.id}@{ts}"
+        issue.timestamp = ts
+
+    async def _analyze_keyframes(
+        index: int, payload: UploadPayload, keyframes: KeyframeSet
+    ) -> List[LocalizationIssue]:
+        stamps = [format_timestamp(kf.timestamp) for kf in keyframes.frames]
+        frames = [
+            payload_from_bytes(f"{payload.filename}@{ts}", kf.image, "image/jpeg")
+            for ts, kf in zip(stamps, keyframes.frames)
+        ]
+
+        def _frame_preview(offset: int) -> Optional[BatchIssueCallback]:
+            if on_issue is None:
+                return None
+
+            def _emit(k: int, issue: LocalizationIssue) -> None:
+                ts = stamps[offset + k]
+                _preview(index, lambda x: _tag_frame(x, ts))(issue)
+            return _emit
+
+        per_batch = await asyncio.gather(*(
+            _call_images(frames[start:start + batch_size], _frame_preview(start))
+            for start in range(0, len(frames), batch_size)
+        ))
+
+        issues: List[LocalizationIssue] = []
+        for ts, frame_issues in zip(stamps, (x for batch in per_batch for x in batch)):
+            for issue in frame_issues:
+                _tag_frame(issue, ts)
+            issues.extend(frame_issues)
+        return issues
+
+    def _tag_segment(issue: LocalizationIssue, seg: VideoSegment) -> None:
+        issue.id = f"{issue.id}@s{seg.index}"
+        shift_timestamps([issue], seg.start)
+
+    async def _analyze_segment(
+        index: int, payload: UploadPayload, seg: VideoSegment
+    ) -> List[LocalizationIssue]:
+        part = payload_from_stream(f"{payload.filename}#{seg.index}", seg.stream, seg.mime_type)
+        preview = _preview(index, lambda x: _tag_segment(x, seg))
+        for attempt in range(_SEGMENT_ATTEMPTS):
+            try:
+                issues = await _call(part, "video", preview)
+                break
+            except Exception:
+                if attempt + 1 == _SEGMENT_ATTEMPTS:
+                    raise
+        for issue in issues:
+            _tag_segment(issue, seg)
+        return issues
+
+    async def _analyze_segmented(
+        index: int, payload: UploadPayload
+    ) -> Tuple[List[LocalizationIssue], Optional[int]]:
+        """segment_seconds보다 긴 비디오는 구간별로 동시에 분석 후 원본 타임라인으로 병합"""
+        segments = await run_in_threadpool(split_video, payload.stream)
+        if not segments:
+            issues = await _call(payload, "video", _preview(index))
+            duration = await run_in_threadpool(_safe_probe_duration, payload)
+            return issues, _upload_frame_count(duration)
+        try:
+            per_segment = await asyncio.gather(*(_analyze_segment(index, payload, seg) for seg in segments))
+        finally:
+            for seg in segments:
+                seg.stream.close()
+        # 인접 구간의 겹침 시간대에서 두 번 보고된 이슈만 하나로 (시각 오차 1초 허용)
+        issues = merge_overlap_duplicates(per_segment, [(seg.start, seg.end) for seg in segments])
+        return issues, sum(_upload_frame_count(seg.end - seg.start) or 0 for seg in segments)
+
+    async def _analyze_video(index: int) -> Tuple[List[LocalizationIssue], Optional[int]]:
+        """비디오 모드별 분석 후 같은 이슈의 반복 등장을 트랙으로 축약. (이슈, 실제 분석 프레임 수)"""
+        issues, frames = await _analyze_video_mode(index)
+        return track_issues(issues), frames
+
+    async def _analyze_video_mode(index: int) -> Tuple[List[LocalizationIssue], Optional[int]]:
+        """비디오 모드별 분석. (이슈, 실제 분석 프레임 수)"""
+        payload = payloads[index]
+        if options.video_mode == VideoMode.UPLOAD.value:
+            issues = await _call(payload, "video", _preview(index))
+            duration = await run_in_threadpool(_safe_probe_duration, payload)
+            return issues, _upload_frame_count(duration)
+        if options.video_mode == VideoMode.SEGMENTED.value:
+            return await _analyze_segmented(index, payload)
+
+        auto_upload = options.video_mode == VideoMode.AUTO.value and vision_provider.supports_video
+        if auto_upload:
+            # 긴 비디오는 디코딩 없이 메타데이터로 길이만 확인하고 바로 구간 분석
+            duration = await run_in_threadpool(_safe_probe_duration, payload)
+            if duration and duration > segment_seconds():
+                return await _analyze_segmented(index, payload)
+
+        # auto: 장면 전환이 기준보다 많아지는 순간 추출을 멈추고 업로드 경로로 (전체 디코딩/인코딩 없이)
+        keyframes = await run_in_threadpool(
+            extract_keyframes, payload.stream, stop_after=_auto_max_keyframes() if auto_upload else None
+        )
+        if keyframes.exceeded:
+            issues = await _call(payload, "video", _preview(index))
+            return issues, _upload_frame_count(keyframes.duration)
+
+        issues = await _analyze_keyframes(index, payload, keyframes)
+        return issues, len(keyframes.frames)
+
+    def _failed(members: List[int], e: Exception) -> List[Tuple[int, Outcome]]:
+        return [(i, FileAnalysisError(i, payloads[i].filename, e)) for i in members]
+
+    def _fan_out(
+        members: List[int], issues: List[LocalizationIssue], frames: Optional[int]
+    ) -> List[Tuple[int, Outcome]]:
+        # 대표 프레임의 이슈를 그룹 멤버 모두에게 복제 (frame_url만 각자 파일명으로)
+        outcomes: List[Tuple[int, Outcome]] = []
+        for i in members:
+            fname = payloads[i].filename
+            member_issues = issues if i == members[0] else [x.model_copy(deep=True) for x in issues]
+            for issue in member_issues:
+                issue.frame_url = fname
+            outcomes.append((i, FileAnalysisResult(
+                filename=fname, issues=member_issues, analyzed_frames=frames,
+            )))
+        return outcomes
+
+    async def _analyze_video_group(members: List[int]) -> List[Tuple[int, Outcome]]:
+        set_file_scope(members)
+        try:
+            issues, frames = await _analyze_video(members[0])
+        except Exception as e:
+            return _failed(members, e)
+        return _fan_out(members, issues, frames)
+
+    async def _analyze_image_groups(batch: List[List[int]]) -> List[Tuple[int, Outcome]]:
+        """그룹 대표 이미지들을 한 요청으로 분석 (실패 시 묶인 파일 모두 실패)"""
+        preview = (lambda k, issue: _preview(batch[k][0])(issue)) if on_issue else None
+        set_file_scope([i for members in batch for i in members])
+        try:
+            per_image = await _call_images([payloads[members[0]] for members in batch], preview)
+        except Exception as e:
+            return _failed([i for members in batch for i in members], e)
+        return [
+            pair for members, issues in zip(batch, per_image)
+            for pair in _fan_out(members, issues, None)
+        ]
+
+    if input_type == "video":
+        return [asyncio.create_task(_analyze_video_group(g)) for g in groups]
+    return [asyncio.create_task(_analyze_image_groups(b)) for b in _chunks(groups, batch_size)]
+
+
+async def analyze_batch(
+    vision_provider,
+    payloads: List[UploadPayload],
+    input_type: str,
+    options: Optional[AnalysisOptions] = None,
+) -> List[FileAnalysisResult]:
+    """배치 전체 분석. 결과는 업로드 순서, 한 파일이라도 실패하면 FileAnalysisError."""
+    results: List[Optional[FileAnalysisResult]] = [None] * len(payloads)
+    # 실패 즉시 제너레이터를 닫아 아직 대기 중인 호출은 취소
+    async with aclosing(iter_analysis(vision_provider, payloads, input_type, options)) as outcomes:
+        async for index, outcome in outcomes:
+            if isinstance(outcome, FileAnalysisError):
+                raise outcome
+            results[index] = outcome
+    return results
+
+
+async def iter_analysis(
+    vision_provider,
+    payloads: List[UploadPayload],
+    input_type: str,
+    options: Optional[AnalysisOptions] = None,
+    on_issue: Optional[BatchIssueCallback] = None,
+) -> AsyncIterator[Tuple[int, Outcome]]:
+    """
+    완료되는 순서대로 (업로드 인덱스, 결과 또는 오류)를 반환.
+    on_issue(업로드 인덱스, 이슈)는 모델 응답 스트림에서 이슈가 완성될 때마다 호출되는 미리보기
+    (작업 스레드에서 호출될 수 있음, 캐시 적중 시에는 호출되지 않음).
+    prefetch_alternatives면 미리보기 이슈부터 대체 문장 생성을 시작하고, 결과의 이슈에 준비된 대체 문장을 붙임
+    (파일마다 따로 기다리므로 먼저 끝난 파일이 다른 파일의 대체 문장을 기다리지 않음).
+    """
+    options = options or AnalysisOptions()
+    prefetcher = _start_prefetcher() if options.prefetch_alternatives else None
+    if prefetcher:
+        preview = on_issue
+
+        def on_issue(index: int, issue: LocalizationIssue) -> None:
+            prefetcher.submit_threadsafe(issue)
+            if preview:
+                preview(index, issue)
+
+    timings = current_collector()
+    tasks = await _start_tasks(vision_provider, payloads, input_type, options, on_issue)
+    waiting = [asyncio.create_task(_with_alternatives(prefetcher, t)) for t in tasks] if prefetcher else tasks
+    try:
+        for fut in asyncio.as_completed(waiting):
+            for index, outcome in await fut:
+                _count_outcome(input_type, outcome)
+                if timings is not None:
+                    timings.finish_file(index)
+                yield index, outcome
+    finally:
+        for t in tasks + waiting:
+            t.cancel()
+        if prefetcher:
+            prefetcher.close()
+
+
+def _start_prefetcher() -> Optional[AlternativesPrefetcher]:
+    """대체 문장 프로바이더를 쓸 수 없으면 미리 생성 없이 분석만 진행"""
+    try:
+        return AlternativesPrefetcher(get_alternatives_provider())
+    except Exception as e:
+        print(f"[LocaLens] 대체 문장 미리 생성 건너뜀: {e}", flush=True)
+        return None
+
+
+async def _with_alternatives(
+    prefetcher: AlternativesPrefetcher, task: "asyncio.Task[List[Tuple[int, Outcome]]]"
+) -> List[Tuple[int, Outcome]]:
+    outcomes = await task
+    await asyncio.gather(*(
+        prefetcher.attach(outcome.issues)
+        for _, outcome in outcomes if isinstance(outcome, FileAnalysisResult)
+    ))
+    return outcomes
+
+
+def _count_outcome(input_type: str, outcome: Outcome) -> None:
+    if isinstance(outcome, FileAnalysisError):
+        FILES.inc(input_type=input_type, outcome="error")
+        return
+    FILES.inc(input_type=input_type, outcome="ok")
+    for issue in outcome.issues:
+        ISSUES.inc(type=getattr(issue.type, "value", issue.type))
+
+
+def count_analyzed_frames(results: List[FileAnalysisResult]) -> Optional[int]:
+    """파일별 분석 프레임 수 합계 (비디오가 아니면 None)"""
+    frames = [r.analyzed_frames for r in results if r.analyzed_frames is not None]
+    return sum(frames) if frames else None
@@ -1,33 +1,148 @@
 """
 파일 유효성 검사 및 바이트 읽기 서비스
+- 업로드를 청크 단위로 한 번만 읽으며 크기/시그니처 검사 + 내용 해시 계산
 """
 
+import io
 import sys
+import hashlib
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, List, Optional, Tuple
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 # contracts import
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
 from contracts.types import InputType
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+from telemetry.metrics import timed_stage
+
 # 허용 확장자 및 크기 제한
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".webm"}
 IMAGE_MAX_SIZE = 10 * 1024 * 1024       # 10 MB
 VIDEO_MAX_SIZE = 100 * 1024 * 1024      # 100 MB
 
+READ_CHUNK_SIZE = 1024 * 1024           # 1 MB
+
+# ISO BMFF(mp4/mov) 최상위 박스 타입
+_ISO_BOX_TYPES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip"}
+
+
+@dataclass
+class UploadPayload:
+    """검증을 통과한 업로드. 이미지는 읽은 바이트를, 비디오는 스풀 파일 핸들을 보관."""
+    filename: str
+    size: int
+    mime_type: str
+    sha256: str
+    stream: BinaryIO
+    data: Optional[bytes] = None
+
+
+def payload_from_bytes(filename: str, data: bytes, mime_type: Optional[str] = None) -> UploadPayload:
+    """메모리 바이트(추출한 비디오 프레임 등)를 분석 입력으로 감싸기"""
+    return UploadPayload(
+        filename=filename,
+        size=len(data),
+        mime_type=mime_type or sniff_mime_type(data[:16]) or "application/octet-stream",
+        sha256=hashlib.sha256(data).hexdigest(),
+        stream=io.BytesIO(data),
+        data=data,
+    )
+
+
+def payload_from_stream(filename: str, stream: BinaryIO, mime_type: str) -> UploadPayload:
+    """스풀 스트림(분할한 비디오 구간 등)을 분석 입력으로 감싸기. 해시는 청크 단위로 계산."""
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return UploadPayload(
+        filename=filename, size=size, mime_type=mime_type, sha256=digest.hexdigest(), stream=stream,
+    )
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """파일 앞부분 매직 바이트로 MIME 타입 감지"""
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if head[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:4] == b"GIF8":
+        return "image/gif"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "video/webm"
+    if head[4:8] in _ISO_BOX_TYPES:
+        return "video/quicktime" if head[8:10] == b"qt" else "video/mp4"
+    return None
+
+
+async def _read_upload(
+    f: UploadFile, max_size: int, keep_bytes: bool
+) -> Tuple[Optional[str], Optional[UploadPayload]]:
+    """청크 단위 단일 패스 읽기. 크기 초과 시 즉시 중단."""
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    size = 0
+    mime_type: Optional[str] = None
 
-async def validate_files(files: List[UploadFile], input_type: InputType) -> List[str]:
-    """파일 유효성 검사. 오류 메시지 리스트를 반환 (빈 리스트 = 유효)."""
+    await f.seek(0)
+    while True:
+        chunk = await f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if size == 0:
+            mime_type = sniff_mime_type(chunk)
+            if mime_type is None:
+                return f"'{f.filename}': 파일 내용이 허용된 이미지/비디오 형식이 아닙니다.", None
+        size += len(chunk)
+        if size > max_size:
+            return (
+                f"'{f.filename}': 파일 크기 초과 (> {max_size / 1024 / 1024:.0f}MB)",
+                None,
+            )
+        digest.update(chunk)
+        if keep_bytes:
+            chunks.append(chunk)
+    await f.seek(0)
+
+    if size == 0:
+        return f"'{f.filename}': 빈 파일입니다.", None
+
+    return None, UploadPayload(
+        filename=f.filename or "unknown",
+        size=size,
+        mime_type=mime_type or "application/octet-stream",
+        sha256=digest.hexdigest(),
+        stream=f.file,
+        data=b"".join(chunks) if keep_bytes else None,
+    )
+
+
+@timed_stage("validate_files")
+async def validate_files(
+    files: List[UploadFile], input_type: InputType
+) -> Tuple[List[str], List[UploadPayload]]:
+    """파일 유효성 검사. (오류 메시지 리스트, 검증된 업로드 목록)을 반환 (빈 오류 = 유효)."""
     errors: List[str] = []
+    payloads: List[UploadPayload] = []
 
     if not files:
         errors.append("파일이 제공되지 않았습니다.")
-        return errors
+        return errors, payloads
 
-    allowed_exts = IMAGE_EXTENSIONS if input_type == InputType.IMAGE else VIDEO_EXTENSIONS
-    max_size = IMAGE_MAX_SIZE if input_type == InputType.IMAGE else VIDEO_MAX_SIZE
+    is_image = input_type == InputType.IMAGE
+    allowed_exts = IMAGE_EXTENSIONS if is_image else VIDEO_EXTENSIONS
+    max_size = IMAGE_MAX_SIZE if is_image else VIDEO_MAX_SIZE
+    mime_prefix = "image/" if is_image else "video/"
 
     for f in files:
         ext = Path(f.filename or "").suffix.lower()
@@ -35,22 +150,33 @@ async def validate_files(files: List[UploadFile], input_type: InputType) -> List
             errors.append(
                 f"'{f.filename}': 허용되지 않는 형식입니다. 허용: {', '.join(allowed_exts)}"
             )
-        # 파일 크기 확인
-        content = await f.read()
-        await f.seek(0)
-        if len(content) > max_size:
-            errors.append(
-                f"'{f.filename}': 파일 크기 초과 ({len(content) / 1024 / 1024:.1f}MB > {max_size / 1024 / 1024:.0f}MB)"
-            )
+            continue
+
+        # 이미지는 분석 단계에서 재사용하도록 바이트 보관, 비디오는 스풀 파일만 유지
+        error, payload = await _read_upload(f, max_size, keep_bytes=is_image)
+        if error is None and not payload.mime_type.startswith(mime_prefix):
+            error = f"'{f.filename}': 파일 내용({payload.mime_type})이 입력 유형과 맞지 않습니다."
+        if error:
+            errors.append(error)
+            continue
+        payloads.append(payload)
+
+    return errors, payloads
 
-    return errors
 
+def _read_stream(stream: BinaryIO) -> bytes:
+    stream.seek(0)
+    content = stream.read()
+    stream.seek(0)
+    return content
 
-async def get_file_bytes(files: List[UploadFile]) -> List[bytes]:
-    """파일들의 바이트 데이터를 반환."""
+
+@timed_stage("read_bytes")
+async def get_file_bytes(payloads: List[UploadPayload]) -> List[bytes]:
+    """검증된 업로드의 바이트 데이터를 반환 (검증 중 읽은 바이트는 재사용)."""
     result: List[bytes] = []
-    for f in files:
-        content = await f.read()
-        await f.seek(0)
-        result.append(content)
+    for p in payloads:
+        if p.data is None:
+            p.data = await run_in_threadpool(_read_stream, p.stream)
+        result.append(p.data)
     return result
@@ -0,0 +1,377 @@
+"""
+비동기 분석 작업 큐
+- SQLite 영속 큐 + 업로드 파일은 작업 디렉터리에 보관
+- 제한된 수의 워커가 작업을 가져가 처리하고 파일별 결과를 즉시 기록 (부분 결과 조회 가능)
+- 하트비트가 끊긴 작업(재시작/프로세스 종료)은 다시 대기열로, 완료된 파일은 건너뜀
+- 모든 파일이 실패하면 failed, 일부만 실패하면 partial
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import asyncio
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+# contracts import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from contracts.types import FileAnalysisResult
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+from providers.rate_limit import PRIORITY_BACKGROUND, request_priority
+
+from app.services.analysis import AnalysisOptions, FileAnalysisError, iter_analysis
+from app.services.file_handler import UploadPayload
+from app.services.provider_registry import get_vision_provider
+
+JOBS_DIR = Path(os.getenv(
+    "JOBS_DIR", str(Path(__file__).resolve().parent.parent.parent / ".cache" / "jobs")
+))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+HEARTBEAT_INTERVAL = 15
+POLL_INTERVAL = 2.0
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+PARTIAL = "partial"       # 일부 파일만 실패
+FAILED = "failed"
+
+
+class JobStore:
+    """작업/파일 상태를 SQLite에 저장 (스레드 안전, 여러 프로세스 공유 가능)"""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, provider TEXT NOT NULL,"
+            " input_type TEXT NOT NULL, options TEXT NOT NULL, error TEXT,"
+            " created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL);"
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);"
+            "CREATE TABLE IF NOT EXISTS job_files ("
+            " job_id TEXT NOT NULL, idx INTEGER NOT NULL, filename TEXT NOT NULL,"
+            " path TEXT NOT NULL, mime_type TEXT NOT NULL, sha256 TEXT NOT NULL, size INTEGER NOT NULL,"
+            " status TEXT NOT NULL, result TEXT, error TEXT, PRIMARY KEY (job_id, idx));"
+        )
+        self._db.commit()
+
+    def create_job(
+        self, job_id: str, provider: str, input_type: str, options: AnalysisOptions,
+        files: List[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, provider, input_type, options, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, provider, input_type, json.dumps(asdict(options)), time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO job_files (job_id, idx, filename, path, mime_type, sha256, size, status)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, i, f["filename"], f["path"], f["mime_type"], f["sha256"], f["size"], QUEUED)
+                    for i, f in enumerate(files)
+                ],
+            )
+            self._db.commit()
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """대기 중이거나 하트비트가 끊긴 작업 하나를 원자적으로 가져옴"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE status = ? OR (status = ? AND heartbeat_at < ?)"
+                " ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now - JOB_LEASE_SECONDS),
+            ).fetchone()
+            if row is None:
+                self._db.commit()
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?), heartbeat_at = ?"
+                " WHERE id = ?",
+                (RUNNING, now, now, row["id"]),
+            )
+            self._db.commit()
+            return dict(row)
+
+    def requeue(self, job_id: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, heartbeat_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+            self._db.commit()
+
+    def heartbeat(self, job_id: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+            self._db.commit()
+
+    def pending_files(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM job_files WHERE job_id = ? AND status = ? ORDER BY idx",
+                (job_id, QUEUED),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def save_file_result(self, job_id: str, idx: int, result: FileAnalysisResult) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_files SET status = ?, result = ? WHERE job_id = ? AND idx = ?",
+                (COMPLETED, result.model_dump_json(), job_id, idx),
+            )
+            self._db.commit()
+
+    def save_file_error(self, job_id: str, idx: int, detail: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_files SET status = ?, error = ? WHERE job_id = ? AND idx = ?",
+                (FAILED, detail, job_id, idx),
+            )
+            self._db.commit()
+
+    def file_status_counts(self, job_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM job_files WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+            return {r[0]: r[1] for r in rows}
+
+    def finish_job(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            self._db.commit()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = self._db.execute(
+                "SELECT idx, filename, status, result, error FROM job_files"
+                " WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        return {**dict(job), "files": [dict(f) for f in files]}
+
+    def purge_expired(self) -> List[str]:
+        """보관 기간이 지난 완료/부분 실패/실패 작업 삭제. 삭제된 작업 id 반환."""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        with self._lock:
+            ids = [r[0] for r in self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                (COMPLETED, PARTIAL, FAILED, cutoff),
+            ).fetchall()]
+            for job_id in ids:
+                self._db.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+                self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._db.commit()
+        return ids
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """프로세스 공용 작업 저장소 (최초 사용 시 생성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore(JOBS_DIR / "jobs.sqlite3")
+    return _store
+
+
+# ─── 작업 등록 ────────────────────────────────────────────
+
+def _persist_upload(payload: UploadPayload, dest: Path) -> None:
+    if payload.data is not None:
+        dest.write_bytes(payload.data)
+        return
+    payload.stream.seek(0)
+    with open(dest, "wb") as out:
+        shutil.copyfileobj(payload.stream, out, COPY_CHUNK_SIZE)
+    payload.stream.seek(0)
+
+
+async def enqueue_job(
+    payloads: List[UploadPayload], provider: str, input_type: str, options: AnalysisOptions
+) -> str:
+    """업로드를 작업 디렉터리로 옮기고 대기열에 등록. 작업 id 반환."""
+    job_id = uuid.uuid4().hex
+    job_dir = JOBS_DIR / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    files: List[Dict[str, Any]] = []
+    for i, p in enumerate(payloads):
+        dest = job_dir / f"{i}{Path(p.filename).suffix.lower()}"
+        await run_in_threadpool(_persist_upload, p, dest)
+        files.append({
+            "filename": p.filename, "path": str(dest), "mime_type": p.mime_type,
+            "sha256": p.sha256, "size": p.size,
+        })
+
+    await run_in_threadpool(get_job_store().create_job, job_id, provider, input_type, options, files)
+    _wakeup.set()
+    return job_id
+
+
+def record_completed_job(
+    provider: str, input_type: str, results: List[FileAnalysisResult]
+) -> str:
+    """워커를 거치지 않고 이미 완료된 작업으로 기록 (Mock 모드)"""
+    store = get_job_store()
+    job_id = uuid.uuid4().hex
+    store.create_job(job_id, provider, input_type, AnalysisOptions(use_cache=False), [
+        {"filename": r.filename, "path": "", "mime_type": "", "sha256": "", "size": 0}
+        for r in results
+    ])
+    for i, r in enumerate(results):
+        store.save_file_result(job_id, i, r)
+    store.finish_job(job_id, COMPLETED)
+    return job_id
+
+
+# ─── 워커 풀 ──────────────────────────────────────────────
+
+_wakeup = asyncio.Event()
+_workers: List["asyncio.Task[None]"] = []
+
+
+def _load_payload(row: Dict[str, Any], input_type: str) -> UploadPayload:
+    stream = open(row["path"], "rb")
+    return UploadPayload(
+        filename=row["filename"],
+        size=row["size"],
+        mime_type=row["mime_type"],
+        sha256=row["sha256"],
+        stream=stream,
+        data=stream.read() if input_type == "image" else None,
+    )
+
+
+async def _heartbeat_loop(store: JobStore, job_id: str) -> None:
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        await run_in_threadpool(store.heartbeat, job_id)
+
+
+def _final_status(counts: Dict[str, int]) -> Tuple[str, Optional[str]]:
+    """파일별 결과로 작업 최종 상태 결정 (이전 실행에서 끝난 파일 포함)"""
+    failed = counts.get(FAILED, 0)
+    if not failed:
+        return COMPLETED, None
+    total = sum(counts.values())
+    if failed == total:
+        return FAILED, f"모든 파일 분석 실패 ({failed}개)"
+    return PARTIAL, f"{total}개 중 {failed}개 파일 분석 실패"
+
+
+async def _run_job(store: JobStore, job: Dict[str, Any]) -> None:
+    job_id = job["id"]
+    input_type = job["input_type"]
+
+    try:
+        vision_provider = get_vision_provider(job["provider"])
+    except Exception as e:
+        await run_in_threadpool(
+            store.finish_job, job_id, FAILED, f"AI 프로바이더({job['provider']}) 초기화 실패: {e}"
+        )
+        return
+
+    rows = await run_in_threadpool(store.pending_files, job_id)
+    payloads = [await run_in_threadpool(_load_payload, r, input_type) for r in rows]
+    heartbeat = asyncio.create_task(_heartbeat_loop(store, job_id))
+    try:
+        options = AnalysisOptions(**json.loads(job["options"]))
+        async for pos, outcome in iter_analysis(vision_provider, payloads, input_type, options):
+            idx = rows[pos]["idx"]
+            if isinstance(outcome, FileAnalysisError):
+                await run_in_threadpool(store.save_file_error, job_id, idx, str(outcome))
+            else:
+                await run_in_threadpool(store.save_file_result, job_id, idx, outcome)
+    finally:
+        heartbeat.cancel()
+        for p in payloads:
+            p.stream.close()
+
+    counts = await run_in_threadpool(store.file_status_counts, job_id)
+    await run_in_threadpool(store.finish_job, job_id, *_final_status(counts))
+
+
+async def _process_job(store: JobStore, job: Dict[str, Any]) -> None:
+    """작업 하나 처리. 끝나면(실패 포함) 업로드 파일 삭제, 종료로 취소되면 파일을 남기고 대기열로."""
+    job_id = job["id"]
+    requeued = False
+    try:
+        await _run_job(store, job)
+    except asyncio.CancelledError:
+        # 종료 시 진행 중이던 작업은 바로 대기열로 (완료된 파일은 유지)
+        store.requeue(job_id)
+        requeued = True
+        raise
+    except Exception as e:
+        await run_in_threadpool(store.finish_job, job_id, FAILED, str(e))
+    finally:
+        if not requeued:
+            shutil.rmtree(JOBS_DIR / job_id, ignore_errors=True)
+
+
+async def _worker_loop() -> None:
+    store = get_job_store()
+    # 작업 큐의 호출은 화면에서 기다리는 요청보다 뒤에 (프로바이더 한도에 걸릴 때)
+    request_priority.set(PRIORITY_BACKGROUND)
+    while True:
+        job = await run_in_threadpool(store.claim_next)
+        if job is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await _process_job(store, job)
+
+
+def start_job_workers() -> None:
+    """워커 풀 시작 (앱 시작 시 호출). 이전 프로세스가 남긴 작업도 이어서 처리."""
+    if _workers:
+        return
+    for job_id in get_job_store().purge_expired():
+        shutil.rmtree(JOBS_DIR / job_id, ignore_errors=True)
+    for _ in range(max(1, JOB_WORKERS)):
+        _workers.append(asyncio.create_task(_worker_loop()))
+
+
+async def stop_job_workers() -> None:
+    """워커 풀 종료. 진행 중인 작업은 다시 대기열로 돌아가 재시작 후 이어서 처리."""
+    for t in _workers:
+        t.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -0,0 +1,62 @@
+"""
+요청 프로파일 저장소
+- PROFILING=header: X-LocaLens-Profile 헤더가 있는 요청만, always: 모든 분석 요청, off(기본): 사용 안 함
+- 샘플링 결과(collapsed stack 텍스트)를 PROFILE_DIR에 저장하고 GET /api/profiles/{id}로 내려받음
+- 최근 PROFILE_MAX_FILES개만 보관
+"""
+
+import os
+import re
+import sys
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# ai-core import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+from telemetry.profiler import SamplingProfiler
+
+PROFILE_DIR = Path(os.getenv(
+    "PROFILE_DIR", str(Path(__file__).resolve().parent.parent.parent / ".cache" / "profiles")
+))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_SUFFIX = ".folded"
+
+_PROFILE_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def profiling_mode() -> str:
+    return os.getenv("PROFILING", "off").strip().lower()
+
+
+def response_timings_enabled() -> bool:
+    """모든 분석 응답에 단계별 소요 시간 포함 (아니면 X-LocaLens-Timings 요청만)"""
+    return os.getenv("RESPONSE_TIMINGS", "false").lower() == "true"
+
+
+def start_profiler(requested: bool) -> Optional[SamplingProfiler]:
+    """이번 요청을 프로파일링할지 결정하고 시작 (아니면 None)"""
+    mode = profiling_mode()
+    if mode == "always" or (mode == "header" and requested):
+        return SamplingProfiler().start()
+    return None
+
+
+def save_profile(profiler: SamplingProfiler) -> str:
+    """샘플링을 멈추고 저장, 프로파일 id 반환 (오래된 파일은 정리)"""
+    text = profiler.stop()
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    (PROFILE_DIR / f"{profile_id}{PROFILE_SUFFIX}").write_text(text, encoding="utf-8")
+
+    files = sorted(PROFILE_DIR.glob(f"*{PROFILE_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[PROFILE_MAX_FILES:]:
+        old.unlink(missing_ok=True)
+    return profile_id
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    if not _PROFILE_ID.fullmatch(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}{PROFILE_SUFFIX}"
+    return path if path.is_file() else None
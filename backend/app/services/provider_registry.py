@@ -0,0 +1,104 @@
+"""
+AI 프로바이더 레지스트리
+- 앱 시작 시 프로바이더를 한 번 생성해 SDK 클라이언트(HTTP keep-alive 커넥션)를 재사용
+- 개발 중 코드 변경 반영은 reload_providers()로 명시적으로 수행
+"""
+
+import sys
+import importlib
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+# contracts / ai-core import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from contracts.types import AIProvider
+
+AI_CORE_PATH = str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core")
+if AI_CORE_PATH not in sys.path:
+    sys.path.insert(0, AI_CORE_PATH)
+from providers.base import VisionProvider
+import providers.hedging  # reload 대상: 함수/클래스는 호출 시점에 sys.modules에서 조회
+from providers.rate_limit import rate_limit_stats
+from providers.usage import usage_stats
+
+# reload 순서 (의존 모듈 먼저)
+_RELOAD_MODULES = [
+    "prompts.image_analysis",
+    "prompts.video_analysis",
+    "prompts.alternatives",
+    "parsers.result_parser",
+    "parsers.suggestion_localizer",
+    "preprocess.image_preprocessor",
+    "providers.base",
+    "providers.gemini_client",
+    "providers.claude_client",
+    "providers.hedging",
+]
+
+_providers: Dict[str, VisionProvider] = {}
+_lock = threading.Lock()
+
+
+def _create_provider(provider_name: str) -> VisionProvider:
+    # reload 이후의 팩토리를 쓰도록 호출 시점에 조회
+    get_provider = sys.modules["providers.base"].get_provider
+    vision_provider = get_provider(provider_name)
+    print(f"[LocaLens] provider={provider_name} model={getattr(vision_provider, '_model', '?')}", flush=True)
+
+    hedging = sys.modules["providers.hedging"]
+    if hedging.hedging_enabled():
+        # 헤지 대상은 호출 시점에 조회 (레지스트리 잠금 안에서 다른 프로바이더를 만들지 않도록)
+        backup_name = hedging.hedge_provider_name()
+        backup = None
+        if backup_name and backup_name != provider_name:
+            backup = lambda: get_vision_provider(backup_name)
+        vision_provider = hedging.HedgedProvider(vision_provider, backup)
+    return vision_provider
+
+
+def init_providers() -> None:
+    """등록된 모든 프로바이더를 미리 생성 (초기화 실패 시 요청 시점에 재시도)"""
+    for p in AIProvider:
+        try:
+            get_vision_provider(p.value)
+        except Exception as e:
+            print(f"[LocaLens] provider={p.value} 초기화 건너뜀: {e}", flush=True)
+
+
+def get_vision_provider(provider_name: str) -> VisionProvider:
+    """프로세스 공용 프로바이더 인스턴스 반환 (없으면 생성)"""
+    vision_provider = _providers.get(provider_name)
+    if vision_provider is not None:
+        return vision_provider
+
+    with _lock:
+        if provider_name not in _providers:
+            _providers[provider_name] = _create_provider(provider_name)
+        return _providers[provider_name]
+
+
+def reload_providers() -> List[str]:
+    """ai-core 모듈을 다시 로드하고 프로바이더를 재생성 (개발용)"""
+    with _lock:
+        for mod_name in _RELOAD_MODULES:
+            if mod_name in sys.modules:
+                importlib.reload(sys.modules[mod_name])
+        _providers.clear()
+
+    init_providers()
+    return sorted(_providers)
+
+
+def hedging_stats() -> Dict[str, object]:
+    """헤지 요청 카운터 (reload 이후 새 모듈의 카운터를 보도록 호출 시점에 조회)"""
+    return sys.modules["providers.hedging"].hedging_stats()
+
+
+async def close_providers() -> None:
+    """앱 종료 시 프로바이더별 원격 리소스 정리"""
+    for vision_provider in list(_providers.values()):
+        try:
+            await vision_provider.aclose()
+        except Exception as e:
+            print(f"[LocaLens] provider={vision_provider.name} 정리 실패: {e}", flush=True)
@@ -0,0 +1,182 @@
+"""
+분석 결과 캐시
+- 키: 파일 내용 해시 + 프로바이더 + 모델명 + 프롬프트 해시
+- 메모리 LRU + 디스크(SQLite) 2단계, TTL / 용량 기반 제거
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# contracts / ai-core import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from contracts.types import LocalizationIssue
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent / "ai-core"))
+import prompts.image_analysis as image_prompts
+import prompts.video_analysis as video_prompts
+from parsers.suggestion_localizer import suggestion_signature
+from preprocess.image_preprocessor import preprocess_signature
+
+CACHE_DIR = Path(os.getenv(
+    "RESULT_CACHE_DIR", str(Path(__file__).resolve().parent.parent.parent / ".cache")
+))
+MEMORY_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "256"))
+DISK_MAX_BYTES = int(os.getenv("RESULT_CACHE_DISK_MAX_MB", "256")) * 1024 * 1024
+TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def is_cache_enabled() -> bool:
+    return os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+
+
+def _prompt_hash(input_type: str) -> str:
+    # 저장되는 이슈의 수정 제안은 현지화된 문장이므로 대상 언어/문구 표도 반영
+    if input_type == "video":
+        text = video_prompts.VIDEO_SYSTEM_PROMPT + video_prompts.VIDEO_USER_PROMPT
+    else:
+        # 이미지 전처리 설정이 바뀌면 모델 입력도 달라지므로 함께 반영
+        text = (
+            image_prompts.IMAGE_SYSTEM_PROMPT + image_prompts.IMAGE_USER_PROMPT
+            + image_prompts.IMAGE_BATCH_USER_PROMPT + preprocess_signature()
+        )
+    text += suggestion_signature()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(content_hash: str, vision_provider, input_type: str) -> str:
+    """내용 해시 + 프로바이더 + 모델 + 프롬프트 해시로 캐시 키 생성"""
+    model = getattr(vision_provider, "_model", "?")
+    return f"{vision_provider.name}:{model}:{input_type}:{_prompt_hash(input_type)}:{content_hash}"
+
+
+class ResultCache:
+    """메모리 LRU + SQLite 디스크 2단계 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, db_path: Path, memory_entries: int, disk_max_bytes: int, ttl: int):
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._memory_entries = memory_entries
+        self._disk_max_bytes = disk_max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0,
+        }
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 여러 워커 프로세스가 같은 파일을 공유하므로 WAL 모드 사용
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[List[LocalizationIssue]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] <= self._ttl:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._decode(entry[1])
+            if entry:
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self._ttl:
+                self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                self._remember(key, row[1], row[0])
+                self._counters["disk_hits"] += 1
+                return self._decode(row[0])
+            if row:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, issues: List[LocalizationIssue]) -> None:
+        now = time.time()
+        payload = json.dumps([i.model_dump(mode="json") for i in issues], ensure_ascii=False)
+        with self._lock:
+            self._remember(key, now, payload)
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict_disk(now)
+            self._db.commit()
+            self._counters["writes"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            disk_entries, disk_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def _remember(self, key: str, created_at: float, payload: str) -> None:
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        # TTL 만료 항목 제거 후, 용량 초과분은 가장 오래 사용되지 않은 항목부터 제거
+        cur = self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self._ttl,))
+        self._counters["evictions"] += cur.rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self._disk_max_bytes:
+            return
+        for key, size in self._db.execute(
+            "SELECT key, size FROM results ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self._disk_max_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._counters["evictions"] += 1
+
+    @staticmethod
+    def _decode(payload: str) -> List[LocalizationIssue]:
+        # 호출자가 결과를 수정해도 캐시가 오염되지 않도록 매번 새 객체 생성
+        return [LocalizationIssue.model_validate(d) for d in json.loads(payload)]
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """프로세스 공용 결과 캐시 (최초 사용 시 생성)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(
+                    CACHE_DIR / "results.sqlite3",
+                    MEMORY_MAX_ENTRIES,
+                    DISK_MAX_BYTES,
+                    TTL_SECONDS,
+                )
+    return _cache
@@ -0,0 +1,100 @@
+"""
+작업 큐 회귀 테스트 (리스 만료 후 재할당 / 최종 상태 / 업로드 파일 정리)
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services import job_queue
+from app.services.analysis import AnalysisOptions
+from app.services.job_queue import COMPLETED, FAILED, PARTIAL, QUEUED, JobStore, _final_status
+
+
+def _files(count: int) -> list:
+    return [
+        {"filename": f"{i}.png", "path": "", "mime_type": "image/png", "sha256": "", "size": 0}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> JobStore:
+    monkeypatch.setattr(job_queue, "JOBS_DIR", tmp_path)
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+def _status(store: JobStore, job_id: str) -> str:
+    return store.get_job(job_id)["status"]
+
+
+def test_expired_lease_is_claimed_again(store, monkeypatch):
+    store.create_job("a", "gemini", "image", AnalysisOptions(), _files(1))
+    assert store.claim_next()["id"] == "a"
+    assert store.claim_next() is None                 # 하트비트가 살아 있는 동안은 다른 워커가 못 가져감
+
+    monkeypatch.setattr(job_queue, "JOB_LEASE_SECONDS", 0)
+    time.sleep(0.01)
+    assert store.claim_next()["id"] == "a"            # 하트비트가 끊기면 다시 할당
+
+
+def test_requeue_keeps_finished_files(store):
+    store.create_job("a", "gemini", "image", AnalysisOptions(), _files(2))
+    store.claim_next()
+    store.save_file_error("a", 0, "boom")
+    store.requeue("a")
+    assert _status(store, "a") == QUEUED
+    assert [f["idx"] for f in store.pending_files("a")] == [1]
+
+
+def test_final_status():
+    assert _final_status({COMPLETED: 3}) == (COMPLETED, None)
+    assert _final_status({FAILED: 2})[0] == FAILED
+    assert _final_status({COMPLETED: 1, FAILED: 1})[0] == PARTIAL
+
+
+def test_provider_init_failure_removes_uploads(store, tmp_path, monkeypatch):
+    def _unavailable(name):
+        raise ValueError("no key")
+
+    monkeypatch.setattr(job_queue, "get_vision_provider", _unavailable)
+    store.create_job("a", "gemini", "image", AnalysisOptions(), _files(1))
+    (tmp_path / "a").mkdir()
+    asyncio.run(job_queue._process_job(store, store.claim_next()))
+    assert _status(store, "a") == FAILED
+    assert not (tmp_path / "a").exists()
+
+
+def test_unexpected_error_removes_uploads(store, tmp_path, monkeypatch):
+    async def _broken(store, job):
+        raise RuntimeError("db gone")
+
+    monkeypatch.setattr(job_queue, "_run_job", _broken)
+    store.create_job("a", "gemini", "image", AnalysisOptions(), _files(1))
+    (tmp_path / "a").mkdir()
+    asyncio.run(job_queue._process_job(store, store.claim_next()))
+    assert store.get_job("a")["error"] == "db gone"
+    assert not (tmp_path / "a").exists()
+
+
+def test_cancelled_job_is_requeued_with_uploads(store, tmp_path, monkeypatch):
+    async def _slow(store, job):
+        await asyncio.sleep(10)
+
+    async def _cancel_midway():
+        task = asyncio.create_task(job_queue._process_job(store, store.claim_next()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    monkeypatch.setattr(job_queue, "_run_job", _slow)
+    store.create_job("a", "gemini", "image", AnalysisOptions(), _files(1))
+    (tmp_path / "a").mkdir()
+    asyncio.run(_cancel_midway())
+    assert _status(store, "a") == QUEUED
+    assert (tmp_path / "a").exists()
@@ -0,0 +1,101 @@
+"""
+결과 캐시 회귀 테스트 (키 구성 / 프롬프트·전처리·제안 언어 변경 시 무효화 / TTL·용량 제거)
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services import result_cache
+from app.services.result_cache import ResultCache, make_cache_key
+from contracts.types import LocalizationIssue
+
+GEMINI = SimpleNamespace(name="gemini", _model="gemini-3-flash-preview")
+
+
+def _issue(issue_id: str) -> LocalizationIssue:
+    return LocalizationIssue.model_validate({
+        "id": issue_id,
+        "type": "TEXT_TRUNCATION",
+        "severity": "HIGH",
+        "description": "Button label is cut off",
+        "location": {"x1": 100, "y1": 100, "x2": 200, "y2": 150},
+        "language": "ja-JP",
+        "suggestion": "버튼 너비를 확장하세요",
+    })
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResultCache:
+    return ResultCache(tmp_path / "results.sqlite3", memory_entries=2, disk_max_bytes=1 << 20, ttl=3600)
+
+
+def test_key_separates_provider_model_input_and_content():
+    claude = SimpleNamespace(name="claude", _model="claude-opus-4")
+    other_model = SimpleNamespace(name="gemini", _model="gemini-other")
+    keys = {
+        make_cache_key("sha-a", GEMINI, "image"),
+        make_cache_key("sha-b", GEMINI, "image"),
+        make_cache_key("sha-a", GEMINI, "video"),
+        make_cache_key("sha-a", claude, "image"),
+        make_cache_key("sha-a", other_model, "image"),
+    }
+    assert len(keys) == 5
+    assert make_cache_key("sha-a", GEMINI, "image") == make_cache_key("sha-a", GEMINI, "image")
+
+
+def test_prompt_change_invalidates_key(monkeypatch):
+    before = make_cache_key("sha", GEMINI, "image")
+    monkeypatch.setattr(result_cache.image_prompts, "IMAGE_SYSTEM_PROMPT", "changed prompt")
+    assert make_cache_key("sha", GEMINI, "image") != before
+
+
+def test_preprocess_change_invalidates_image_keys_only(monkeypatch):
+    image, video = make_cache_key("sha", GEMINI, "image"), make_cache_key("sha", GEMINI, "video")
+    monkeypatch.setenv("IMAGE_MAX_EDGE", "1024")
+    assert make_cache_key("sha", GEMINI, "image") != image
+    assert make_cache_key("sha", GEMINI, "video") == video
+
+
+def test_suggestion_language_change_invalidates_key(monkeypatch):
+    monkeypatch.setenv("SUGGESTION_LANGUAGE", "ko")
+    korean = make_cache_key("sha", GEMINI, "image")
+    monkeypatch.setenv("SUGGESTION_LANGUAGE", "en")
+    assert make_cache_key("sha", GEMINI, "image") != korean
+
+
+def test_disk_hit_after_memory_eviction(cache):
+    for key in ("a", "b", "c"):                       # 메모리에는 최근 2개만
+        cache.set(key, [_issue(key)])
+    assert [i.id for i in cache.get("a")] == ["a"]
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_entries"], stats["disk_entries"]) == (1, 2, 3)
+
+
+def test_cached_result_is_a_copy(cache):
+    cache.set("k", [_issue("a")])
+    cache.get("k")[0].description = "edited by caller"
+    assert cache.get("k")[0].description == "Button label is cut off"
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", memory_entries=2, disk_max_bytes=1 << 20, ttl=0)
+    cache.set("k", [_issue("a")])
+    time.sleep(0.01)
+    assert cache.get("k") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_size_limit_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", memory_entries=1, disk_max_bytes=700, ttl=3600)
+    cache.set("old", [_issue("old")])
+    time.sleep(0.01)
+    cache.set("new", [_issue("new")])
+    time.sleep(0.01)
+    cache.set("newest", [_issue("newest")])
+    assert cache.get("old") is None
+    assert cache.get("newest") is not None
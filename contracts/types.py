@@ -4,7 +4,7 @@ Python 타입 (Backend + AI Core 공용)
 """
 
 from enum import Enum
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 
 
@@ -20,6 +20,13 @@ class AIProvider(str, Enum):
     CLAUDE = "claude"
 
 
+class VideoMode(str, Enum):
+    UPLOAD = "upload"         # 비디오 파일 전체를 프로바이더에 업로드 (Gemini)
+    KEYFRAMES = "keyframes"   # 로컬에서 키프레임 추출 후 이미지 분석
+    SEGMENTED = "segmented"   # 긴 비디오를 구간으로 나눠 병렬 업로드 분석 (Gemini)
+    AUTO = "auto"             # 키프레임이 적거나 비디오 미지원 프로바이더면 keyframes, 아니면 upload (긴 비디오는 키프레임 추출 없이 segmented)
+
+
 class IssueType(str, Enum):
     TEXT_TRUNCATION = "TEXT_TRUNCATION"
     TEXT_OVERFLOW = "TEXT_OVERFLOW"
@@ -57,7 +64,9 @@ class LocalizationIssue(BaseModel):
     location: BoundingBox
     language: str
     suggestion: str
-    timestamp: Optional[str] = None       # 비디오 전용 (예: "1:23")
+    timestamp: Optional[str] = None       # 비디오 전용 (예: "1:23"), 트랙이면 처음 등장 시각
+    end_timestamp: Optional[str] = None   # 비디오 트랙의 마지막 등장 시각
+    occurrences: Optional[int] = None     # 비디오 트랙에 묶인 등장 횟수
     frame_url: Optional[str] = None       # 파일명 참조
     original_text: Optional[str] = None   # 원본 텍스트
     alternative_texts: Optional[List[str]] = None  # 대체 문장 목록
@@ -66,6 +75,20 @@ class LocalizationIssue(BaseModel):
 class FileAnalysisResult(BaseModel):
     filename: str
     issues: List[LocalizationIssue]
+    analyzed_frames: Optional[int] = None  # 비디오 전용 (파일별 분석 프레임 수)
+
+
+class FileTimings(BaseModel):
+    filename: str
+    total: float                                   # 요청 시작부터 이 파일 결과까지 (초)
+    stages: Dict[str, float] = {}
+
+
+class RequestTimings(BaseModel):
+    total: float
+    stages: Dict[str, float] = {}                  # 단계별 합계 (병렬 호출은 합산)
+    files: List[FileTimings] = []
+    profile_url: Optional[str] = None              # 프로파일링한 요청만
 
 
 class AnalyzeResponse(BaseModel):
@@ -76,3 +99,4 @@ class AnalyzeResponse(BaseModel):
     processing_time: float
     results: List[FileAnalysisResult]
     analyzed_frames: Optional[int] = None  # 비디오 전용
+    timings: Optional[RequestTimings] = None  # X-LocaLens-Timings 요청 / RESPONSE_TIMINGS
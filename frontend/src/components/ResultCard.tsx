@@ -1,7 +1,7 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import type { LocalizationIssue } from "../types";
-import { ISSUE_TYPE_META } from "../types";
+import { ISSUE_TYPE_META, TEXT_ISSUE_TYPES } from "../types";
 
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000/api";
 
@@ -11,10 +11,9 @@ interface ResultCardProps {
   isActive?: boolean;
   onClick?: () => void;
   onHover?: () => void;
+  prefetchedAlternatives?: string[];  // 목록에서 일괄 생성한 대체 문장
 }
 
-const TEXT_ISSUE_TYPES = ["TEXT_TRUNCATION", "TEXT_OVERFLOW", "TEXT_SCALING"];
-
 const getSeverityStyles = (severity: string) => {
   switch (severity) {
     case "HIGH":
@@ -56,7 +55,14 @@ const getSeverityStyles = (severity: string) => {
   }
 };
 
-export default function ResultCard({ issue, index, isActive, onClick, onHover }: ResultCardProps) {
+export default function ResultCard({
+  issue,
+  index,
+  isActive,
+  onClick,
+  onHover,
+  prefetchedAlternatives,
+}: ResultCardProps) {
   const [alternatives, setAlternatives] = useState<string[]>(issue.alternative_texts || []);
   const [loadingAlts, setLoadingAlts] = useState(false);
   const [copied, setCopied] = useState<string | null>(null);
@@ -64,6 +70,12 @@ export default function ResultCard({ issue, index, isActive, onClick, onHover }:
   const typeMeta = ISSUE_TYPE_META[issue.type];
   const sevStyles = getSeverityStyles(issue.severity);
 
+  // 일괄 생성 / 분석 결과에 붙어 온 대체 문장이 나중에 도착하면 반영
+  useEffect(() => {
+    const next = prefetchedAlternatives?.length ? prefetchedAlternatives : issue.alternative_texts;
+    if (next?.length) setAlternatives(next);
+  }, [prefetchedAlternatives, issue.alternative_texts]);
+
   const fetchAlternatives = async () => {
     setLoadingAlts(true);
     try {
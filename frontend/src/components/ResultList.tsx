@@ -1,7 +1,9 @@
 import { useState, useRef, useMemo, useEffect, useCallback } from "react";
 import { motion, AnimatePresence } from "framer-motion";
-import type { LocalizationIssue, InputType, IssueSeverity, IssueType } from "../types";
-import { ALL_ISSUE_TYPES, ISSUE_TYPE_META } from "../types";
+import type {
+  AlternativesBatchResponse, LocalizationIssue, InputType, IssueSeverity, IssueType,
+} from "../types";
+import { ALL_ISSUE_TYPES, ISSUE_TYPE_META, TEXT_ISSUE_TYPES } from "../types";
 import VisualOverlay from "./VisualOverlay";
 import ResultCard from "./ResultCard";
 import VideoTimeline from "./VideoTimeline";
@@ -16,6 +18,8 @@ interface ResultListProps {
   videoDuration?: number;
 }
 
+const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000/api";
+
 type SeverityFilter = "ALL" | IssueSeverity;
 type TypeFilter = "ALL" | IssueType;
 
@@ -35,6 +39,8 @@ export default function ResultList({
   const [showAllIssues, setShowAllIssues] = useState(inputType === "image");
   const [currentNavIndex, setCurrentNavIndex] = useState(0);
   const videoRef = useRef<HTMLVideoElement>(null);
+  const [alternativesById, setAlternativesById] = useState<Record<string, string[]>>({});
+  const [loadingAllAlts, setLoadingAllAlts] = useState(false);
 
   // 타임스탬프 파싱 (M:SS 또는 M:SS.s 형식 지원)
   const parseTimestamp = (ts: string): number => {
@@ -133,6 +139,48 @@ export default function ResultList({
     ? previewUrls[fileNames[currentNavIndex]]
     : Object.values(previewUrls)[0];
 
+  // 대체 문장이 아직 없는 텍스트 이슈 (일괄 생성 대상)
+  const altTargets = useMemo(
+    () =>
+      filtered.filter(
+        (i) =>
+          TEXT_ISSUE_TYPES.includes(i.type) &&
+          !i.alternative_texts?.length &&
+          !alternativesById[i.id]
+      ),
+    [filtered, alternativesById]
+  );
+
+  // 필터된 텍스트 이슈의 대체 문장을 한 번의 요청으로 생성
+  const fetchAllAlternatives = async () => {
+    if (altTargets.length === 0) return;
+    setLoadingAllAlts(true);
+    try {
+      const res = await fetch(`${API_BASE}/generate-alternatives/batch`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          items: altTargets.map((i) => ({
+            original_text: i.original_text || i.description,
+            language: i.language,
+          })),
+        }),
+      });
+      if (!res.ok) return;
+      const data: AlternativesBatchResponse = await res.json();
+      const next: Record<string, string[]> = {};
+      altTargets.forEach((issue, idx) => {
+        const alts = data.results[idx]?.alternatives;
+        if (alts?.length) next[issue.id] = alts;
+      });
+      setAlternativesById((prev) => ({ ...prev, ...next }));
+    } catch {
+      // 실패 시 카드별 개별 생성 버튼으로 재시도 가능
+    } finally {
+      setLoadingAllAlts(false);
+    }
+  };
+
   const resetFilters = () => {
     setSevFilter("ALL");
     setTypeFilter("ALL");
@@ -344,6 +392,17 @@ export default function ResultList({
               ))}
             </select>
 
+            {/* 대체 문장 일괄 생성 */}
+            {altTargets.length > 0 && (
+              <button
+                onClick={fetchAllAlternatives}
+                disabled={loadingAllAlts}
+                className="px-2 py-1 rounded-sm border border-amber-500/20 bg-amber-500/10 text-[10px] font-bold text-amber-500 tracking-wider uppercase hover:bg-amber-500/20 transition-colors disabled:opacity-50"
+              >
+                {loadingAllAlts ? "Generating..." : `Alternatives (${altTargets.length})`}
+              </button>
+            )}
+
             {/* Reset */}
             {isFiltered && (
               <button
@@ -494,6 +553,7 @@ export default function ResultList({
                       setActiveIssueId(issue.id === activeIssueId ? null : issue.id)
                     }
                     onHover={() => setActiveIssueId(issue.id)}
+                    prefetchedAlternatives={alternativesById[issue.id]}
                   />
                 ))}
               </AnimatePresence>
@@ -231,6 +231,28 @@ export default function VideoTimeline({
           />
         ))}
 
+        {/* Track spans (반복 등장 이슈의 처음~마지막 구간) */}
+        {timedIssues.map((issue) => {
+          if (!issue.end_timestamp) return null;
+          const start = (parseTimestamp(issue.timestamp!) / duration) * 100;
+          const end = (parseTimestamp(issue.end_timestamp) / duration) * 100;
+          const offsetIndex = issueOffsets[issue.id] || 0;
+          const isActive = issue.id === activeIssueId || issue.id === hoveredId;
+          return (
+            <div
+              key={`${issue.id}-span`}
+              className="absolute h-1 -translate-y-1/2 rounded-full"
+              style={{
+                left: `${start}%`,
+                width: `${Math.max(end - start, 0)}%`,
+                top: `${baseTrackHeight / 2 + offsetIndex * stackOffset}px`,
+                backgroundColor: severityColor[issue.severity] || "#6b7280",
+                opacity: isActive ? 0.8 : 0.35,
+              }}
+            />
+          );
+        })}
+
         {/* Issue markers */}
         {timedIssues.map((issue) => {
           const secs = parseTimestamp(issue.timestamp!);
@@ -297,7 +319,11 @@ export default function VideoTimeline({
                       <span className="font-medium text-white">{ISSUE_TYPE_META[issue.type]?.label}</span>
                     </div>
                     <p className="text-gray-400 line-clamp-2">{issue.description}</p>
-                    <span className="text-gray-500 font-mono mt-1 block">@ {issue.timestamp}</span>
+                    <span className="text-gray-500 font-mono mt-1 block">
+                      @ {issue.timestamp}
+                      {issue.end_timestamp && ` – ${issue.end_timestamp}`}
+                      {issue.occurrences && issue.occurrences > 1 && ` (×${issue.occurrences})`}
+                    </span>
                   </motion.div>
                 )}
               </AnimatePresence>
@@ -1,10 +1,36 @@
 import { useState, useCallback } from "react";
-import type { AIProvider, InputType, AnalyzeResponse } from "../types";
+import type {
+  AIProvider,
+  InputType,
+  AnalyzeResponse,
+  AnalyzeStreamEvent,
+  FileAnalysisResult,
+} from "../types";
 import { getMockResponseForFiles } from "../mocks/mockData";
 
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000/api";
 const USE_MOCK = import.meta.env.VITE_USE_MOCK === "true";
 
+// NDJSON 스트림을 한 줄(이벤트)씩 읽기
+async function* readNdjson(res: Response): AsyncGenerator<AnalyzeStreamEvent> {
+  const reader = res.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    let newline = buffer.indexOf("\n");
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) yield JSON.parse(line) as AnalyzeStreamEvent;
+      newline = buffer.indexOf("\n");
+    }
+    if (done) break;
+  }
+  if (buffer.trim()) yield JSON.parse(buffer) as AnalyzeStreamEvent;
+}
+
 export function useAnalyze() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -28,8 +54,11 @@ export function useAnalyze() {
           files.forEach((f) => formData.append("files", f));
           formData.append("provider", provider);
           formData.append("input_type", inputType);
+          // 분석과 동시에 대체 문장을 미리 생성 (카드에서 클릭 시 바로 표시)
+          formData.append("prefetch_alternatives", "true");
 
-          const res = await fetch(`${API_BASE}/analyze`, {
+          // 스트리밍 API — 파일별 결과를 도착하는 대로 표시
+          const res = await fetch(`${API_BASE}/analyze/stream`, {
             method: "POST",
             body: formData,
           });
@@ -39,8 +68,44 @@ export function useAnalyze() {
             throw new Error(body.detail || `HTTP ${res.status}`);
           }
 
-          const data: AnalyzeResponse = await res.json();
-          setResult(data);
+          const slots: (FileAnalysisResult | undefined)[] = new Array(files.length);
+          // 파일 결과가 오기 전까지 모델 응답에서 먼저 도착한 이슈 미리보기
+          const previews: (FileAnalysisResult | undefined)[] = new Array(files.length);
+          const errors: string[] = [];
+          const started = performance.now();
+
+          for await (const ev of readNdjson(res)) {
+            if (ev.event === "issue") {
+              const preview = previews[ev.index] ?? { filename: ev.filename, issues: [] };
+              previews[ev.index] = { ...preview, issues: [...preview.issues, ev.issue] };
+            } else if (ev.event === "result") {
+              slots[ev.index] = ev.result;
+            } else if (ev.event === "error") {
+              errors.push(ev.detail);
+              continue;
+            }
+
+            const results = Array.from(files, (_, i) => slots[i] ?? previews[i]).filter(
+              (r): r is FileAnalysisResult => r !== undefined
+            );
+            const partial: AnalyzeResponse = {
+              success: true,
+              provider,
+              input_type: inputType,
+              total_issues: results.reduce((n, r) => n + r.issues.length, 0),
+              processing_time: (performance.now() - started) / 1000,
+              results,
+            };
+            if (ev.event === "summary") {
+              partial.success = ev.success;
+              partial.total_issues = ev.total_issues;
+              partial.processing_time = ev.processing_time;
+              partial.analyzed_frames = ev.analyzed_frames ?? undefined;
+            }
+            setResult(partial);
+          }
+
+          if (errors.length > 0) setError(errors.join("; "));
         }
       } catch (err: unknown) {
         setError(err instanceof Error ? err.message : "분석 중 오류가 발생했습니다.");
@@ -261,7 +261,7 @@ export default function HomePage() {
               </svg>
             </motion.div>
             <h3 className="text-xl font-bold text-white">
-              Analysis Complete — {result.total_issues} Issues Found
+              {loading ? "Analyzing…" : "Analysis Complete"} — {result.total_issues} Issues Found
             </h3>
             <p className="text-sm text-graphite-400">
               {result.provider} · {result.input_type} · {result.processing_time.toFixed(2)}s
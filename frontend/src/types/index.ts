@@ -2,6 +2,7 @@
 
 export type InputType = "image" | "video";
 export type AIProvider = "gemini" | "claude";
+export type VideoMode = "upload" | "keyframes" | "segmented" | "auto";
 
 export type IssueType =
   | "TEXT_TRUNCATION"
@@ -36,6 +37,8 @@ export interface LocalizationIssue {
   language: string;
   suggestion: string;
   timestamp?: string;
+  end_timestamp?: string;  // 비디오 트랙: 마지막 등장 시각
+  occurrences?: number;    // 비디오 트랙: 등장 횟수
   frame_url?: string;
   original_text?: string;
   alternative_texts?: string[];
@@ -44,6 +47,7 @@ export interface LocalizationIssue {
 export interface FileAnalysisResult {
   filename: string;
   issues: LocalizationIssue[];
+  analyzed_frames?: number | null;
 }
 
 export interface AnalyzeResponse {
@@ -54,8 +58,40 @@ export interface AnalyzeResponse {
   processing_time: number;
   results: FileAnalysisResult[];
   analyzed_frames?: number;
+  timings?: RequestTimings;
 }
 
+// X-LocaLens-Timings 요청 시 단계별 소요 시간 (초)
+export interface RequestTimings {
+  total: number;
+  stages: Record<string, number>;
+  files: { filename: string; total: number; stages: Record<string, number> }[];
+  profile_url?: string;
+}
+
+// POST /api/generate-alternatives/batch
+export interface AlternativesBatchResponse {
+  success: boolean;
+  results: { success: boolean; original_text: string; alternatives: string[] }[];
+}
+
+// POST /api/analyze/stream — NDJSON 한 줄당 하나의 이벤트
+export type AnalyzeStreamEvent =
+  | { event: "issue"; index: number; filename: string; issue: LocalizationIssue }
+  | { event: "result"; index: number; result: FileAnalysisResult }
+  | { event: "error"; index: number; filename: string; detail: string }
+  | {
+      event: "summary";
+      success: boolean;
+      provider: string;
+      input_type: string;
+      total_files: number;
+      failed_files: number;
+      total_issues: number;
+      processing_time: number;
+      analyzed_frames?: number | null;
+    };
+
 // ─── Meta / Constants ────────────────────────────────────
 
 export interface ProviderMeta {
@@ -141,3 +177,6 @@ export const ALL_ISSUE_TYPES: IssueType[] = [
   "ALIGNMENT",
   "CULTURAL_ISSUE",
 ];
+
+// 대체 문장을 제안하는 텍스트 길이 관련 이슈 유형
+export const TEXT_ISSUE_TYPES: IssueType[] = ["TEXT_TRUNCATION", "TEXT_OVERFLOW", "TEXT_SCALING"];